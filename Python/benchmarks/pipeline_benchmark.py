@@ -0,0 +1,208 @@
+# Benchmarks the CodeBreakers pipeline on synthetic inputs and compares the results with a stored baseline.
+# Run from the repository root:
+#   python -m Python.benchmarks.pipeline_benchmark                       # run and compare with baseline.json
+#   python -m Python.benchmarks.pipeline_benchmark --update-baseline     # run and store the results as the baseline
+#   python -m Python.benchmarks.pipeline_benchmark --max-size 256MB --only score_text,hamming_distance
+# The committed baseline.json was stored with the default options; timings only compare on the same machine, so store
+# a fresh baseline before relying on the regression check anywhere else.
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import timeit
+from Python.src.CodeBreakers import *
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+WORDS = ("the of and to a in is you that it he was for on are as with his they I at be this have from or one had "
+         "by word but not what all were we when your can said there use an each which she do how their if will up "
+         "other about out many then them these so some her would make like him into time has look two more write "
+         "go see number no way could people my than first water been call who oil its now find long down day did "
+         "get come made may part").split()
+KEY = b"Terminator X: Bring the noise"
+
+
+def english(size: int, seed: int = 0) -> bytes:
+    """Generates reproducible English-like text of exactly size bytes from a list of common words."""
+    rng = random.Random(seed)
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words).encode('ascii')[:size]
+
+
+def parse_size(text: str) -> int:
+    """Parses sizes like 4096, 64KB, 1MB or 0.5GB into a number of bytes."""
+    units = {"GB": 1 << 30, "MB": 1 << 20, "KB": 1 << 10, "B": 1}
+    for unit, multiplier in units.items():
+        if text.upper().endswith(unit):
+            return int(float(text[:-len(unit)]) * multiplier)
+    return int(text)
+
+
+def sizes_up_to(largest: int) -> [int]:
+    """Input sizes growing by 16x from 1 KB, with the largest size always included."""
+    sizes = []
+    size = 1 << 10
+    while size < largest:
+        sizes.append(size)
+        size <<= 4
+    return sizes + [largest]
+
+
+def _bench_brute_xor(size: int):
+    cyphertext = xor_single_byte(english(size), ord('X')).hex()
+    return brute_xor, (cyphertext, 1)
+
+
+def _bench_brute_xor_file(size: int, directory: str):
+    # lines of 30 bytes like Set1Challenge4, one of which is encrypted English
+    rng = random.Random(size)
+    lines = [rng.randbytes(30).hex() for _ in range(max(size // 30, 1))]
+    lines[len(lines) // 2] = xor_single_byte(english(30), ord('5')).hex()
+    path = os.path.join(directory, "xor_lines_{}.txt".format(size))
+    with open(path, 'w') as file:
+        file.write("\n".join(lines))
+    return brute_xor_file, (path, 1)
+
+
+def _bench_break_repeating_key_xor(size: int):
+    return break_repeating_key_xor, (xor(english(size), KEY).decode('ascii'), 40)
+
+
+def _bench_hamming_distance(size: int):
+    return hamming_distance, (english(size, 1).decode(), english(size, 2).decode())
+
+
+def _bench_score_text(size: int):
+    return score_text, (english(size).decode(),)
+
+
+def _bench_percent_repeated_blocks(size: int):
+    return percent_repeated_blocks, (english(size),)
+
+
+def _bench_xor(size: int):
+    return xor, (english(size), KEY)
+
+
+def _bench_detection_oracle(size: int):
+    from Python.src.Oracles import detection_oracle  # only needed here
+    rng = random.Random(size)
+    return detection_oracle, (rng.randbytes(size),)
+
+
+# benchmark name -> (setup function, largest size it is run at by default, whether setup needs a temp directory)
+BENCHMARKS = {
+    "brute_xor": (_bench_brute_xor, None, False),
+    "brute_xor_file": (_bench_brute_xor_file, 16 << 20, True),
+    "break_repeating_key_xor": (_bench_break_repeating_key_xor, 16 << 20, False),
+    "hamming_distance": (_bench_hamming_distance, None, False),
+    "score_text": (_bench_score_text, None, False),
+    "percent_repeated_blocks": (_bench_percent_repeated_blocks, None, False),
+    "detection_oracle": (_bench_detection_oracle, None, False),
+    "xor": (_bench_xor, None, False),
+}
+
+
+def time_call(function, args: tuple, budget: float) -> float:
+    """The best time of a call, running it as many times as fit in the time budget (at least once)."""
+    timer = timeit.Timer(lambda: function(*args))
+    best = timer.timeit(1)
+    spent = best
+    while spent + best < budget:
+        elapsed = timer.timeit(1)
+        best = min(best, elapsed)
+        spent += elapsed
+    return best
+
+
+def run(names: [str], largest: int, budget: float) -> dict:
+    """Runs the benchmarks and returns a results document suitable for json.dump."""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name in names:
+            setup, cap, needs_directory = BENCHMARKS[name]
+            for size in sizes_up_to(min(largest, cap or largest)):
+                label = "{}@{}".format(name, size)
+                try:
+                    function, args = setup(size, directory) if needs_directory else setup(size)
+                except ImportError as error:
+                    results[label] = {"skipped": str(error)}
+                    print("{:<40} skipped: {}".format(label, error), file=sys.stderr)
+                    break
+                seconds = time_call(function, args, budget)
+                results[label] = {"seconds": seconds, "bytes_per_second": size / seconds}
+                print("{:<40} {:>12.6f} s {:>10.2f} MB/s".format(label, seconds, size / seconds / 1e6),
+                      file=sys.stderr)
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> [str]:
+    """Finds the benchmarks which got slower than the baseline by more than the tolerance.
+    :return: A list of human readable regression descriptions, empty if there were none."""
+    regressions = []
+    for label, result in current["results"].items():
+        before = baseline["results"].get(label, {})
+        if "seconds" not in result or "seconds" not in before:
+            continue
+        ratio = result["seconds"] / before["seconds"]
+        if ratio > 1 + tolerance:
+            regressions.append("{}: {:.6f} s -> {:.6f} s ({:.0%} slower)".format(
+                label, before["seconds"], result["seconds"], ratio - 1))
+    return regressions
+
+
+def main(argv: [str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the CodeBreakers pipeline.")
+    parser.add_argument("--max-size", default="1MB", type=parse_size,
+                        help="largest synthetic input, e.g. 64KB, 1MB, 256MB (default 1MB)")
+    parser.add_argument("--only", default=",".join(BENCHMARKS), help="comma separated benchmarks to run")
+    parser.add_argument("--budget", default=1.0, type=float, help="seconds to spend repeating each measurement")
+    parser.add_argument("--output", help="write the JSON results to this file instead of stdout")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON file to compare against")
+    parser.add_argument("--tolerance", default=0.25, type=float, help="allowed slowdown before flagging, 0.25 = 25%%")
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    args = parser.parse_args(argv)
+
+    names = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error("unknown benchmarks: {}".format(", ".join(unknown)))
+
+    current = run(names, args.max_size, args.budget)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(current, file, indent=2)
+    else:
+        json.dump(current, sys.stdout, indent=2)
+        print()
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(current, file, indent=2)
+        print("Stored baseline in {}".format(args.baseline), file=sys.stderr)
+        return 0
+    if not os.path.exists(args.baseline):
+        print("No baseline at {}, run with --update-baseline to store one".format(args.baseline), file=sys.stderr)
+        return 0
+    with open(args.baseline) as file:
+        regressions = compare(current, json.load(file), args.tolerance)
+    for regression in regressions:
+        print("REGRESSION " + regression, file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
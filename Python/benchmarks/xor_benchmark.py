@@ -0,0 +1,56 @@
+# Compares the big integer repeating-key XOR in ByteManip with the byte by byte loop it replaced.
+# Run from the repository root: python -m Python.benchmarks.xor_benchmark [largest size in MB]
+
+import os
+import sys
+import timeit
+from Python.src.ByteManip import xor, xor_into, XorStream
+
+SIZES = [1 << 10, 1 << 14, 1 << 17, 1 << 20, 10 << 20, 100 << 20]  # 1 KB to 100 MB
+KEY = b"Terminator X: Bring the noise"
+
+
+def legacy_xor(message: bytes, key: bytes) -> bytes:
+    """The original ByteManip.xor, kept here as the baseline."""
+    output: bytearray = bytearray(len(message))
+    for i in range(0, len(output)):
+        output[i] = message[i] ^ key[i % len(key)]
+    return output
+
+
+def stream_xor(message: bytes, key: bytes, chunk_size: int = 1 << 16) -> bytes:
+    """XORs the message in chunks through an XorStream, writing into one preallocated buffer."""
+    stream = XorStream(key)
+    output = bytearray(len(message))
+    view = memoryview(message)
+    for start in range(0, len(message), chunk_size):
+        stream.update_into(view[start:start + chunk_size], output, start)
+    return output
+
+
+def best_time(function, *args) -> float:
+    """The fastest of a few runs, repeated enough times to take at least a fraction of a second."""
+    timer = timeit.Timer(lambda: function(*args))
+    number, elapsed = timer.autorange()
+    return min([elapsed] + timer.repeat(2, number)) / number
+
+
+def main(largest: int):
+    print("{:>12} {:>14} {:>14} {:>14} {:>14}".format("size", "legacy MB/s", "xor MB/s", "in place MB/s",
+                                                       "stream MB/s"))
+    for size in SIZES:
+        if size > largest:
+            break
+        message = os.urandom(size)
+        assert xor(message, KEY) == stream_xor(message, KEY)
+        # the byte by byte loop is far too slow to time on the largest inputs, so it stops at 10 MB
+        legacy = size / best_time(legacy_xor, message, KEY) / 1e6 if size <= 10 << 20 else float('nan')
+        fast = size / best_time(xor, message, KEY) / 1e6
+        buffer = bytearray(message)
+        in_place = size / best_time(xor_into, buffer, KEY, buffer) / 1e6
+        streamed = size / best_time(stream_xor, message, KEY) / 1e6
+        print("{:>12} {:>14.1f} {:>14.1f} {:>14.1f} {:>14.1f}".format(size, legacy, fast, in_place, streamed))
+
+
+if __name__ == '__main__':
+    main(int(float(sys.argv[1]) * (1 << 20)) if len(sys.argv) > 1 else SIZES[-1])
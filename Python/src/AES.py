@@ -0,0 +1,224 @@
+# A pure Python AES block cipher with ECB and CBC modes, so the oracles and challenges don't need an external crypto
+# library. The rounds use the usual precomputed T-tables, where SubBytes, ShiftRows and MixColumns of a whole column
+# are four table lookups, and whole buffers of blocks are unpacked and packed in one call each.
+# Usage mirrors the Crypto.Cipher.AES module: AES.new(key, AES.MODE_CBC, iv).encrypt(data)
+
+from functools import lru_cache
+from struct import Struct
+from Python.src.ByteManip import fixed_xor_bytes
+
+MODE_ECB = 1
+MODE_CBC = 2
+block_size = 16
+key_size = (16, 24, 32)
+_ROUNDS = {16: 10, 24: 12, 32: 14}
+
+
+def _build_tables() -> tuple:
+    """Computes the S-box, its inverse, and the encryption and decryption T-tables from the field arithmetic of
+    GF(2^8), rather than pasting in thousands of constants."""
+    # powers and logarithms of the generator 3 make multiplication and inversion in the field cheap
+    exp = [0] * 510
+    log = [0] * 256
+    value = 1
+    for power in range(255):
+        exp[power] = exp[power + 255] = value
+        log[value] = power
+        value ^= (value << 1) ^ (0x11b if value & 0x80 else 0)  # value * 3
+    sbox = [0] * 256
+    for b in range(256):
+        inverse = exp[255 - log[b]] if b else 0
+        # the affine transformation
+        s = inverse
+        for shift in range(1, 5):
+            s ^= ((inverse << shift) | (inverse >> (8 - shift))) & 0xff
+        sbox[b] = s ^ 0x63
+    inverse_sbox = [0] * 256
+    for b, s in enumerate(sbox):
+        inverse_sbox[s] = b
+
+    def multiply(a: int, b: int) -> int:
+        return exp[log[a] + log[b]] if a and b else 0
+
+    def rotations(table: [int]) -> [[int]]:
+        return [table] + [[(word >> (8 * r)) | ((word << (32 - 8 * r)) & 0xffffffff) for word in table]
+                          for r in (1, 2, 3)]
+
+    encrypt_table = [multiply(s, 2) << 24 | s << 16 | s << 8 | multiply(s, 3) for s in sbox]
+    decrypt_table = [multiply(s, 14) << 24 | multiply(s, 9) << 16 | multiply(s, 13) << 8 | multiply(s, 11)
+                     for s in inverse_sbox]
+    return sbox, inverse_sbox, rotations(encrypt_table), rotations(decrypt_table)
+
+
+SBOX, INVERSE_SBOX, (_TE0, _TE1, _TE2, _TE3), (_TD0, _TD1, _TD2, _TD3) = _build_tables()
+# the S-box shifted into each byte of a word, for the last round which has no MixColumns
+_SE = [[s << shift for s in SBOX] for shift in (24, 16, 8, 0)]
+_SD = [[s << shift for s in INVERSE_SBOX] for shift in (24, 16, 8, 0)]
+
+
+@lru_cache(maxsize=256)
+def expand_key(key: bytes) -> ([int], [int]):
+    """Expands a key into the round keys for encryption and for the equivalent inverse cipher used to decrypt.
+    Results are cached, so ciphers created over and over with the same key skip the key schedule.
+    :param key: A 16, 24 or 32 byte key.
+    :return: A tuple of the encryption and decryption round keys, as flat lists of 32 bit words."""
+    if len(key) not in _ROUNDS:
+        raise ValueError("Incorrect AES key length ({} bytes)".format(len(key)))
+    rounds = _ROUNDS[len(key)]
+    key_words = len(key) // 4
+    words = list(Struct('>{}I'.format(key_words)).unpack(key))
+    round_constant = 1
+    for i in range(key_words, 4 * (rounds + 1)):
+        word = words[i - 1]
+        if i % key_words == 0:
+            word = ((word << 8) & 0xffffffff) | (word >> 24)  # RotWord
+            word = _SE[0][word >> 24] | _SE[1][(word >> 16) & 0xff] | _SE[2][(word >> 8) & 0xff] | SBOX[word & 0xff]
+            word ^= round_constant << 24
+            round_constant = (round_constant << 1) ^ (0x11b if round_constant & 0x80 else 0)
+        elif key_words > 6 and i % key_words == 4:
+            word = _SE[0][word >> 24] | _SE[1][(word >> 16) & 0xff] | _SE[2][(word >> 8) & 0xff] | SBOX[word & 0xff]
+        words.append(words[i - key_words] ^ word)
+    # the decryption round keys are the encryption ones in reverse, with InvMixColumns applied to the middle rounds
+    decrypt_words = []
+    for r in range(rounds, -1, -1):
+        for word in words[4 * r:4 * r + 4]:
+            if 0 < r < rounds:
+                word = (_TD0[SBOX[word >> 24]] ^ _TD1[SBOX[(word >> 16) & 0xff]] ^
+                        _TD2[SBOX[(word >> 8) & 0xff]] ^ _TD3[SBOX[word & 0xff]])
+            decrypt_words.append(word)
+    return words, decrypt_words
+
+
+def encrypt_blocks(round_keys: [int], data: bytes, iv: bytes = None) -> bytes:
+    """Encrypts whole 16 byte blocks, independently in ECB mode or chained in CBC mode.
+    :param round_keys: The encryption round keys from expand_key.
+    :param data: Any bytes-like object whose length is a multiple of 16.
+    :param iv: The block to chain the first block to, for CBC mode. Without it the blocks are encrypted as ECB.
+    :return: The encrypted blocks."""
+    te0, te1, te2, te3 = _TE0, _TE1, _TE2, _TE3
+    se0, se1, se2, se3 = _SE
+    rounds = len(round_keys) // 4 - 1
+    k0, k1, k2, k3 = round_keys[:4]
+    middle = [tuple(round_keys[4 * r:4 * r + 4]) for r in range(1, rounds)]
+    l0, l1, l2, l3 = round_keys[-4:]
+    words = Struct('>{}I'.format(len(data) // 4))
+    state = words.unpack(data)
+    output = []
+    chained = iv is not None
+    if chained:
+        c0, c1, c2, c3 = Struct('>4I').unpack(iv)  # the previous cyphertext block
+    for i in range(0, len(state), 4):
+        s0, s1, s2, s3 = state[i] ^ k0, state[i + 1] ^ k1, state[i + 2] ^ k2, state[i + 3] ^ k3
+        if chained:
+            s0, s1, s2, s3 = s0 ^ c0, s1 ^ c1, s2 ^ c2, s3 ^ c3
+        for r0, r1, r2, r3 in middle:
+            s0, s1, s2, s3 = (
+                te0[s0 >> 24] ^ te1[(s1 >> 16) & 0xff] ^ te2[(s2 >> 8) & 0xff] ^ te3[s3 & 0xff] ^ r0,
+                te0[s1 >> 24] ^ te1[(s2 >> 16) & 0xff] ^ te2[(s3 >> 8) & 0xff] ^ te3[s0 & 0xff] ^ r1,
+                te0[s2 >> 24] ^ te1[(s3 >> 16) & 0xff] ^ te2[(s0 >> 8) & 0xff] ^ te3[s1 & 0xff] ^ r2,
+                te0[s3 >> 24] ^ te1[(s0 >> 16) & 0xff] ^ te2[(s1 >> 8) & 0xff] ^ te3[s2 & 0xff] ^ r3)
+        c0, c1, c2, c3 = (
+            (se0[s0 >> 24] | se1[(s1 >> 16) & 0xff] | se2[(s2 >> 8) & 0xff] | se3[s3 & 0xff]) ^ l0,
+            (se0[s1 >> 24] | se1[(s2 >> 16) & 0xff] | se2[(s3 >> 8) & 0xff] | se3[s0 & 0xff]) ^ l1,
+            (se0[s2 >> 24] | se1[(s3 >> 16) & 0xff] | se2[(s0 >> 8) & 0xff] | se3[s1 & 0xff]) ^ l2,
+            (se0[s3 >> 24] | se1[(s0 >> 16) & 0xff] | se2[(s1 >> 8) & 0xff] | se3[s2 & 0xff]) ^ l3)
+        output += (c0, c1, c2, c3)
+    return words.pack(*output)
+
+
+def decrypt_blocks(round_keys: [int], data: bytes) -> bytes:
+    """Decrypts whole 16 byte blocks independently, which is ECB mode.
+    :param round_keys: The decryption round keys from expand_key.
+    :param data: Any bytes-like object whose length is a multiple of 16.
+    :return: The decrypted blocks."""
+    td0, td1, td2, td3 = _TD0, _TD1, _TD2, _TD3
+    sd0, sd1, sd2, sd3 = _SD
+    rounds = len(round_keys) // 4 - 1
+    k0, k1, k2, k3 = round_keys[:4]
+    middle = [tuple(round_keys[4 * r:4 * r + 4]) for r in range(1, rounds)]
+    l0, l1, l2, l3 = round_keys[-4:]
+    words = Struct('>{}I'.format(len(data) // 4))
+    state = words.unpack(data)
+    output = []
+    for i in range(0, len(state), 4):
+        s0, s1, s2, s3 = state[i] ^ k0, state[i + 1] ^ k1, state[i + 2] ^ k2, state[i + 3] ^ k3
+        for r0, r1, r2, r3 in middle:
+            s0, s1, s2, s3 = (
+                td0[s0 >> 24] ^ td1[(s3 >> 16) & 0xff] ^ td2[(s2 >> 8) & 0xff] ^ td3[s1 & 0xff] ^ r0,
+                td0[s1 >> 24] ^ td1[(s0 >> 16) & 0xff] ^ td2[(s3 >> 8) & 0xff] ^ td3[s2 & 0xff] ^ r1,
+                td0[s2 >> 24] ^ td1[(s1 >> 16) & 0xff] ^ td2[(s0 >> 8) & 0xff] ^ td3[s3 & 0xff] ^ r2,
+                td0[s3 >> 24] ^ td1[(s2 >> 16) & 0xff] ^ td2[(s1 >> 8) & 0xff] ^ td3[s0 & 0xff] ^ r3)
+        output += (
+            (sd0[s0 >> 24] | sd1[(s3 >> 16) & 0xff] | sd2[(s2 >> 8) & 0xff] | sd3[s1 & 0xff]) ^ l0,
+            (sd0[s1 >> 24] | sd1[(s0 >> 16) & 0xff] | sd2[(s3 >> 8) & 0xff] | sd3[s2 & 0xff]) ^ l1,
+            (sd0[s2 >> 24] | sd1[(s1 >> 16) & 0xff] | sd2[(s0 >> 8) & 0xff] | sd3[s3 & 0xff]) ^ l2,
+            (sd0[s3 >> 24] | sd1[(s2 >> 16) & 0xff] | sd2[(s1 >> 8) & 0xff] | sd3[s0 & 0xff]) ^ l3)
+    return words.pack(*output)
+
+
+class AESCipher:
+    """An AES cipher in ECB or CBC mode. Like Crypto.Cipher.AES, a CBC cipher carries its chaining state from one
+    call to the next, so a long message can be encrypted or decrypted in pieces."""
+
+    def __init__(self, key: bytes, mode: int = MODE_ECB, iv: bytes = None):
+        """
+        :param key: A 16, 24 or 32 byte key.
+        :param mode: MODE_ECB or MODE_CBC.
+        :param iv: The 16 byte initialization vector of CBC mode, random if not given.
+        """
+        if mode not in (MODE_ECB, MODE_CBC):
+            raise ValueError("Unsupported AES mode {}".format(mode))
+        if mode == MODE_CBC:
+            if iv is None:
+                import secrets  # only needed when the caller doesn't pick the IV
+                iv = secrets.token_bytes(block_size)
+            if len(iv) != block_size:
+                raise ValueError("Incorrect IV length ({} bytes), it must be {} bytes".format(len(iv), block_size))
+            iv = bytes(iv)
+        elif iv is not None:
+            raise TypeError("ECB mode does not use an IV")
+        self.mode = mode
+        self.iv = iv
+        self.block_size = block_size
+        self._encrypt_keys, self._decrypt_keys = expand_key(bytes(key))
+        self._chain = iv  # the previous cyphertext block of CBC mode
+
+    @staticmethod
+    def _check_length(data: bytes):
+        if len(data) % block_size:
+            raise ValueError("Data must be a multiple of {} bytes long, not {}".format(block_size, len(data)))
+
+    def encrypt(self, plaintext: bytes) -> bytes:
+        """Encrypts some padded plaintext.
+        :param plaintext: Any bytes-like object whose length is a multiple of 16.
+        :return: The cyphertext."""
+        self._check_length(plaintext)
+        if self.mode == MODE_ECB:
+            return encrypt_blocks(self._encrypt_keys, plaintext)
+        cyphertext = encrypt_blocks(self._encrypt_keys, plaintext, self._chain)
+        if cyphertext:
+            self._chain = cyphertext[-block_size:]
+        return cyphertext
+
+    def decrypt(self, cyphertext: bytes) -> bytes:
+        """Decrypts some cyphertext. Padding is not removed.
+        :param cyphertext: Any bytes-like object whose length is a multiple of 16.
+        :return: The plaintext."""
+        self._check_length(cyphertext)
+        decrypted = decrypt_blocks(self._decrypt_keys, cyphertext)
+        if self.mode == MODE_ECB or not cyphertext:
+            return decrypted
+        # unlike encryption, every CBC block can be decrypted at once and XORed with the shifted cyphertext after
+        cyphertext = bytes(cyphertext)
+        previous = self._chain + cyphertext[:-block_size]
+        self._chain = cyphertext[-block_size:]
+        return fixed_xor_bytes(decrypted, previous)
+
+
+def new(key: bytes, mode: int = MODE_ECB, iv: bytes = None) -> AESCipher:
+    """Creates an AES cipher, see AESCipher.
+    :param key: A 16, 24 or 32 byte key.
+    :param mode: MODE_ECB or MODE_CBC.
+    :param iv: The 16 byte initialization vector of CBC mode, random if not given.
+    :return: The cipher."""
+    return AESCipher(key, mode, iv)
@@ -0,0 +1,119 @@
+# Byte-at-a-time ECB decryption, cryptopals challenges 12 and 14: recovering the secret an ECB oracle appends to
+# attacker controlled input. The textbook attack makes 256 oracle calls per secret byte; this one makes about one,
+# since ECB encrypts every block on its own and all 256 guesses for a byte fit in a single input.
+
+from collections import namedtuple
+from time import perf_counter
+from Python.src.Oracles import detection_oracle, AES
+
+# The recovered secret, what was learned about the oracle, and what it cost.
+AttackResult = namedtuple('AttackResult', ['plaintext', 'block_size', 'prefix_length', 'oracle_calls',
+                                           'dictionary_hits', 'seconds'])
+
+
+class _CountingOracle:
+    """Counts the inputs given to an oracle, using its batch method when it has one."""
+
+    def __init__(self, oracle):
+        self.oracle = oracle
+        self.calls = 0
+
+    def __call__(self, attacker_input: bytes) -> bytes:
+        self.calls += 1
+        return self.oracle(attacker_input)
+
+    def batch(self, attacker_inputs: [bytes]) -> [bytes]:
+        self.calls += len(attacker_inputs)
+        batch = getattr(self.oracle, 'batch', None)
+        return batch(attacker_inputs) if batch else [self.oracle(attacker_input) for attacker_input in attacker_inputs]
+
+
+def _blocks(cyphertext: bytes, block_size: int) -> [bytes]:
+    return [cyphertext[i:i + block_size] for i in range(0, len(cyphertext), block_size)]
+
+
+def detect_block_size(oracle, max_block_size: int = 64) -> int:
+    """Finds the block size of an oracle's cypher by growing the input until the cyphertext grows by a block.
+    :param oracle: A function from attacker controlled bytes to cyphertext bytes.
+    :param max_block_size: The largest block size to look for.
+    :raises ValueError: if the cyphertext never grows by a whole block.
+    :return: The block size in bytes."""
+    base_length = len(oracle(b''))
+    for length in range(1, max_block_size + 1):
+        grown = len(oracle(b'A' * length)) - base_length
+        if grown:
+            return grown
+    raise ValueError("The cyphertext did not grow by a block within {} bytes of input".format(max_block_size))
+
+
+def detect_prefix_length(oracle, block_size: int) -> int:
+    """Finds the length of the fixed bytes an oracle puts before the attacker's input, by finding how many filler
+    bytes make two identical blocks of input line up with the cypher's blocks.
+    Each alignment is confirmed with a second filler byte, in case the prefix ends in the first one.
+    :param oracle: A function from attacker controlled bytes to cyphertext bytes.
+    :param block_size: The block size in bytes.
+    :raises ValueError: if no two input blocks ever encrypt the same, so the oracle is not using ECB.
+    :return: The prefix length in bytes."""
+    for filler in range(block_size):
+        blocks = _blocks(oracle(b'A' * (2 * block_size + filler)), block_size)
+        confirm = None
+        for index in range(len(blocks) - 1):
+            if blocks[index] == blocks[index + 1]:
+                confirm = confirm or _blocks(oracle(b'B' * (2 * block_size + filler)), block_size)
+                # the pair must change with the input, or it is a repeat within the prefix or the secret
+                if confirm[index] == confirm[index + 1] and confirm[index] != blocks[index]:
+                    return index * block_size - filler
+    raise ValueError("No filler lined up two identical blocks, the oracle does not look like ECB")
+
+
+def byte_at_a_time(oracle, block_size: int = None, alphabet: bytes = bytes(range(256))) -> AttackResult:
+    """Recovers the secret an ECB oracle appends to its input.
+    For secret byte j, filler pushes it to the last byte of a block whose other bytes are already known. The block
+    size filler lengths needed are queried once up front, and also give the exact secret length. Then one query per
+    byte carries a block for every candidate byte, and the matching cyphertext block names the secret byte.
+    Dictionaries are cached by the known bytes they were built from, so repeated stretches of secret are free.
+    :param oracle: A function from attacker controlled bytes to cyphertext bytes, such as an Oracles.EcbOracle.
+                   If it has a batch method, the up front queries are made in one batch.
+    :param block_size: The cypher's block size, detected if not given.
+    :param alphabet: The possible secret bytes. Fewer candidates make every dictionary query smaller.
+    :raises ValueError: if the oracle is not ECB, or a block matches no candidate byte.
+    :return: An AttackResult."""
+    start = perf_counter()
+    oracle = _CountingOracle(oracle)
+    block_size = block_size or detect_block_size(oracle)
+    if detection_oracle(oracle(b'A' * 3 * block_size), block_size) != AES.MODE_ECB:
+        raise ValueError("The oracle does not repeat blocks for repeated input, so it is not ECB")
+    prefix_length = detect_prefix_length(oracle, block_size)
+    align = -prefix_length % block_size  # filler that ends the prefix's last block
+    first_block = (prefix_length + align) // block_size  # the first block made only of attacker input
+
+    # targets[i] is the cyphertext for align + i filler bytes, which puts secret byte j at the end of a block
+    # whenever i = block_size - 1 - j % block_size
+    targets = oracle.batch([b'A' * (align + i) for i in range(block_size)])
+    lengths = [len(target) for target in targets]
+    # the cyphertext gains a block of padding at the first input length where the plaintext fills its last block
+    grown = next((i for i in range(1, block_size) if lengths[i] > lengths[i - 1]), 0)
+    secret_length = lengths[grown] - block_size - prefix_length - align - grown
+
+    known = bytearray(b'A' * (block_size - 1))  # filler standing in for the bytes before the secret
+    dictionaries = {}
+    hits = 0
+    for j in range(secret_length):
+        context = bytes(known[-(block_size - 1):])
+        dictionary = dictionaries.get(context)
+        if dictionary is None:
+            guesses = b''.join(context + bytes([candidate]) for candidate in alphabet)
+            encrypted = oracle(b'A' * align + guesses)
+            dictionary = {encrypted[(first_block + k) * block_size:(first_block + k + 1) * block_size]: candidate
+                          for k, candidate in enumerate(alphabet)}
+            dictionaries[context] = dictionary
+        else:
+            hits += 1
+        target = targets[block_size - 1 - j % block_size]
+        index = first_block + j // block_size
+        secret_byte = dictionary.get(target[index * block_size:(index + 1) * block_size])
+        if secret_byte is None:
+            raise ValueError("Secret byte {} is not in the alphabet".format(j))
+        known.append(secret_byte)
+    return AttackResult(bytes(known[block_size - 1:]), block_size, prefix_length, oracle.calls, hits,
+                        perf_counter() - start)
@@ -46,16 +46,25 @@ def fixed_xor(str1: str, str2: str) -> str:
     if len(str1) != len(str2):
         raise ValueError("Length of input strings do not match")
     # throw an error if the strings are not hex encoded
-    if not is_hex(str1) or not is_hex(str2):
+    try:
+        bytes1: bytes = bytes.fromhex(str1)
+        bytes2: bytes = bytes.fromhex(str2)
+    except ValueError:
         raise ValueError("Input strings are not hex encoded")
+    return fixed_xor_bytes(bytes1, bytes2).hex()
 
-    # convert to bytes
-    bytes1: bytes = bytes.fromhex(str1)
-    bytes2: bytes = bytes.fromhex(str2)
-    # run XOR algorithm
-    output = bytes(a ^ b for a, b in zip(bytes1, bytes2))
 
-    return output.hex()
+def fixed_xor_bytes(bytes1: bytes, bytes2: bytes) -> bytes:
+    """The bytes version of fixed_xor, which XORs two equal length buffers without any hex round trips.
+    :param bytes1: Any bytes-like object.
+    :param bytes2: Any bytes-like object of the same length.
+    :raises valueError: if the length of the inputs are not equal.
+    :returns the XOR combination of the inputs as bytes"""
+    if len(bytes1) != len(bytes2):
+        raise ValueError("Length of inputs do not match")
+    # run XOR algorithm on both buffers at once as big integers
+    output = int.from_bytes(bytes1, 'little') ^ int.from_bytes(bytes2, 'little')
+    return output.to_bytes(len(bytes1), 'little')
 
 
 def xor(message: bytes, key: bytes) -> bytes:
@@ -64,31 +73,138 @@ def xor(message: bytes, key: bytes) -> bytes:
     :param message:  The bytes which make up the message to be encrypted/decrypted.
     :param key:      The bytes which make up the symmetric key
     :returns A set of bytes which is the XOR result of the parameters."""
-    output: bytearray = bytearray(len(message))
-    for i in range(0, len(output)):
-        # modulus allows uneven key sizes, effectively repeating the key along the plaintext
-        output[i] = message[i] ^ key[i % len(key)]
+    output = bytearray(len(message))
+    xor_into(message, key, output)
     return output
 
 
+def keystream(key: bytes, length: int, offset: int = 0) -> bytes:
+    """Repeats a key along a message, which is what a repeating-key XOR actually XORs the message with.
+    :param key:      The bytes which make up the symmetric key
+    :param length:   The length of the keystream.
+    :param offset:   How far into the key the keystream starts, for messages which don't start at the beginning.
+    :returns The key repeated (and rotated by offset) to exactly length bytes."""
+    if not key:
+        raise ValueError("The key must not be empty")
+    offset %= len(key)
+    rotated = bytes(key[offset:]) + bytes(key[:offset])
+    return (rotated * (length // len(key) + 1))[:length]
+
+
+def xor_into(message: bytes, key: bytes, output, start: int = 0, key_offset: int = 0) -> int:
+    """XORs a message with a repeating key and writes the result into a caller provided buffer, so large messages
+    can be encrypted in place or into preallocated memory. The key is repeated along the message once, and the two
+    are XORed as big integers instead of byte by byte.
+    :param message:     The bytes which make up the message to be encrypted/decrypted.
+    :param key:         The bytes which make up the symmetric key
+    :param output:      A writable buffer, such as a bytearray or memoryview. It may be the message itself.
+    :param start:       Where in output to write the result.
+    :param key_offset:  How far into the key the message starts.
+    :returns The number of bytes written."""
+    length = len(message)
+    if not length:
+        return 0
+    if len(key) == 1:
+        result = xor_single_byte(message, key[0])
+    else:
+        result = int.from_bytes(message, 'little') ^ int.from_bytes(keystream(key, length, key_offset), 'little')
+        result = result.to_bytes(length, 'little')
+    memoryview(output)[start:start + length] = result
+    return length
+
+
+class XorStream:
+    """A repeating-key XOR over data which arrives in chunks of any size, such as a socket or a large file.
+    The stream remembers where in the key the previous chunk stopped, so XORing the chunks one after the other
+    gives the same result as XORing the whole message at once."""
+
+    def __init__(self, key: bytes):
+        """
+        :param key: The bytes which make up the symmetric key
+        """
+        if not key:
+            raise ValueError("The key must not be empty")
+        self.key = bytes(key)
+        self.position = 0  # the number of bytes processed so far
+
+    def update(self, chunk: bytes) -> bytes:
+        """XORs the next chunk of the stream.
+        :param chunk: The next bytes of the message.
+        :returns The chunk XORed with the key, continuing where the last chunk left off."""
+        output = bytearray(len(chunk))
+        self.update_into(chunk, output)
+        return bytes(output)
+
+    def update_into(self, chunk: bytes, output, start: int = 0) -> int:
+        """XORs the next chunk of the stream into a caller provided buffer, see xor_into.
+        :param chunk: The next bytes of the message.
+        :param output: A writable buffer, which may be the chunk itself.
+        :param start: Where in output to write the result.
+        :returns The number of bytes written."""
+        written = xor_into(chunk, self.key, output, start, self.position % len(self.key))
+        self.position += written
+        return written
+
+
+# translate tables which XOR every byte value with a single key byte, indexed by that key byte
+XOR_TABLES = [bytes(b ^ k for b in range(256)) for k in range(256)]
+
+
+def xor_single_byte(message: bytes, key: int) -> bytes:
+    """XORs every byte of a message with the same key byte. Uses bytes.translate so the whole message
+    is processed in a single pass without a Python level loop.
+    :param message:  The bytes which make up the message to be encrypted/decrypted.
+    :param key:      The key byte, an integer from 0 to 255.
+    :returns The message XORed with the key byte."""
+    return bytes(message).translate(XOR_TABLES[key])
+
+
 def count_set_bits(n: int) -> int:
-    """Counts the number of set bits (bits represented by a 1 in binary) in a number
-    using the Brian Kernighan Algorithm.
+    """Counts the number of set bits (bits represented by a 1 in binary) in a number.
+    This used to be a Brian Kernighan loop, int.bit_count does the same thing in C.
     :param  n:   The number to check the bits on
     :returns    The number of set bits in n
     """
-    count = 0
-    while n:
-        n &= n-1
-        count += 1
-    return count
+    return n.bit_count()
+
+
+def popcount(data: bytes) -> int:
+    """Counts the number of set bits in an entire buffer at once by reading it as one big integer.
+    :param data:    Any bytes-like object.
+    :returns    The number of set bits in data
+    """
+    return int.from_bytes(data, 'little').bit_count()
+
+
+def transpose(data, key_len: int, offset: int = 0) -> [memoryview]:
+    """Splits data into the key_len columns a repeating key of that length would have encrypted, column i holding
+    every byte the key's byte i touched. The columns are strided views of data, so nothing is copied and they can be
+    passed straight to anything that takes a bytes-like object, such as the single byte XOR solvers.
+    :param data:     Any bytes-like object, or a memoryview already shared with other transpositions.
+    :param key_len:  The number of columns.
+    :param offset:   The position of data's first byte in the whole message, for data which is a later chunk of it.
+    :returns A list of key_len memoryviews, where view i holds the bytes at positions congruent to i mod key_len."""
+    if key_len < 1:
+        raise ValueError("The key length must be positive")
+    view = data if isinstance(data, memoryview) and data.format == 'B' else memoryview(data).cast('B')
+    return [view[(column - offset) % key_len::key_len] for column in range(key_len)]
+
+
+def transpositions(data, key_lengths) -> {int: [memoryview]}:
+    """Transposes data for many key lengths at once, see transpose. Every column of every key length is a view of
+    the same buffer, so trying more key lengths costs no extra memory for the data itself.
+    :param data:         Any bytes-like object.
+    :param key_lengths:  The key lengths to transpose for.
+    :returns A dictionary mapping each key length to its list of columns."""
+    view = memoryview(data).cast('B')
+    return {key_len: transpose(view, key_len) for key_len in key_lengths}
 
 
 def pad_block(block: bytes, block_size: int) -> bytes:
     """
     Pads a plaintext block of bytes to the desired block size using PKCS#7 padding
-    :param block:
-    :param block_size:
+    :param block: Any bytes-like object.
+    :param block_size: The size of the padded block.
     :return: The original block padded using PKCS#7 padding. If the block is already greater than or equal to the
                 desired block size, then the original block parameter is returned unaltered.
     """
@@ -97,8 +213,6 @@ def pad_block(block: bytes, block_size: int) -> bytes:
         return block
 
     output = bytearray(block_size)
-    for i in range(0, len(block)):
-        output[i] = block[i]  # copy over values to the resized block
-    for i in range(len(block), block_size):  # iterate over non-copied spaces
-        output[i] = pad  # Add padding to the end
+    output[:len(block)] = block  # copy over values to the resized block
+    output[len(block):] = bytes([pad]) * pad  # Add padding to the end
     return output
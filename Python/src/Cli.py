@@ -0,0 +1,156 @@
+# A command line tool over the breakers in CodeBreakers and the detection oracle in Oracles. Every input file is
+# handled on its own, across a pool of processes, and each result is printed as one line of JSON as soon as it and
+# the inputs before it are done. Run from the repository root:
+#   python -m Python.src.Cli break-xor Payloads/Set1Challenge6.txt --maxkeylen 40
+#   python -m Python.src.Cli brute-xor-file Payloads/Set1Challenge4.txt
+#   python -m Python.src.Cli find-ecb Payloads/Set1Challenge8.txt
+#   python -m Python.src.Cli detect-mode capture1.bin capture2.bin --jobs 2
+#   cat capture.b64 | python -m Python.src.Cli detect-mode
+# Only the modules a command needs are imported, so the AES tables are never built unless an AES command runs.
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+STDIN = "-"  # the input name which reads from standard input
+
+
+def _text(data) -> str:
+    """Bytes as text for JSON, with anything that isn't ASCII replaced."""
+    return data if isinstance(data, str) else bytes(data).decode('ascii', errors='replace')
+
+
+def _break_xor(path: str, options: dict) -> dict:
+    from Python.src.CodeBreakers import break_repeating_key_xor_bytes
+    from Python.src.PayloadLoader import load_payload
+    key, plaintext = break_repeating_key_xor_bytes(load_payload(path, options["encoding"]), options["maxkeylen"])
+    return {"key": _text(key), "key_hex": key.hex(), "plaintext": _text(plaintext)}
+
+
+def _brute_xor_file(path: str, options: dict) -> dict:
+    from Python.src.CodeBreakers import brute_xor_file
+    line_number, key, plaintext = brute_xor_file(path, options["keylen"])
+    return {"line": line_number, "key": _text(key), "plaintext": _text(plaintext)}
+
+
+def _find_ecb(path: str, options: dict) -> dict:
+    from Python.src.CodeBreakers import find_ecb_line
+    return {"line": find_ecb_line(path, options["block_size"])}
+
+
+def _detect_mode(path: str, options: dict) -> dict:
+    from Python.src.Oracles import detection_oracle, AES
+    from Python.src.PayloadLoader import load_payload
+    mode = detection_oracle(load_payload(path, options["encoding"]), options["block_size"])
+    return {"mode": "ECB" if mode == AES.MODE_ECB else "CBC"}
+
+
+# command name -> (function of an input path and the options, help text)
+COMMANDS = {
+    "break-xor": (_break_xor, "break a repeating-key XOR cyphertext, see break_repeating_key_xor"),
+    "brute-xor-file": (_brute_xor_file, "find the line of a hex file encrypted with a short XOR key"),
+    "find-ecb": (_find_ecb, "find the line of a hex file most likely encrypted with AES in ECB mode"),
+    "detect-mode": (_detect_mode, "guess whether a cyphertext was encrypted with AES in ECB or CBC mode"),
+}
+
+
+def run_command(command: str, path: str, options: dict, name: str = None) -> dict:
+    """Runs one command on one input, turning any failure into an error result so one bad file doesn't stop a batch.
+    :param command: One of the keys of COMMANDS.
+    :param path: The input file.
+    :param options: The command line options, as a dictionary.
+    :param name: The input name to report, defaults to path.
+    :return: A dictionary with the command, the input, and either the command's results or an error."""
+    result = {"command": command, "input": name or path}
+    try:
+        result.update(COMMANDS[command][0](path, options))
+    except Exception as error:
+        result["error"] = "{}: {}".format(type(error).__name__, error)
+    return result
+
+
+def run_batch(command: str, paths: [str], options: dict, jobs: int = None, names: [str] = None) -> iter:
+    """Runs a command on many inputs across a pool of processes.
+    :param command: One of the keys of COMMANDS.
+    :param paths: The input files.
+    :param options: The command line options, as a dictionary.
+    :param jobs: The number of worker processes, defaults to the number of CPUs. A single job, or a single input,
+                 runs in this process and skips starting a pool.
+    :param names: The input names to report, defaults to the paths.
+    :return: A generator of the results of run_command, in input order, each as soon as it is ready."""
+    names = names or paths
+    jobs = min(jobs or os.cpu_count() or 1, len(paths))
+    if jobs <= 1:
+        yield from map(run_command, repeat(command), paths, repeat(options), names)
+        return
+    with ProcessPoolExecutor(jobs) as executor:
+        yield from executor.map(run_command, repeat(command), paths, repeat(options), names)
+
+
+def _spool_stdin(stream) -> str:
+    """Copies standard input to a temporary file, since the commands and the worker processes all read files.
+    :return: The path of the temporary file, which the caller removes."""
+    with tempfile.NamedTemporaryFile(prefix="cli-stdin-", delete=False) as spool:
+        while chunk := stream.read(1 << 20):
+            spool.write(chunk)
+    return spool.name
+
+
+def _positive_int(text: str) -> int:
+    """An argparse type for counts and sizes, which must be at least 1."""
+    try:
+        value = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid int value: {!r}".format(text))
+    if value < 1:
+        raise argparse.ArgumentTypeError("must be a positive integer, not {}".format(value))
+    return value
+
+
+def parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m Python.src.Cli",
+                                     description="Run the cryptopals code breakers over many files, printing one "
+                                                 "JSON result per line.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for name, (function, help_text) in COMMANDS.items():
+        command = commands.add_parser(name, help=help_text, description=help_text)
+        command.add_argument("inputs", nargs="*", default=[STDIN],
+                             help="input files, or - for standard input, which is the default")
+        command.add_argument("--jobs", "-j", type=_positive_int, default=None,
+                             help="worker processes, defaults to the number of CPUs")
+        if name in ("break-xor", "detect-mode"):
+            command.add_argument("--encoding", choices=["hex", "base64", "raw"], default=None,
+                                 help="how the input is encoded, detected from its start by default; short inputs "
+                                      "of fewer than 64 hex digits could be hex or base64, so they need it")
+        if name == "break-xor":
+            command.add_argument("--maxkeylen", type=_positive_int, default=40, help="the longest key length to try")
+        if name == "brute-xor-file":
+            command.add_argument("--keylen", type=_positive_int, default=1, help="the length of the key")
+        if name in ("find-ecb", "detect-mode"):
+            command.add_argument("--block-size", type=_positive_int, default=16,
+                                 help="the cypher's block size in bytes")
+    return parser
+
+
+def main(argv: [str] = None) -> int:
+    args = parser().parse_args(argv)
+    options = {key: value for key, value in vars(args).items() if key not in ("command", "inputs", "jobs")}
+    spooled = _spool_stdin(sys.stdin.buffer) if STDIN in args.inputs else None
+    paths = [spooled if name == STDIN else name for name in args.inputs]
+    failed = False
+    try:
+        for result in run_batch(args.command, paths, options, args.jobs, args.inputs):
+            failed = failed or "error" in result
+            print(json.dumps(result), flush=True)
+    finally:
+        if spooled:
+            os.remove(spooled)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
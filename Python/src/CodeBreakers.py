@@ -1,82 +1,333 @@
 # This file is not meant to be a class, rather a collection of functions to break cryptography
 
-from itertools import combinations_with_replacement
+from itertools import islice
+from collections import Counter, namedtuple
+from heapq import nsmallest, heappush, heappushpop
+from time import perf_counter
 from Python.src.Scoring import *
+from Python.src.KeySpaces import *
+from Python.src.ResultCache import *
+from Python.src.Instrumentation import *
 import sys
 import string
 
+PRINTABLE_KEYS: bytes = string.printable.encode('ascii')  # the single byte keys brute_xor has always tried
+# the version of each cached breaker's algorithm, part of its cache keys. Bump it whenever the breaker could return
+# a different answer for the same input, so results from the old algorithm stored on disk are no longer served.
+BREAKER_VERSIONS = {"brute_xor_file": 1, "break_repeating_key_xor": 2}
+KEY_SIZE_CONFIDENCE = 0.99  # how sure break_repeating_key_xor wants to be that it fully solved the right key size
 
-def brute_xor(cyphertext: str, keylen: int, verbose: bool = False) -> (str, str):
+
+def rank_single_byte_xor(cyphertext: bytes, top: int = 5, keys: bytes = bytes(range(256)),
+                         scorer: Scorer = None) -> [(int, float)]:
+    """Scores every single byte key against a cyphertext at once and returns the best ones.
+    Rather than decrypting the cyphertext once per key, the cyphertext is reduced to a histogram of its bytes.
+    A key k turns every byte c into c ^ k, so the score of the decryption is the sum over the histogram
+    of count(c) * weight(c ^ k), which costs at most 256 lookups per key no matter how long the cyphertext is.
+    :param cyphertext   The encrypted bytes.
+    :param top          The number of keys to return.
+    :param keys         The candidate key bytes, in preference order for ties. Defaults to every byte value.
+    :param scorer       The Scorer to rank decryptions with. Defaults to the score_text metric.
+    :returns a list of up to top (key, score) tuples, best score first."""
+    scorer = scorer or compile_scorer()
+    key_scores = scorer.xor_scores(Counter(cyphertext))
+    scores = [(key, key_scores[key]) for key in keys]
+    # nsmallest is stable, so ties keep the order of keys, same as the first strictly better key wins in brute_xor
+    return nsmallest(top, scores, key=lambda l: scorer.sort_key(l[1]))
+
+
+def pack_cyphertexts(cyphertexts: [bytes]) -> (bytes, [int]):
+    """Packs many cyphertexts into one contiguous buffer for xor_score_matrix.
+    :param cyphertexts  The cyphertexts as bytes.
+    :returns a tuple of the packed buffer and the offsets list, where cyphertext i is buffer[offsets[i]:offsets[i+1]].
+    """
+    offsets = [0]
+    for cyphertext in cyphertexts:
+        offsets.append(offsets[-1] + len(cyphertext))
+    return b''.join(cyphertexts), offsets
+
+
+def xor_score_matrix(buffer: bytes, offsets: [int], scorer: Scorer = None) -> [[float]]:
+    """Scores every single byte XOR key against many cyphertexts packed into one buffer.
+    Each cyphertext costs one histogram and one packed multiply-add per distinct byte (see Scorer.xor_scores),
+    and the cyphertexts are sliced out of the buffer as views, so nothing is copied per cyphertext.
+    :param buffer   The cyphertexts laid end to end, see pack_cyphertexts.
+    :param offsets  The start of every cyphertext in the buffer, followed by the end of the last one.
+    :param scorer   The Scorer to rank decryptions with. Defaults to the score_text metric.
+    :returns a list with a row per cyphertext, where row[k] is the score of that cyphertext XORed with the byte k.
+    """
+    scorer = scorer or compile_scorer()
+    view = memoryview(buffer)
+    return [scorer.xor_scores(Counter(view[offsets[i]:offsets[i + 1]])) for i in range(len(offsets) - 1)]
+
+
+def crack_single_byte_xor_batch(buffer: bytes, offsets: [int], keys: bytes = PRINTABLE_KEYS,
+                                scorer: Scorer = None) -> [(int, float)]:
+    """Finds the best single byte key for every cyphertext packed into a buffer.
+    :param buffer   The cyphertexts laid end to end, see pack_cyphertexts.
+    :param offsets  The start of every cyphertext in the buffer, followed by the end of the last one.
+    :param keys     The candidate key bytes, in preference order for ties.
+    :param scorer   The Scorer to rank decryptions with. Defaults to the score_text metric.
+    :returns a list with a (key, score) tuple per cyphertext.
+    """
+    scorer = scorer or compile_scorer()
+    best = []
+    for row in xor_score_matrix(buffer, offsets, scorer):
+        # min keeps the first of equal keys
+        key = min(keys, key=row.__getitem__ if scorer.lower_is_better else lambda k: -row[k])
+        best.append((key, row[key]))
+    return best
+
+
+# The work done by search_xor_keys: the size of the key space, how many keys were fully scored,
+# and how many were ruled out without being scored.
+SearchStats = namedtuple('SearchStats', ['candidates', 'tried', 'pruned'])
+
+
+def search_xor_keys(cyphertext: bytes, keylen: int, alphabet: bytes = PRINTABLE_KEYS, top: int = 1,
+                    threshold: float = None, scorer: Scorer = None) -> ([(bytes, float)], SearchStats):
+    """A branch and bound search for the best repeating keys of a given length.
+    Every byte of a key only touches its own column of the cyphertext, so the score of a key is the sum of the
+    scores of its bytes against their columns. The columns are scored once, then keys are built one byte at a time
+    from the best column candidates first. A partial key is abandoned as soon as its score plus the best possible
+    score of the remaining columns can't beat the top scores found so far (or exceeds the threshold), which rules
+    out every key sharing that prefix at once. For top=1 this makes the search linear in keylen.
+    :param cyphertext   The encrypted bytes.
+    :param keylen       The length of the key.
+    :param alphabet     The possible bytes of the key. Unlike brute_xor, every ordering of them is searched.
+                        Either one alphabet for every position, or a ProductSpace (such as a MaskSpace) with an
+                        alphabet per position.
+    :param top          The number of keys to return.
+    :param threshold    If given, keys scoring worse than this are never returned.
+    :param scorer       The Scorer to rank decryptions with. Defaults to the score_text metric.
+    :raises ValueError  if alphabet is a key space other than a ProductSpace, or has the wrong number of positions.
+    :returns a tuple of the list of up to top (key, score) tuples, best first, and the SearchStats of the search.
+    """
+    scorer = scorer or compile_scorer()
+    if isinstance(alphabet, KeySpace) and not isinstance(alphabet, ProductSpace):
+        raise ValueError("Only a ProductSpace has an alphabet per position, not {}".format(type(alphabet).__name__))
+    alphabets = alphabet.alphabets if isinstance(alphabet, ProductSpace) else [alphabet] * keylen
+    if len(alphabets) != keylen:
+        raise ValueError("The key space has {} positions, not {}".format(len(alphabets), keylen))
+    # every column's candidate bytes and their scores as sort keys (lower is better), best first
+    columns = []
+    for i, column in enumerate(transpose(cyphertext, keylen)):
+        key_scores = scorer.xor_scores(Counter(column))
+        columns.append(sorted(((scorer.sort_key(key_scores[key]), key) for key in alphabets[i]), key=lambda l: l[0]))
+    # the best score the columns from i onwards could possibly add, and how many keys they can make
+    best_rest = [0] * (keylen + 1)
+    keys_rest = [1] * (keylen + 1)
+    for i in range(keylen - 1, -1, -1):
+        best_rest[i] = best_rest[i + 1] + (columns[i][0][0] if columns[i] else 0)
+        keys_rest[i] = keys_rest[i + 1] * len(columns[i])
+    limit = threshold if threshold is None or scorer.lower_is_better else -threshold
+
+    found = []  # a heap of (-sort key, -order, key) so the worst kept key is on top
+    tried = 0
+    pruned = 0
+    key = bytearray(keylen)
+    # a depth first search with an explicit stack, so long keys can't run out of recursion depth:
+    # key[:depth] is the partial key, partials[depth] its score and positions[depth] the next candidate to try
+    partials = [0] * (keylen + 1)
+    positions = [0] * (keylen + 1)
+    depth = 0 if top > 0 else -1
+    while depth >= 0:
+        if depth == keylen:
+            tried += 1
+            entry = (-partials[depth], -tried, bytes(key))
+            if len(found) < top:
+                heappush(found, entry)
+            else:
+                heappushpop(found, entry)
+            depth -= 1
+            continue
+        column, index = columns[depth], positions[depth]
+        if index == len(column):
+            depth -= 1
+            continue
+        column_score, byte = column[index]
+        bound = partials[depth] + column_score + best_rest[depth + 1]
+        if (limit is not None and bound > limit) or (len(found) == top and bound >= -found[0][0]):
+            # the candidates are sorted, so every later byte in this column is at least as bad
+            pruned += (len(column) - index) * keys_rest[depth + 1]
+            depth -= 1
+            continue
+        positions[depth] = index + 1
+        key[depth] = byte
+        partials[depth + 1] = partials[depth] + column_score
+        positions[depth + 1] = 0
+        depth += 1
+    ranked = sorted(found, key=lambda l: (-l[0], -l[1]))
+    results = [(found_key, -sort_key if scorer.lower_is_better else sort_key)
+               for sort_key, order, found_key in ranked]
+    return results, SearchStats(keys_rest[0], tried, pruned)
+
+
+def brute_xor(cyphertext: str, keylen: int, verbose: bool = False, prune: bool = False,
+              candidates: KeySpace = None) -> (str, str):
     """Brute forces an XOR encrypted hex string given the cypher text and the length of key to use.
     It is not guaranteed to decipher the XOR, just give a best guess.
     :param cyphertext   The encrypted cyphertext as a hex encoded ASCII string.
     :param keylen       The guessed length of the string used as a key.
     :param verbose      Print all keys of keylen length and their corresponding decryption. Default to False.
+    :param prune        Use the pruned search_xor_keys instead of trying every key. Default to False.
+    :param candidates   The keys to try, see KeySpaces. Defaults to combinations of printable characters.
     :returns a tuple containing the best guess key and the corresponding decryption"""
-    # chars is a string of every printable character from 32 to 127 on the ASCII table
+    key, plaintext = brute_xor_bytes(bytes.fromhex(cyphertext), keylen, verbose, prune, candidates)
+    with instruments().timer("decode"):
+        return key.decode('ascii'), plaintext.decode('ascii')
+
+
+def brute_xor_bytes(cyphertext: bytes, keylen: int, verbose: bool = False, prune: bool = False,
+                    candidates: KeySpace = None) -> (bytes, bytes):
+    """The bytes version of brute_xor, which takes the raw cyphertext instead of a hex string.
+    :param cyphertext   The encrypted cyphertext as any bytes-like object.
+    :param keylen       The guessed length of the string used as a key.
+    :param verbose      Print all keys of keylen length and their corresponding decryption. Default to False.
+    :param prune        Use the pruned search_xor_keys instead of trying every key. Default to False.
+    :param candidates   The keys to try, any iterable of bytes such as a KeySpace or one of its shards. Defaults to
+                        combinations of printable characters. The pruned search only accepts a ProductSpace.
+    :raises ValueError  if prune is set and candidates is not a ProductSpace.
+    :returns a tuple containing the best guess key and the corresponding decryption, both as bytes"""
+    collector = instruments()
+    if prune and candidates is not None and not isinstance(candidates, ProductSpace):
+        raise ValueError("The pruned search needs a ProductSpace of candidates, not {}".format(
+            type(candidates).__name__))
+    if prune:
+        with collector.timer("search"):
+            results, stats = search_xor_keys(cyphertext, keylen,
+                                             candidates if candidates is not None else PRINTABLE_KEYS)
+        collector.count("candidates", stats.tried)
+        collector.count("pruned", stats.pruned)
+        if verbose:
+            print("Tried {} of {} keys, pruned {}".format(stats.tried, stats.candidates, stats.pruned))
+        return results[0][0], bytes(xor(cyphertext, results[0][0]))
+    if candidates is None:
+        if keylen == 1 and not verbose:
+            # the single character case is scored for all keys at once
+            with collector.timer("score"):
+                key, score = rank_single_byte_xor(cyphertext, 1, PRINTABLE_KEYS)[0]
+            collector.count("candidates", len(PRINTABLE_KEYS))
+            with collector.timer("xor"):
+                return bytes([key]), xor_single_byte(cyphertext, key)
+        # chars is a string of every printable character from 32 to 127 on the ASCII table
+        candidates = CombinationSpace(PRINTABLE_KEYS, keylen)
+
     best_score: int = sys.maxsize  # maximum size of an integer
-    best_key: str = ""
-    best_plaintext: str = ""
+    best_key: bytes = b""
+    best_plaintext: bytes = b""
 
-    for gen_key in combinations_with_replacement(string.printable, keylen):
-        key = "".join(gen_key)
-        plaintext = xor(bytes.fromhex(cyphertext), bytes(key, 'ascii')).decode('ascii')
+    scorer = compile_scorer()
+    decrypt, score_plaintext = collector.timed("xor", xor), collector.timed("score", scorer.score)
+    tried = 0
+    for key in candidates:
+        if not key:
+            continue  # blank lines of a wordlist
+        plaintext = decrypt(cyphertext, key)
         if verbose:
-            print(key, plaintext)
-        score = score_text(plaintext)
+            print(key.decode('ascii', errors='replace'), plaintext.decode('ascii', errors='replace'))
+        score = score_plaintext(plaintext)
+        tried += 1
         if score < best_score:
             best_score = score
             best_key = key
             best_plaintext = plaintext
+    collector.count("candidates", tried)
 
     # return the best results
-    return best_key, best_plaintext
+    return best_key, bytes(best_plaintext)
+
+
+def read_hex_lines(filename: str) -> (int, bytes):
+    """Streams the hex encoded lines of a file with buffered binary reads, so only one line is held in memory.
+    Blank lines and lines which are not hex are skipped, but still counted in the line numbers.
+    :param filename The file containing lines of hex
+    :returns a generator of (line number, decoded bytes) tuples, counting lines from 1.
+    """
+    with open(filename, 'rb') as fp:
+        for line_number, line in enumerate(fp, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield line_number, bytes.fromhex(line.decode('ascii'))
+            except (ValueError, UnicodeDecodeError):
+                continue  # Not hex, so move on
+
+
+def scan_xor_file(filename: str, keylen: int = 1, verbose: bool = False,
+                  batch_size: int = 4096) -> (int, int, str, bytes):
+    """Brute forces every line of a file of XOR encrypted hex lines, yielding a record per line as it goes.
+    Single character keys are cracked batch_size lines at a time with crack_single_byte_xor_batch.
+    :param filename     The file containing lines of XOR cypertext
+    :param keylen       The suspected length of the key
+    :param verbose      Prints the best guess of each line in the file.
+    :param batch_size   The number of lines to crack together when keylen is 1.
+    :returns a generator of (line number, score, key, plaintext bytes) records, where lower scores are better.
+    """
+    scorer = compile_scorer()
+    collector = instruments()
+    read_timer, crack_timer = collector.timer("read"), collector.timer("crack")
+    lines = read_hex_lines(filename)
+    while True:
+        with read_timer:
+            batch = list(islice(lines, batch_size if keylen == 1 else 1))
+        if not batch:
+            break
+        collector.count("lines", len(batch))
+        with crack_timer:
+            if keylen == 1:
+                buffer, offsets = pack_cyphertexts([cypherbytes for line_number, cypherbytes in batch])
+                cracked = crack_single_byte_xor_batch(buffer, offsets, PRINTABLE_KEYS, scorer)
+                records = [(line_number, score, chr(key_byte), xor_single_byte(cypherbytes, key_byte))
+                           for (line_number, cypherbytes), (key_byte, score) in zip(batch, cracked)]
+            else:
+                line_number, cypherbytes = batch[0]
+                key, plaintext = brute_xor_bytes(cypherbytes, keylen, False)
+                records = [(line_number, scorer.score(plaintext), key.decode('ascii'), plaintext)]
+        for line_number, score, key, plaintext in records:
+            if verbose:
+                print("Line {}: Best Key: {}, Resulting Plaintext: {}".format(line_number, key, plaintext))
+            yield line_number, score, key, plaintext
+
+
+def top_xor_lines(filename: str, keylen: int = 1, top: int = 10) -> [(int, int, str, bytes)]:
+    """Finds the lines of a file most likely to be XOR encrypted English, holding at most top records in memory.
+    :param filename The file containing lines of XOR cypertext
+    :param keylen   The suspected length of the key
+    :param top      The number of lines to return.
+    :returns a list of (line number, score, key, plaintext bytes) records, best first. Ties keep file order.
+    """
+    return nsmallest(top, scan_xor_file(filename, keylen), key=lambda l: l[1])
 
 
-def brute_xor_file(filename: str, keylen: int, verbose: bool = False) -> (int, str, str):
+def brute_xor_file(filename: str, keylen: int, verbose: bool = False,
+                   cache: ResultCache = None) -> (int, str, str):
     """Applies the brute force algorithm on an entire file where each file has been
     XOR encrypted line by line to find which line was encrypted and what the decrypted message
     reads as.
     :param filename The file containing lines of XOR cypertext
     :param keylen   The suspected length of the key
     :param verbose  Prints the best guess of each line in the file.
+    :param cache    A ResultCache to look the answer up in, keyed on the file contents, and to store it in.
     :returns a tuple containing the best guess line number, the best guess key, and the
                 corresponding decrypted string.
     """
-    # First, read in the file
-    with open(filename) as fp:
-        line_number = 0
-        best_score: int = sys.maxsize  # maximum size of an integer
-        best_key: str = ""
-        best_plaintext: str = ""
-        best_line_number: int = 0
-        while True:
-            line_number += 1
-            line = fp.readline().strip()
-            if not line:
-                if verbose:
-                    print("Reached end of file")
-                break
-            # Now we can do processing on the line
-            # print("Line {}: {}".format(line_number, line.strip()))
-            try:
-                hex_to_ascii(line)
-            except UnicodeDecodeError:
-                # Not hex, so move on
-                if verbose:
-                    print("Line {}: Not Hex encoded, skipping".format(line_number))
-                continue
-            key, plaintext = brute_xor(line, keylen, False)
-            score = score_text(plaintext)
-            if score < best_score:
-                best_score = score
-                best_key = key
-                best_plaintext = plaintext
-                best_line_number = line_number
-            if verbose:
-                print("Line {}: Best Key: {}, Resulting Plaintext: {}".format(line_number, key, plaintext))
-        # return best guess from the entire file
-        return best_line_number, best_key, best_plaintext
+    if cache is not None:
+        result_key = cache_key("brute_xor_file", file_digest(filename), BREAKER_VERSIONS["brute_xor_file"],
+                               keylen, DEFAULT_FREQUENCY)
+        cached = cache.get(result_key)
+        instruments().count("cache_hits" if cached is not None else "cache_misses")
+        if cached is not None:
+            return cached[:3]
+    best = nsmallest(1, scan_xor_file(filename, keylen, verbose), key=lambda l: l[1])
+    if not best:
+        return 0, "", ""
+    line_number, score, key, plaintext = best[0]
+    result = line_number, key, plaintext.decode('ascii', errors='replace')
+    if cache is not None:
+        cache.put(result_key, result + (score,))
+    return result
 
 
 def brute_repeating_key_xor(cyphertext: str, maxkeylen: int, verbose: bool = False) -> (str, str):
@@ -87,111 +338,164 @@ def brute_repeating_key_xor(cyphertext: str, maxkeylen: int, verbose: bool = Fal
     :param verbose Print processing data out to the console, defaults to False.
     :returns A tuple which contains the key and plaintext, provided the key is smaller than maxkeylen.
     """
+    key, plaintext = brute_repeating_key_xor_bytes(bytes(cyphertext, 'ascii'), maxkeylen, verbose)
+    with instruments().timer("decode"):
+        return key.decode(), plaintext.decode()
+
+
+def brute_repeating_key_xor_bytes(cyphertext: bytes, maxkeylen: int, verbose: bool = False) -> (bytes, bytes):
+    """The bytes version of brute_repeating_key_xor, which tries every key size from 2 to maxkeylen.
+    :param cyphertext The cypher text we want to break, as any bytes-like object.
+    :param maxkeylen The maximum key length to attempt to break before giving up.
+    :param verbose Print processing data out to the console, defaults to False.
+    :returns A tuple which contains the key and plaintext as bytes, provided the key is smaller than maxkeylen.
+    """
+    return break_key_lengths(cyphertext, range(2, maxkeylen + 1), verbose)
+
+
+def break_key_lengths(cyphertext: bytes, key_lengths: [int], verbose: bool) -> (bytes, bytes):
+    """Breaks a repeating-key XOR for each guessed key length and returns the guess which scores best.
+    :param cyphertext The cypher text we want to break, as any bytes-like object.
+    :param key_lengths The key lengths to try, earlier key lengths win ties.
+    :param verbose Print processing data out to the console.
+    :returns A tuple which contains the key and plaintext as bytes.
+    """
+    cyphertext = bytes(cyphertext)
+    scorer = compile_scorer()
+    collector = instruments()
+    solve_timer, xor_timer, score_timer = collector.timer("solve"), collector.timer("xor"), collector.timer("score")
     guesses = []
-    # iterate over all possible key sizes
-    for key_len in range(2, maxkeylen + 1):
-        # given a guessed key length, break the cyphertext into blocks of key_len size
-        blocks = [cyphertext[i:i + key_len] for i in range(0, len(cyphertext), key_len)]
-        # transpose the blocks
-        transposed = [""] * key_len
-        for block in blocks:
-            for i in range(0, len(block)):
-                transposed[i] += block[i]
+    # given a guessed key length, every key_len-th byte was XORed with the same key byte
+    # the columns of every key length are views of the one cyphertext buffer
+    columns = transpositions(cyphertext, key_lengths)
+    for key_len in key_lengths:
+        start = perf_counter()
         # solve each transposed block as if it were a single-character XOR
-        guessed_key = ""
-        for block in transposed:
-            key_character, guessed_plaintext = brute_xor(ascii_to_hex(block), 1, False)
-            guessed_key += key_character
+        with solve_timer:
+            guessed_key = bytes(rank_single_byte_xor(column, 1, PRINTABLE_KEYS, scorer)[0][0]
+                                for column in columns[key_len])
         # Assuming each single letter break was successful, we probably have the key, attempt decryption
         if verbose:
-            print("The key could be: {}".format(guessed_key))
-        guessed_plaintext = xor(bytes(cyphertext, 'ascii'), bytes(guessed_key, 'ascii')).decode()
-        guessed_score = score_text(guessed_plaintext)
+            print("The key could be: {}".format(guessed_key.decode()))
+        with xor_timer:
+            guessed_plaintext = bytes(xor(cyphertext, guessed_key))
+        with score_timer:
+            guessed_score = scorer.score(guessed_plaintext)
         guesses.append((guessed_key, guessed_plaintext, guessed_score))
+        if collector.enabled:
+            seconds = perf_counter() - start
+            collector.record("key_length.{}".format(key_len), seconds)
+            collector.count("candidates", key_len * len(PRINTABLE_KEYS))
+            collector.event("key_length", key_len=key_len, key=guessed_key, score=guessed_score, seconds=seconds)
     # we now have a list of the likeliest keys, plain-texts, and scores. Return the best
     guesses.sort(key=lambda l: l[2])  # sort by the guessed score from before
     if verbose:
         print("Top guesses for keys and plaintext")
         for key, plaintext, score in guesses:
-            print("Key: {}, Plaintext: {}".format(key, (plaintext[:15] + '...') if len(plaintext) > 15 else plaintext))
+            print("Key: {}, Plaintext: {}".format(key.decode(), plaintext[:15] + b'...' if len(plaintext) > 15
+                                                  else plaintext))
     return guesses[0][0], guesses[0][1]
 
 
-def break_repeating_key_xor(cyphertext: str, maxkeylen: int, verbose: bool = False) -> (str, str):
+def likely_key_sizes(cyphertext: bytes, maxkeylen: int, verbose: bool = False,
+                     confidence: float = KEY_SIZE_CONFIDENCE, limit: int = 5) -> [(int, float)]:
+    """Estimates every key size from 2 to maxkeylen and picks the ones worth fully breaking, see estimate_key_sizes.
+    Key sizes are taken most confident first until together they are confidence sure to hold the real one, so a
+    decisive estimate costs a single full solve and an unsure one up to limit.
+    :param cyphertext The encrypted bytes.
+    :param maxkeylen The maximum key length to consider.
+    :param verbose Print the estimate of every key size, defaults to False.
+    :param confidence How sure the chosen key sizes should be, together, to include the real one.
+    :param limit The most key sizes to choose.
+    :returns A list of (key size, confidence) tuples, most confident first.
+    """
+    estimates = estimate_key_sizes(cyphertext, range(2, maxkeylen + 1))
+    if verbose:
+        for estimate in estimates:
+            print("Key Length: {}, Distance: {:.3f}, Coincidence: {:.4f}, Confidence: {:.4f}{}".format(
+                estimate.key_size, estimate.distance, estimate.coincidence, estimate.confidence,
+                ", multiple of {}".format(estimate.multiple_of) if estimate.multiple_of else ""))
+    scores = []
+    total = 0.0
+    for estimate in estimates[:limit]:
+        scores.append((estimate.key_size, estimate.confidence))
+        total += estimate.confidence
+        if total >= confidence:
+            break
+    instruments().count("key_sizes_skipped", len(estimates) - len(scores))
+    return scores
+
+
+def break_repeating_key_xor(cyphertext: str, maxkeylen: int, verbose: bool = False,
+                            cache: ResultCache = None) -> (str, str):
     """Given cypher text which has been encrypted with a repeating key XOR cypher,
     break the cypher and return the key and the plaintext.
     :param cyphertext The cypher text we want to break
     :param maxkeylen The maximum key length to attempt to break before giving up.
     :param verbose Print processing data out to the console, defaults to False.
+    :param cache A ResultCache to look the answer up in and to store it in, defaults to no caching.
     :returns A tuple which contains the key and plaintext, provided the key is smaller than maxkeylen.
     """
+    key, plaintext = break_repeating_key_xor_bytes(bytes(cyphertext, 'ascii'), maxkeylen, verbose, cache)
+    with instruments().timer("decode"):
+        return key.decode(), plaintext.decode()
+
+
+def break_repeating_key_xor_bytes(cyphertext: bytes, maxkeylen: int, verbose: bool = False,
+                                  cache: ResultCache = None) -> (bytes, bytes):
+    """The bytes version of break_repeating_key_xor, which only fully breaks the likeliest key sizes.
+    :param cyphertext The cypher text we want to break, as any bytes-like object.
+    :param maxkeylen The maximum key length to attempt to break before giving up.
+    :param verbose Print processing data out to the console, defaults to False.
+    :param cache A ResultCache to look the answer up in and to store it in, defaults to no caching.
+    :returns A tuple which contains the key and plaintext as bytes, provided the key is smaller than maxkeylen.
+    """
+    if cache is not None:
+        result_key = cache_key("break_repeating_key_xor", cyphertext, BREAKER_VERSIONS["break_repeating_key_xor"],
+                               maxkeylen, DEFAULT_FREQUENCY)
+        cached = cache.get(result_key)
+        instruments().count("cache_hits" if cached is not None else "cache_misses")
+        if cached is not None:
+            return cached[:2]
+        key, plaintext = break_repeating_key_xor_bytes(cyphertext, maxkeylen, verbose)
+        cache.put(result_key, (key, plaintext, compile_scorer().score(plaintext)))
+        return key, plaintext
     # iterate over all possible key sizes and guess which size is likely the key
     if verbose:
-        print("Scoring Key Sizes to determine likely key size. Lower scores are better.")
-    # Collect a list of all key sizes and scores
-    scores = []
-    for key_len in range(2, maxkeylen + 1):
-        # take the first keysize worth of bytes and the second keysize worth of bytes and find their hamming distance
-        blocks = [cyphertext[i:i + key_len] for i in range(0, len(cyphertext), key_len)]
-        distance = 0
-        for i in range(1, len(blocks)):
-            distance += hamming_distance(blocks[0], blocks[i]) / key_len  # normalizing along key lengths
-        distance /= len(blocks)  # average of all hamming distances
-        scores.append((key_len, distance))
-        if verbose:
-            print("Key Length: {}, Score: {}".format(key_len, distance))
-    scores.sort(key=lambda l: l[1])  # sort the scores from lowest to highest since lower is better
-    scores = scores[:5] + scores[-5:]  # truncate to only use the five outer scores (or less if maxkeylen is < 5)
+        print("Estimating key sizes to determine the likely key size. Higher confidences are better.")
+    with instruments().timer("key_sizes"):
+        scores = likely_key_sizes(cyphertext, maxkeylen, verbose)
     if verbose:
         print()  # add whitespace to output
-        print("Top {} likely key lengths and their scores:".format(len(scores)))
-        for key_size, score in scores:
-            print("Key length: {} with score {}".format(key_size, score))
+        print("Top {} likely key lengths and their confidences:".format(len(scores)))
+        for key_size, key_confidence in scores:
+            print("Key length: {} with confidence {:.4f}".format(key_size, key_confidence))
         print()
+    return break_key_lengths(cyphertext, [key_len for key_len, score in scores], verbose)
 
-    # note that the below code is confirmed to work because it is the same as in the brute force function.
-    guesses = []
-    for key_len, score in scores:
-        # we probably know the key size, break the cyphertext into blocks of key_len size
-        blocks = [cyphertext[i:i + key_len] for i in range(0, len(cyphertext), key_len)]
-        # transpose the blocks
-        transposed = [""] * key_len
-        for block in blocks:
-            for i in range(0, len(block)):
-                transposed[i] += block[i]
-        # solve each transposed block as if it were a single-character XOR
-        guessed_key = ""
-        for block in transposed:
-            key_character, guessed_plaintext = brute_xor(ascii_to_hex(block), 1, False)
-            guessed_key += key_character
-        # Assuming each single letter break was successful, we probably have the key, attempt decryption
-        if verbose:
-            print("The key could be: {}".format(guessed_key))
-        guessed_plaintext = xor(bytes(cyphertext, 'ascii'), bytes(guessed_key, 'ascii')).decode()
-        guessed_score = score_text(guessed_plaintext)
-        guesses.append((guessed_key, guessed_plaintext, guessed_score))
-    # we now have a list of the likeliest keys, plain-texts, and scores. Return the best
-    guesses.sort(key=lambda l: l[2])  # sort by the guessed score from before
-    if verbose:
-        print("Top guesses for keys and plaintext")
-        for key, plaintext, score in guesses:
-            print("Key: {}, Plaintext: {}".format(key, (plaintext[:15] + '...') if len(plaintext) > 15 else plaintext))
-    return guesses[0][0], guesses[0][1]
+
+def scan_ecb_file(filename: str, block_size: int = 16) -> (int, BlockStats):
+    """Streams the hex encoded lines of a file and indexes the blocks of each to find repeats, the mark of ECB.
+    :param filename: The name of the file to check
+    :param block_size: The block size of the cypher in bytes.
+    :return: A generator of (line number, BlockStats) tuples, see block_statistics.
+    """
+    for line_number, cypherbytes in read_hex_lines(filename):
+        yield line_number, block_statistics(cypherbytes, block_size)
 
 
-def find_ecb_line(filename: str) -> int:
+def find_ecb_line(filename: str, block_size: int = 16) -> int:
     """
     Reads each line in a file and scores them on their likelihood of being ECB encrypted.
     :param filename: The name of the file to check
+    :param block_size: The block size of the cypher in bytes.
     :return: The line number most likely to be an ECB encrypted string
     """
-    with open(filename) as file:
-        lines = file.readlines()
     most_repeats = 0
     most_repeated_line = 0
-    for index, line in enumerate(lines):
-        score = percent_repeated_blocks(line)
+    for line_number, stats in scan_ecb_file(filename, block_size):
+        score = stats.repeated_blocks / stats.blocks if stats.blocks else 0
         if score > most_repeats:
             most_repeats = score
-            most_repeated_line = index + 1
+            most_repeated_line = line_number
     return most_repeated_line
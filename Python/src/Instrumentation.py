@@ -0,0 +1,193 @@
+# Counters, timers and profiling hooks for the breakers in CodeBreakers. Instrumentation is off unless a block of
+# code runs inside instrumented(), and while it is off every hook is a call on a shared object that does nothing.
+
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+import cProfile
+import logging
+import pstats
+import threading
+import tracemalloc
+
+LOGGER = logging.getLogger("CodeBreakers")
+
+
+class _Timer:
+    """Adds the time spent inside a with block to one of an Instruments' timings. Reusable, but not reentrant."""
+
+    def __init__(self, instruments, name: str):
+        self.instruments = instruments
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.instruments.record(self.name, perf_counter() - self.start)
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+
+class Instruments:
+    """Collects what the breakers did while instrumented: counters, total seconds and calls per timer, and events.
+    Events go to the callback, if there is one, and to the CodeBreakers logger at DEBUG level."""
+
+    enabled = True
+
+    def __init__(self, callback=None, logger: logging.Logger = LOGGER):
+        """
+        :param callback: Called as callback(name, fields) with every event, fields being a dictionary.
+        :param logger: The logger events are written to.
+        """
+        self.callback = callback
+        self.logger = logger
+        self.counters = Counter()
+        self.timings = Counter()  # timer name -> total seconds
+        self.calls = Counter()  # timer name -> number of timed blocks
+        self.profile: pstats.Stats = None  # set by instrumented(profile=True)
+        self.memory: (int, int) = None  # the (current, peak) traced bytes, set by instrumented(trace_memory=True)
+
+    def count(self, name: str, amount: int = 1):
+        self.counters[name] += amount
+
+    def timer(self, name: str) -> _Timer:
+        """A context manager which adds the time spent inside it to the named timing."""
+        return _Timer(self, name)
+
+    def timed(self, name: str, function):
+        """Wraps a function so the time spent in every call is added to the named timing. Wrap hot functions once
+        before a loop, since with instrumentation off the function is returned as it is and costs nothing extra."""
+        timings, calls = self.timings, self.calls
+
+        def timed_function(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                timings[name] += perf_counter() - start
+                calls[name] += 1
+        return timed_function
+
+    def record(self, name: str, seconds: float):
+        self.timings[name] += seconds
+        self.calls[name] += 1
+
+    def event(self, name: str, **fields):
+        """Reports something that happened, like a key length being broken, with the details as keyword arguments."""
+        if self.callback is not None:
+            self.callback(name, fields)
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("%s %s", name, " ".join("{}={!r}".format(key, value) for key, value in fields.items()))
+
+    def report(self) -> str:
+        """A human readable summary of the counters and timings, slowest timers first."""
+        lines = ["{:<32} {:>12}".format(name, count) for name, count in sorted(self.counters.items())]
+        for name, seconds in self.timings.most_common():
+            lines.append("{:<32} {:>12.6f} s over {} calls".format(name, seconds, self.calls[name]))
+        if self.memory is not None:
+            lines.append("{:<32} {:>12} bytes".format("peak traced memory", self.memory[1]))
+        return "\n".join(lines)
+
+
+class _NullInstruments(Instruments):
+    """The instruments in use when instrumentation is off. Every hook does nothing."""
+
+    enabled = False
+    _timer = _NullTimer()
+
+    def count(self, name: str, amount: int = 1):
+        pass
+
+    def timer(self, name: str) -> _NullTimer:
+        return self._timer
+
+    def timed(self, name: str, function):
+        return function
+
+    def record(self, name: str, seconds: float):
+        pass
+
+    def event(self, name: str, **fields):
+        pass
+
+
+NULL_INSTRUMENTS = _NullInstruments()
+# a context variable rather than a global so concurrent tasks and threads can be instrumented separately
+_active = ContextVar('instruments', default=NULL_INSTRUMENTS)
+
+
+class _MemoryTrace:
+    """The tracemalloc bookkeeping of one instrumented(trace_memory=True) block. tracemalloc has a single peak for
+    the whole process, so every block that resets it first folds it into the peaks of the other open blocks, in any
+    thread, and tracing is only stopped when the last open block ends, if one of the blocks started it."""
+
+    _lock = threading.Lock()
+    _open = []  # the traces of the open blocks, guarded by _lock
+    _started = False  # whether an open block started tracing, rather than the caller
+
+    def __init__(self):
+        with self._lock:
+            if not self._open and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _MemoryTrace._started = True
+            else:
+                peak = tracemalloc.get_traced_memory()[1]
+                for trace in self._open:
+                    trace.peak = max(trace.peak, peak)
+                tracemalloc.reset_peak()
+            self.baseline = self.peak = tracemalloc.get_traced_memory()[0]
+            self._open.append(self)
+
+    def stop(self) -> (int, int):
+        """Ends the block.
+        :return: The (current, peak) bytes traced since the block began."""
+        with self._lock:
+            current, peak = tracemalloc.get_traced_memory()
+            self._open.remove(self)
+            if not self._open and self._started:
+                tracemalloc.stop()
+                _MemoryTrace._started = False
+        return current - self.baseline, max(self.peak, peak) - self.baseline
+
+
+def instruments() -> Instruments:
+    """The instruments of the current context, which do nothing unless called inside instrumented()."""
+    return _active.get()
+
+
+@contextmanager
+def instrumented(collector: Instruments = None, profile: bool = False, trace_memory: bool = False):
+    """Turns instrumentation on for a block of code. Work done in other processes, such as the process pools of
+    ParallelBreakers and JobService, is not collected.
+    :param collector: The Instruments to collect into, defaults to a new one.
+    :param profile: Run the block under cProfile and keep the pstats.Stats in the collector's profile.
+    :param trace_memory: Trace allocations with tracemalloc and keep the (current, peak) bytes allocated by the
+                         block in its memory. Tracing that was already on, in an enclosing block, another thread or
+                         by the caller, is left on, and the block's bytes are measured from what was traced when it
+                         began. Allocations by other threads running at the same time are counted too.
+    :return: A context manager giving the Instruments."""
+    collector = collector or Instruments()
+    token = _active.set(collector)
+    profiler = cProfile.Profile() if profile else None
+    memory_trace = _MemoryTrace() if trace_memory else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield collector
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            collector.profile = pstats.Stats(profiler)
+        if memory_trace is not None:
+            collector.memory = memory_trace.stop()
+        _active.reset(token)
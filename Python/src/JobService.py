@@ -0,0 +1,239 @@
+# An asyncio front end over CodeBreakers. Every job is split into small steps which run in a bounded process pool,
+# so many jobs can share the pool, report progress between steps, and be cancelled or timed out between steps.
+
+import asyncio
+import itertools
+from collections import namedtuple
+from concurrent.futures import Executor, ProcessPoolExecutor
+from Python.src.CodeBreakers import *
+
+# A progress report: how many of the job's steps are done out of how many, and the best result found so far,
+# in the same format as the job's final result.
+Progress = namedtuple('Progress', ['job_id', 'completed', 'total', 'best'])
+
+PENDING, RUNNING, DONE, FAILED, CANCELLED, TIMED_OUT = "pending", "running", "done", "failed", "cancelled", "timeout"
+_FINISHED = object()  # marks the end of a job's progress queue
+
+
+def _crack_lines(batch: [(int, bytes)], keylen: int) -> [(int, float, str, bytes)]:
+    """Process pool step of a brute_xor_file job: cracks a batch of lines.
+    :param batch: (line number, cyphertext bytes) tuples.
+    :param keylen: The suspected length of the key.
+    :return: A (line number, score, key, plaintext) record per line, like scan_xor_file."""
+    scorer = compile_scorer()
+    if keylen == 1:
+        buffer, offsets = pack_cyphertexts([cypherbytes for line_number, cypherbytes in batch])
+        cracked = crack_single_byte_xor_batch(buffer, offsets, PRINTABLE_KEYS, scorer)
+        return [(line_number, score, chr(key), xor_single_byte(cypherbytes, key))
+                for (line_number, cypherbytes), (key, score) in zip(batch, cracked)]
+    records = []
+    for line_number, cypherbytes in batch:
+        key, plaintext = brute_xor_bytes(cypherbytes, keylen)
+        records.append((line_number, scorer.score(plaintext), key.decode('ascii'), plaintext))
+    return records
+
+
+def _ecb_lines(batch: [(int, bytes)], block_size: int) -> [(int, float)]:
+    """Process pool step of a find_ecb_line job: scores a batch of lines on their repeated blocks.
+    :param batch: (line number, cyphertext bytes) tuples.
+    :param block_size: The block size of the cypher in bytes.
+    :return: A (line number, fraction of repeated blocks) tuple per line."""
+    scores = []
+    for line_number, cypherbytes in batch:
+        stats = block_statistics(cypherbytes, block_size)
+        scores.append((line_number, stats.repeated_blocks / stats.blocks if stats.blocks else 0))
+    return scores
+
+
+def _solve_key_length(cyphertext: bytes, key_len: int) -> (bytes, bytes, float):
+    """Process pool step of a break_repeating_key_xor job: fully breaks one guessed key length.
+    :param cyphertext: The encrypted bytes.
+    :param key_len: The guessed key length.
+    :return: The guessed key, plaintext and score."""
+    key, plaintext = break_key_lengths(cyphertext, [key_len], False)
+    return key, plaintext, compile_scorer().score(plaintext)
+
+
+class Job:
+    """A breaking job submitted to a JobService. Await result() for the answer, or iterate updates() for progress."""
+
+    def __init__(self, job_id: int, kind: str):
+        self.id = job_id
+        self.kind = kind
+        self.status = PENDING
+        self.best = None  # the best result so far, in the format of the final result
+        self._queue = asyncio.Queue()
+        self._task: asyncio.Task = None
+
+    def __repr__(self):
+        return "Job({}, {!r}, {})".format(self.id, self.kind, self.status)
+
+    async def result(self):
+        """Waits for the job to finish.
+        :return: The same result the matching CodeBreakers function returns.
+        :raises asyncio.CancelledError: if the job was cancelled.
+        :raises asyncio.TimeoutError: if the job ran out of time."""
+        return await asyncio.shield(self._task)
+
+    def cancel(self) -> bool:
+        """Cancels the job. Steps already running in the pool finish, but their results are ignored.
+        :return: False if the job had already finished."""
+        return self._task.cancel()
+
+    def done(self) -> bool:
+        return self._task.done()
+
+    async def updates(self) -> Progress:
+        """Streams the job's progress reports until it finishes, for one consumer.
+        :return: An async generator of Progress tuples."""
+        while True:
+            progress = await self._queue.get()
+            if progress is _FINISHED:
+                return
+            yield progress
+
+
+class JobService:
+    """Runs CodeBreakers jobs concurrently. Use it as an async context manager, or call shutdown() when finished.
+    The service runs in the caller's event loop, so tests and local tools use it directly without any network."""
+
+    KINDS = ("brute_xor", "brute_xor_file", "break_repeating_key_xor", "find_ecb_line")
+
+    def __init__(self, workers: int = None, executor: Executor = None, batch_size: int = 4096):
+        """
+        :param workers: The size of the process pool, defaults to the number of CPUs.
+        :param executor: An executor to use instead of a process pool, such as a ThreadPoolExecutor in tests.
+                         It is not shut down by the service.
+        :param batch_size: The number of lines per step of the file jobs.
+        """
+        self._owns_executor = executor is None
+        self._executor = executor or ProcessPoolExecutor(workers)
+        self._batch_size = batch_size
+        self._ids = itertools.count(1)
+        self.jobs = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.shutdown()
+
+    async def shutdown(self, cancel: bool = True):
+        """Stops the service.
+        :param cancel: Cancel the unfinished jobs, otherwise wait for them."""
+        unfinished = [job._task for job in self.jobs.values() if not job._task.done()]
+        if cancel:
+            for task in unfinished:
+                task.cancel()
+        await asyncio.gather(*unfinished, return_exceptions=True)
+        if self._owns_executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def submit(self, kind: str, *args, timeout: float = None) -> Job:
+        """Starts a job. Must be called from inside the service's event loop.
+        :param kind: The CodeBreakers function to run, one of JobService.KINDS.
+        :param args: The arguments of that function, without verbose.
+        :param timeout: Seconds before the job is stopped with a TimeoutError, or None to wait forever.
+        :return: The Job."""
+        if kind not in self.KINDS:
+            raise ValueError("Unknown job kind {!r}, expected one of {}".format(kind, ", ".join(self.KINDS)))
+        job = Job(next(self._ids), kind)
+        job._task = asyncio.get_running_loop().create_task(self._run(job, getattr(self, "_" + kind)(job, *args),
+                                                                     timeout))
+        self.jobs[job.id] = job
+        return job
+
+    async def _run(self, job: Job, steps, timeout: float):
+        """Drives a job's steps, keeping its status up to date and closing its progress stream at the end."""
+        job.status = RUNNING
+        try:
+            result = await asyncio.wait_for(steps, timeout)
+            job.status = DONE
+            return result
+        except asyncio.TimeoutError:
+            job.status = TIMED_OUT
+            raise
+        except asyncio.CancelledError:
+            job.status = CANCELLED
+            raise
+        except Exception:
+            job.status = FAILED
+            raise
+        finally:
+            job._queue.put_nowait(_FINISHED)
+
+    async def _step(self, function, *args):
+        """Runs one CPU heavy step in the pool."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    def _report(self, job: Job, completed: int, total: int, best):
+        job.best = best
+        job._queue.put_nowait(Progress(job.id, completed, total, best))
+
+    async def _read_batches(self, filename: str):
+        """Reads the hex lines of a file in batches, in a thread so the event loop never blocks on the disk."""
+        lines = read_hex_lines(filename)
+        loop = asyncio.get_running_loop()
+        read = None
+        try:
+            while True:
+                read = loop.run_in_executor(None, lambda: list(islice(lines, self._batch_size)))
+                batch = await asyncio.shield(read)  # so read only finishes when the thread does
+                if not batch:
+                    return
+                yield batch
+        finally:
+            if read is None or read.done():
+                lines.close()
+            else:  # cancelled mid read, the thread still owns the file until the read finishes
+                read.add_done_callback(lambda future: lines.close())
+
+    async def _brute_xor(self, job: Job, cyphertext: str, keylen: int) -> (str, str):
+        result = await self._step(brute_xor, cyphertext, keylen)
+        self._report(job, 1, 1, result)
+        return result
+
+    async def _brute_xor_file(self, job: Job, filename: str, keylen: int) -> (int, str, str):
+        best = None
+        completed = 0
+        async for batch in self._read_batches(filename):
+            for record in await self._step(_crack_lines, batch, keylen):
+                if best is None or record[1] < best[1]:
+                    best = record
+            completed += len(batch)
+            # the total is unknown until the whole file is read
+            self._report(job, completed, None, (best[0], best[2], best[3].decode('ascii', errors='replace')))
+        if best is None:
+            return 0, "", ""
+        return job.best
+
+    async def _break_repeating_key_xor(self, job: Job, cyphertext: str, maxkeylen: int) -> (str, str):
+        cypherbytes = bytes(cyphertext, 'ascii')
+        scores = await self._step(likely_key_sizes, cypherbytes, maxkeylen)
+        key_lengths = list(dict.fromkeys(key_len for key_len, score in scores))
+        steps = [asyncio.ensure_future(self._step(_solve_key_length, cypherbytes, key_len))
+                 for key_len in key_lengths]
+        best = None
+        try:
+            for completed, step in enumerate(asyncio.as_completed(steps), 1):
+                key, plaintext, score = await step
+                # break ties in favour of the likelier key length, like break_repeating_key_xor
+                rank = (score, key_lengths.index(len(key)))
+                if best is None or rank < best[0]:
+                    best = (rank, key.decode(), plaintext.decode())
+                self._report(job, completed, len(steps), best[1:])
+        finally:
+            for step in steps:
+                step.cancel()
+        return best[1:]
+
+    async def _find_ecb_line(self, job: Job, filename: str, block_size: int = 16) -> int:
+        best_line, best_score = 0, 0
+        completed = 0
+        async for batch in self._read_batches(filename):
+            for line_number, score in await self._step(_ecb_lines, batch, block_size):
+                if score > best_score:
+                    best_line, best_score = line_number, score
+            completed += len(batch)
+            self._report(job, completed, None, best_line)
+        return best_line
@@ -0,0 +1,247 @@
+# Candidate key generators for the brute force breakers. Every key space is lazy, has a length, and can be
+# split into index ranges so separate workers can each take a shard of the same space.
+
+from abc import ABC, abstractmethod
+from itertools import combinations_with_replacement, islice
+from math import comb, prod
+import string
+
+# the character classes of mask patterns, like the ones password crackers use
+MASK_CLASSES = {
+    'l': string.ascii_lowercase.encode(),
+    'u': string.ascii_uppercase.encode(),
+    'd': string.digits.encode(),
+    's': (' ' + string.punctuation).encode(),
+    'a': (string.ascii_letters + string.digits + ' ' + string.punctuation).encode(),
+    'p': string.printable.encode(),
+    'b': bytes(range(256)),
+}
+
+
+class KeySpace(ABC):
+    """A lazily generated sequence of candidate keys, as bytes. Subclasses must implement __len__ and shard."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """The number of keys in the space."""
+
+    @abstractmethod
+    def shard(self, start: int, stop: int) -> iter:
+        """Generates the keys with indices start (inclusive) to stop (exclusive).
+        :param start: The index of the first key.
+        :param stop: The index after the last key.
+        :return: An iterator of keys as bytes."""
+
+    def __iter__(self):
+        return self.shard(0, len(self))
+
+    def key_at(self, index: int) -> bytes:
+        """The key at an index of the space.
+        :param index: The index of the key, from 0 to len(self) - 1.
+        :return: The key as bytes."""
+        if not 0 <= index < len(self):
+            raise IndexError("key index out of range")
+        return next(self.shard(index, index + 1))
+
+    def shards(self, count: int) -> [(int, int)]:
+        """Splits the space into count contiguous index ranges of nearly equal size, one per worker.
+        :param count: The number of shards.
+        :return: A list of (start, stop) tuples to pass to shard."""
+        size = len(self)
+        return [(size * i // count, size * (i + 1) // count) for i in range(count)]
+
+
+class ProductSpace(KeySpace):
+    """Every key with one byte from each of a list of per-position alphabets, in lexicographic order.
+    This covers every ordering of the bytes, so "ab" and "ba" are both tried."""
+
+    def __init__(self, alphabets: [bytes]):
+        """
+        :param alphabets: The possible bytes of each position of the key, in the order to try them.
+        """
+        self.alphabets = [bytes(alphabet) for alphabet in alphabets]
+
+    def __len__(self) -> int:
+        return prod(len(alphabet) for alphabet in self.alphabets)
+
+    def key_at(self, index: int) -> bytes:
+        if not 0 <= index < len(self):
+            raise IndexError("key index out of range")
+        key = bytearray(len(self.alphabets))
+        for position in range(len(self.alphabets) - 1, -1, -1):  # the last position changes fastest
+            index, digit = divmod(index, len(self.alphabets[position]))
+            key[position] = self.alphabets[position][digit]
+        return bytes(key)
+
+    def shard(self, start: int, stop: int) -> iter:
+        stop = min(stop, len(self))
+        if start >= stop:
+            return
+        # convert the start index into digits once, then count up like an odometer
+        digits = []
+        index = start
+        for alphabet in reversed(self.alphabets):
+            index, digit = divmod(index, len(alphabet))
+            digits.append(digit)
+        digits.reverse()
+        key = bytearray(alphabet[digit] for alphabet, digit in zip(self.alphabets, digits))
+        for _ in range(stop - start):
+            yield bytes(key)
+            position = len(digits) - 1
+            while position >= 0:
+                digits[position] += 1
+                if digits[position] < len(self.alphabets[position]):
+                    key[position] = self.alphabets[position][digits[position]]
+                    break
+                digits[position] = 0
+                key[position] = self.alphabets[position][0]
+                position -= 1
+
+
+class AlphabetSpace(ProductSpace):
+    """Every key of a fixed length drawn from one alphabet, in every order."""
+
+    def __init__(self, alphabet: bytes, length: int):
+        """
+        :param alphabet: The possible bytes of the key, in the order to try them.
+        :param length: The length of the key.
+        """
+        super().__init__([alphabet] * length)
+
+
+class ByteSpace(AlphabetSpace):
+    """Every possible key of a fixed length, all 256 values for every byte."""
+
+    def __init__(self, length: int):
+        """
+        :param length: The length of the key.
+        """
+        super().__init__(bytes(range(256)), length)
+
+
+class MaskSpace(ProductSpace):
+    """Keys matching a mask pattern, where ?l, ?u, ?d, ?s, ?a, ?p and ?b stand for a lowercase letter, an uppercase
+    letter, a digit, a space or punctuation, any of those, any printable character, and any byte. ?? is a literal
+    question mark and every other character stands for itself, so "Key?d?d" is "Key00" to "Key99"."""
+
+    def __init__(self, mask: str):
+        """
+        :param mask: The mask pattern.
+        """
+        alphabets = []
+        position = 0
+        while position < len(mask):
+            if mask[position] == '?':
+                if position + 1 >= len(mask):
+                    raise ValueError("mask ends in an unfinished '?' class")
+                symbol = mask[position + 1]
+                if symbol == '?':
+                    alphabets.append(b'?')
+                elif symbol in MASK_CLASSES:
+                    alphabets.append(MASK_CLASSES[symbol])
+                else:
+                    raise ValueError("unknown mask class ?{}".format(symbol))
+                position += 2
+            else:
+                alphabets.append(mask[position].encode())
+                position += 1
+        super().__init__(alphabets)
+        self.mask = mask
+
+
+class CombinationSpace(KeySpace):
+    """Keys made of sorted combinations of an alphabet with repeats, the key space brute_xor has always used.
+    It is much smaller than an AlphabetSpace, but only contains one ordering of every multiset of bytes.
+    A shard unranks its start index directly, so every worker's shard costs the same however late it starts."""
+
+    def __init__(self, alphabet: bytes, length: int):
+        """
+        :param alphabet: The possible bytes of the key.
+        :param length: The length of the key.
+        """
+        self.alphabet = bytes(alphabet)
+        self.length = length
+
+    def __len__(self) -> int:
+        return comb(len(self.alphabet) + self.length - 1, self.length)
+
+    def shard(self, start: int, stop: int) -> iter:
+        if start == 0:
+            yield from map(bytes, islice(combinations_with_replacement(self.alphabet, self.length), stop))
+            return
+        stop = min(stop, len(self))
+        if start >= stop:
+            return
+        # unrank the start index into non-decreasing alphabet indices, then step through the combinations in order
+        size = len(self.alphabet)
+        indices = []
+        index = start
+        low = 0
+        for remaining in range(self.length - 1, -1, -1):
+            # the number of combinations which put alphabet index low here, and so skipping past them
+            while index >= (count := comb(size - low + remaining - 1, remaining)):
+                index -= count
+                low += 1
+            indices.append(low)
+        key = bytearray(self.alphabet[i] for i in indices)
+        for _ in range(stop - start):
+            yield bytes(key)
+            position = self.length - 1
+            while position >= 0 and indices[position] == size - 1:
+                position -= 1
+            if position < 0:
+                return
+            digit = indices[position] + 1
+            indices[position:] = [digit] * (self.length - position)
+            key[position:] = bytes([self.alphabet[digit]]) * (self.length - position)
+
+
+class WordlistSpace(KeySpace):
+    """Keys read lazily from a wordlist file, one key per line. Only the current line is held in memory.
+    Counting the keys reads the file once and notes the byte offset of every CHECKPOINT_LINES-th line, so a shard
+    seeks close to its start instead of reading every line before it."""
+
+    CHECKPOINT_LINES = 1024
+
+    def __init__(self, path: str, strip: bool = True):
+        """
+        :param path: The wordlist file.
+        :param strip: Remove surrounding whitespace from every line, otherwise only the line ending is removed.
+        """
+        self.path = path
+        self.strip = strip
+        self._length = None
+        self._checkpoints = None  # the byte offsets of lines 0, CHECKPOINT_LINES, 2 * CHECKPOINT_LINES...
+
+    def _index(self):
+        """Counts the lines and notes the checkpoint offsets in one pass over the file."""
+        checkpoints = [0]
+        length = 0
+        offset = 0
+        with open(self.path, 'rb') as file:
+            for line in file:
+                length += 1
+                offset += len(line)
+                if length % self.CHECKPOINT_LINES == 0:
+                    checkpoints.append(offset)
+        self._length, self._checkpoints = length, checkpoints
+
+    def __len__(self) -> int:
+        if self._length is None:
+            self._index()
+        return self._length
+
+    def __iter__(self):
+        return self.shard(0, None)  # streams the file once, without counting it first
+
+    def shard(self, start: int, stop: int) -> iter:
+        """Generates the keys on lines start to stop. A shard not starting at 0 indexes the file the first time,
+        then costs at most CHECKPOINT_LINES skipped lines however far into the file it starts."""
+        if start and self._checkpoints is None:
+            self._index()
+        checkpoint = min(start // self.CHECKPOINT_LINES, len(self._checkpoints) - 1) if start else 0
+        first = checkpoint * self.CHECKPOINT_LINES
+        with open(self.path, 'rb') as file:
+            file.seek(self._checkpoints[checkpoint] if checkpoint else 0)
+            for line in islice(file, start - first, None if stop is None else max(stop - first, 0)):
+                yield line.strip() if self.strip else line.rstrip(b'\r\n')
@@ -0,0 +1,189 @@
+# This file builds letter frequency models from text files, as an alternative to the hard coded tables in Scoring.
+
+from array import array
+from collections import Counter
+from math import log, exp
+from Python.src.Scoring import Scorer
+import mmap
+import os
+import struct
+import tempfile
+
+# n-grams longer than one byte are counted over a folded alphabet so the tables stay small:
+# a-z (case insensitive) are symbols 0-25, a space is symbol 26, and every other byte is symbol 27.
+SYMBOLS = 28
+FOLD = bytes(b - 97 if 97 <= b <= 122 else b - 65 if 65 <= b <= 90 else 26 if b == 32 else 27 for b in range(256))
+
+MAGIC = b'CPNG'
+VERSION = 1
+HEADER = struct.Struct('<4sIQ')  # magic, version, number of bytes the model was trained on
+TABLE_SIZES = (256, SYMBOLS ** 2, SYMBOLS ** 3)  # unigram, bigram, trigram table lengths
+
+
+def _log_probabilities(counts: dict, size: int, total: int) -> array:
+    """Converts n-gram counts into a table of log-probabilities using add-one smoothing,
+    so n-grams never seen in the corpus still have a finite (but poor) score.
+    :param counts   A mapping of table indices to the number of times the n-gram was seen.
+    :param size     The number of entries in the table.
+    :param total    The total number of n-grams counted.
+    :return: An array of float32 log-probabilities."""
+    denominator = log(total + size)
+    table = array('f', [-denominator]) * size
+    for index, count in counts.items():
+        table[index] = log(count + 1) - denominator
+    return table
+
+
+class NgramModel:
+    """Unigram, bigram and trigram log-probability tables trained on a text corpus.
+    A model loaded from a file is memory mapped the first time a table is needed, so opening a model is
+    cheap and only the pages that are actually scored against get read from disk."""
+
+    def __init__(self, path: str = None, tables: (array, array, array) = None, trained_bytes: int = 0):
+        """
+        :param path             A model file written by NgramModel.save, loaded lazily.
+        :param tables           The (unigram, bigram, trigram) tables of a model built in memory.
+        :param trained_bytes    The size of the corpus the tables were built from.
+        """
+        if (path is None) == (tables is None):
+            raise ValueError("A model needs either a file path or tables, but not both")
+        self.path = path
+        self.trained_bytes = trained_bytes
+        self._tables = tables
+        self._mmap = None
+        self._scorer = None
+
+    @property
+    def tables(self) -> (memoryview, memoryview, memoryview):
+        """The (unigram, bigram, trigram) log-probability tables, mapped from disk on first access."""
+        if self._tables is None:
+            if self._mmap is None:
+                with open(self.path, 'rb') as file:
+                    mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                magic, version, trained_bytes = HEADER.unpack_from(mapped)
+                if magic != MAGIC or version != VERSION:
+                    mapped.close()
+                    raise ValueError("{} is not a version {} n-gram model".format(self.path, VERSION))
+                self._mmap, self.trained_bytes = mapped, trained_bytes
+            view = memoryview(self._mmap)
+            offset = HEADER.size
+            tables = []
+            for size in TABLE_SIZES:
+                tables.append(view[offset:offset + size * 4].cast('f'))
+                offset += size * 4
+            self._tables = tuple(tables)
+        return self._tables
+
+    def save(self, path: str):
+        """Writes the model to a compact binary file: a small header followed by the three float32 tables,
+        in the byte order of this machine. The file is written beside path and then renamed over it, so models
+        already mapping the old file, in this process or another, keep reading a complete file.
+        :param path: The file to write the model to."""
+        directory = os.path.dirname(os.path.abspath(path))
+        with tempfile.NamedTemporaryFile('wb', dir=directory, prefix=os.path.basename(path) + '.',
+                                         suffix='.tmp', delete=False) as file:
+            try:
+                file.write(HEADER.pack(MAGIC, VERSION, self.trained_bytes))
+                for table in self.tables:
+                    file.write(table.tobytes())
+            except BaseException:
+                file.close()
+                os.remove(file.name)
+                raise
+        os.replace(file.name, path)
+
+    def close(self):
+        """Releases the memory map of a model loaded from a file. It is mapped again if the model is used later.
+        :raises BufferError: if a caller still holds one of the tables, in which case the model stays mapped."""
+        if self._mmap is not None:
+            self._tables = None  # drop the model's own views of the map, the tables property makes new ones
+            self._mmap.close()
+            self._mmap = None
+
+    def score(self, data: bytes) -> float:
+        """Scores some text by the log-probability of its trigrams, falling back to bigrams or unigrams
+        for text shorter than three bytes. Higher scores are better.
+        :param data: The text to score, as bytes.
+        :return: The summed log-probability of the text under the model."""
+        unigrams, bigrams, trigrams = self.tables
+        data = bytes(data)
+        if len(data) < 2:
+            return sum(unigrams[b] for b in data)
+        folded = data.translate(FOLD)
+        if len(folded) == 2:
+            return bigrams[folded[0] * SYMBOLS + folded[1]]
+        counts = Counter(zip(folded, folded[1:], folded[2:]))
+        return sum(count * trigrams[(a * SYMBOLS + b) * SYMBOLS + c] for (a, b, c), count in counts.items())
+
+    def chi_squared(self, data: bytes) -> float:
+        """The chi-squared statistic of the byte frequencies of some text against the unigram model.
+        Lower values mean the text is closer to the corpus.
+        :param data: The text to test, as bytes.
+        :return: The chi-squared statistic, 0 for empty text."""
+        data = bytes(data)
+        if not data:
+            return 0.0
+        unigrams = self.tables[0]
+        observed = Counter(data)
+        statistic = 0.0
+        for b in range(256):
+            expected = exp(unigrams[b]) * len(data)
+            statistic += (observed.get(b, 0) - expected) ** 2 / expected
+        return statistic
+
+    def scorer(self) -> Scorer:
+        """A Scorer using the unigram log-probabilities as byte weights, for the single byte XOR ranking.
+        :return: A Scorer where higher scores are better."""
+        if self._scorer is None:
+            self._scorer = Scorer(list(self.tables[0]), lower_is_better=False, default=min(self.tables[0]))
+        return self._scorer
+
+
+def build_model(corpus_paths: [str], chunk_size: int = 1 << 20) -> NgramModel:
+    """Builds an n-gram model by streaming one or more text files in chunks, so a corpus of any size can be used.
+    :param corpus_paths: The text files to train on.
+    :param chunk_size: The number of bytes to read from a file at a time.
+    :return: An in-memory NgramModel, which can be written out with NgramModel.save."""
+    if isinstance(corpus_paths, str):
+        corpus_paths = [corpus_paths]
+    unigrams, bigrams, trigrams = Counter(), Counter(), Counter()
+    total = 0
+    for corpus_path in corpus_paths:
+        carry = b''  # the last two folded symbols of the previous chunk, so n-grams across chunks are counted
+        with open(corpus_path, 'rb') as file:
+            while True:
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    break
+                total += len(chunk)
+                unigrams.update(chunk)
+                folded = carry + chunk.translate(FOLD)
+                start = max(len(carry) - 1, 0)  # the first bigram not counted with the previous chunk
+                bigrams.update(a * SYMBOLS + b for a, b in zip(folded[start:], folded[start + 1:]))
+                trigrams.update((a * SYMBOLS + b) * SYMBOLS + c for a, b, c in zip(folded, folded[1:], folded[2:]))
+                carry = folded[-2:]
+    tables = (_log_probabilities(unigrams, TABLE_SIZES[0], total),
+              _log_probabilities(bigrams, TABLE_SIZES[1], max(total - 1, 0)),
+              _log_probabilities(trigrams, TABLE_SIZES[2], max(total - 2, 0)))
+    return NgramModel(tables=tables, trained_bytes=total)
+
+
+_loaded_models = {}  # models already opened by this process, keyed by model file path
+
+
+def load_model(corpus_path: str, model_path: str = None) -> NgramModel:
+    """Loads the cached model for a corpus, building and saving it first if the cache is missing or
+    older than the corpus. Repeated calls in the same process return the same model object until the model is
+    rebuilt. A rebuilt model is a new object, and the old one is only dropped from the cache, not closed, since
+    callers may still be using it or its tables. It keeps reading the old file until it is garbage collected.
+    :param corpus_path: The text file the model is trained on.
+    :param model_path: Where the model is cached, defaults to the corpus path with a .ngram extension.
+    :return: A lazily mapped NgramModel."""
+    model_path = model_path or os.path.splitext(corpus_path)[0] + '.ngram'
+    stale = not os.path.exists(model_path) or os.path.getmtime(model_path) < os.path.getmtime(corpus_path)
+    if stale:
+        build_model(corpus_path).save(model_path)
+        _loaded_models.pop(model_path, None)
+    if model_path not in _loaded_models:
+        _loaded_models[model_path] = NgramModel(model_path)
+    return _loaded_models[model_path]
@@ -0,0 +1,101 @@
+# An incremental version of break_repeating_key_xor for cyphertext that arrives a piece at a time, such as a live
+# capture. Only per key length statistics and the last few bytes are kept, never the stream itself.
+
+from collections import Counter
+from Python.src.CodeBreakers import *
+
+
+class OnlineXorBreaker:
+    """Breaks a repeating-key XOR stream as it arrives. For every key length it keeps a byte histogram of each column
+    of the transposed cyphertext and the running Hamming distance between bytes one key length apart, so a new chunk
+    costs one pass per key length and the current best guesses can be asked for at any time."""
+
+    def __init__(self, maxkeylen: int, minkeylen: int = 2, keys: bytes = PRINTABLE_KEYS, scorer: Scorer = None):
+        """
+        :param maxkeylen: The longest key length to track.
+        :param minkeylen: The shortest key length to track.
+        :param keys: The candidate key bytes for every column, in preference order for ties.
+        :param scorer: The Scorer to rank decryptions with. Defaults to the score_text metric.
+        """
+        if not 0 < minkeylen <= maxkeylen:
+            raise ValueError("Key lengths must satisfy 0 < minkeylen <= maxkeylen")
+        self.key_lengths = range(minkeylen, maxkeylen + 1)
+        self.keys = bytes(keys)
+        self.scorer = scorer or compile_scorer()
+        self.position = 0  # the number of bytes seen so far
+        self._columns = {key_len: [Counter() for _ in range(key_len)] for key_len in self.key_lengths}
+        self._distance_bits = dict.fromkeys(self.key_lengths, 0)  # the bits differing between bytes key_len apart
+        self._pairs = dict.fromkeys(self.key_lengths, 0)  # the number of byte pairs compared
+        self._tail = b''  # the last maxkeylen bytes, to pair with the start of the next chunk
+
+    def update(self, chunk: bytes):
+        """Adds the next piece of the cyphertext.
+        :param chunk: Any bytes-like object.
+        :return: The breaker, so calls can be chained."""
+        chunk = bytes(chunk)
+        if not chunk:
+            return self
+        for key_len, columns in self._columns.items():
+            # byte i of the chunk is in column (position + i) % key_len
+            for histogram, column in zip(columns, transpose(chunk, key_len, self.position)):
+                histogram.update(column)
+            # pair every new byte with the byte key_len before it, which may still be in the tail
+            joined = self._tail[-key_len:] + chunk
+            if len(joined) > key_len:
+                later, earlier = joined[key_len:], joined[:-key_len]
+                self._distance_bits[key_len] += (int.from_bytes(later, 'little') ^
+                                                 int.from_bytes(earlier, 'little')).bit_count()
+                self._pairs[key_len] += len(later)
+        self._tail = (self._tail + chunk)[-self.key_lengths[-1]:]
+        self.position += len(chunk)
+        return self
+
+    def feed(self, chunks) -> 'OnlineXorBreaker':
+        """Adds every chunk of an iterable, such as a file read in blocks.
+        :param chunks: An iterable of bytes-like objects.
+        :return: The breaker."""
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    def key_length_scores(self) -> [(int, float)]:
+        """The average number of bits that differ between bytes one key length apart, for every key length.
+        Two bytes encrypted with the same key byte differ only as much as their plaintexts do, so the right key
+        length and its multiples score lowest.
+        :return: A list of (key length, bits per byte) tuples, likeliest first."""
+        scores = [(key_len, self._distance_bits[key_len] / self._pairs[key_len] if self._pairs[key_len] else 8.0)
+                  for key_len in self.key_lengths]
+        scores.sort(key=lambda l: l[1])
+        return scores
+
+    def guess(self, key_len: int) -> (bytes, float):
+        """The best key of one length for everything seen so far, from the column histograms alone.
+        Costs a 256 key scoring per column, however much cyphertext has been seen.
+        :param key_len: A tracked key length.
+        :return: The key and the score its decryption would get."""
+        scorer, keys = self.scorer, self.keys
+        key = bytearray()
+        total = 0
+        for histogram in self._columns[key_len]:
+            key_scores = scorer.xor_scores(histogram)
+            best = min(keys, key=lambda k: scorer.sort_key(key_scores[k]))
+            key.append(best)
+            total += key_scores[best]
+        return bytes(key), total
+
+    def guesses(self, top: int = 5, candidates: int = None) -> [(bytes, float)]:
+        """The best keys for everything seen so far.
+        :param top: The number of keys to return.
+        :param candidates: Only guess keys for this many of the likeliest key lengths by Hamming distance,
+                           defaults to every tracked key length.
+        :return: A list of (key, score) tuples, best first. Ties go to the likelier key length."""
+        key_lengths = [key_len for key_len, distance in self.key_length_scores()[:candidates]]
+        guesses = [self.guess(key_len) for key_len in key_lengths]
+        order = {key_len: index for index, key_len in enumerate(key_lengths)}
+        guesses.sort(key=lambda l: (self.scorer.sort_key(l[1]), order[len(l[0])]))
+        return guesses[:top]
+
+    def best(self, candidates: int = None) -> (bytes, float):
+        """The single best key for everything seen so far, see guesses.
+        :return: The key and its score."""
+        return self.guesses(1, candidates)[0]
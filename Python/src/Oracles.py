@@ -1,7 +1,9 @@
-from Crypto.Cipher import AES
+from Python.src import AES
+import random
 import secrets  # secure random number generation for generating keys and IV
 import string
-from Python.src.ByteManip import pad_block
+from Python.src.Padding import pad, pad_batch
+from Python.src.Scoring import block_statistics
 
 
 def gibberish(nbytes: int) -> str:
@@ -13,7 +15,7 @@ def gibberish(nbytes: int) -> str:
     return ''.join(secrets.choice(string.printable) for i in range(nbytes))
 
 
-def rand_encrypt(plaintext: str, verbose: bool = False) -> (str, AES.MODE_ECB | AES.MODE_CBC):
+def rand_encrypt(plaintext: str, verbose: bool = False) -> (bytes, AES.MODE_ECB | AES.MODE_CBC):
     """
     Given a piece of plaintext, encrypt the plaintext using a random 16-bit AES key, and randomly choosing the mode
     from CBC mode or ECB mode.
@@ -21,32 +23,111 @@ def rand_encrypt(plaintext: str, verbose: bool = False) -> (str, AES.MODE_ECB |
     :param verbose: A boolean to give information about the encryption for testing.
     :return: The plaintext parameter encrypted as cyphertext, and the encryption mode used (for testing).
     """
-    # Generate random key
-    rand_key = secrets.token_bytes(16)  # 16 bytes of cryptographically random bits
-    # randomly append 5-10 bytes before and after the plaintext
-    plaintext = gibberish((secrets.randbelow(6) + 5)) + plaintext + gibberish((secrets.randbelow(6) + 5))
-    # pad the plaintext so that its length in bytes is a multiple of 16
-    p_bytes = len(bytes(plaintext, 'utf-8'))
-    if p_bytes % 16 != 0:
-        needed_bytes = 16 - p_bytes % 16
-        plaintext = pad_block(bytes(plaintext, "utf-8"), p_bytes + needed_bytes).decode("utf-8")
-    # determine the encryption mode randomly, giving an equal chance of being ECB or CBC
-    if secrets.randbits(1):  # equal change of 1 or 0, which is True or False
-        cipher = AES.new(rand_key, AES.MODE_CBC, secrets.token_bytes(16))
-        return cipher.encrypt(plaintext), AES.MODE_CBC
-    else:
-        cipher = AES.new(rand_key, AES.MODE_ECB)
-        return cipher.encrypt(plaintext), AES.MODE_ECB
-
-
-def detection_oracle(cyphertext: bytes) -> AES.MODE_ECB | AES.MODE_CBC:
+    cyphertext, mode = _secure_oracle.encrypt(bytes(plaintext, 'utf-8'))
+    if verbose:
+        print("Encrypted {} bytes in {} mode".format(len(cyphertext), "CBC" if mode == AES.MODE_CBC else "ECB"))
+    return cyphertext, mode
+
+
+class EncryptionOracle:
+    """Encrypts plaintexts the way rand_encrypt does: 5-10 random bytes are added before and after, the result is
+    padded with PKCS#7, and encrypted with AES under a random key in ECB or CBC mode, chosen with even odds.
+    Plaintexts are bytes and whole batches are produced at once, so the detection oracle can be measured at scale."""
+
+    def __init__(self, seed: int = None, reuse_key: bool = False):
+        """
+        :param seed: Seeds a fast, reproducible random.Random for benchmarks. Without a seed every random choice
+                     comes from the operating system's secure random source.
+        :param reuse_key: Encrypt every sample with the same random key, so its key schedule is only computed once.
+                          Every sample still gets its own IV, affixes and mode.
+        """
+        self._random = random.Random(seed) if seed is not None else random.SystemRandom()
+        self._round_keys = AES.expand_key(self._random.randbytes(16)) if reuse_key else None
+
+    def encrypt(self, plaintext: bytes) -> (bytes, int):
+        """Encrypts one plaintext.
+        :param plaintext: Any bytes-like object.
+        :return: The cyphertext, and the AES mode used to encrypt it."""
+        rng = self._random
+        encrypt_keys, decrypt_keys = self._round_keys or AES.expand_key(rng.randbytes(16))
+        message = rng.randbytes(rng.randint(5, 10)) + bytes(plaintext) + rng.randbytes(rng.randint(5, 10))
+        padded = pad(message, AES.block_size)
+        if rng.getrandbits(1):
+            return AES.encrypt_blocks(encrypt_keys, padded, rng.randbytes(AES.block_size)), AES.MODE_CBC
+        return AES.encrypt_blocks(encrypt_keys, padded), AES.MODE_ECB
+
+    def samples(self, plaintext: bytes, count: int) -> [(bytes, int)]:
+        """Encrypts the same plaintext many times, as a chosen plaintext attack on the detection oracle would.
+        :param plaintext: Any bytes-like object.
+        :param count: The number of samples.
+        :return: A list of (cyphertext, mode) tuples."""
+        plaintext = bytes(plaintext)
+        return [self.encrypt(plaintext) for _ in range(count)]
+
+    def batch(self, plaintexts: [bytes]) -> [(bytes, int)]:
+        """Encrypts many plaintexts.
+        :param plaintexts: An iterable of bytes-like objects.
+        :return: A list with a (cyphertext, mode) tuple per plaintext."""
+        return [self.encrypt(plaintext) for plaintext in plaintexts]
+
+
+_secure_oracle = EncryptionOracle()
+
+
+class EcbOracle:
+    """The oracle of cryptopals challenges 12 and 14: AES-ECB(prefix + attacker controlled input + secret) under a
+    key fixed when the oracle is made. It counts how many inputs it encrypts, so attacks can be measured."""
+
+    def __init__(self, secret: bytes, prefix: bytes = b'', key: bytes = None):
+        """
+        :param secret: The bytes appended to every input, which the attacker wants to recover.
+        :param prefix: The bytes put before every input, random bytes for challenge 14.
+        :param key: The AES key, random if not given.
+        """
+        self._secret = bytes(secret)
+        self._prefix = bytes(prefix)
+        self._round_keys = AES.expand_key(bytes(key) if key is not None else secrets.token_bytes(16))[0]
+        self.calls = 0
+
+    def __call__(self, attacker_input: bytes) -> bytes:
+        """Encrypts one input.
+        :param attacker_input: Any bytes-like object.
+        :return: The cyphertext."""
+        self.calls += 1
+        return AES.encrypt_blocks(self._round_keys, pad(self._prefix + bytes(attacker_input) + self._secret))
+
+    def batch(self, attacker_inputs: [bytes]) -> [bytes]:
+        """Encrypts many inputs with a single pass of the cipher over all of their blocks, which ECB allows.
+        :param attacker_inputs: A sequence of bytes-like objects.
+        :return: A list with the cyphertext of each input."""
+        padded = pad_batch([self._prefix + bytes(attacker_input) + self._secret for attacker_input in attacker_inputs])
+        self.calls += len(padded)
+        encrypted = AES.encrypt_blocks(self._round_keys, b''.join(padded))
+        cyphertexts = []
+        start = 0
+        for message in padded:
+            cyphertexts.append(encrypted[start:start + len(message)])
+            start += len(message)
+        return cyphertexts
+
+
+def detection_accuracy(samples: [(bytes, int)], block_size: int = 16) -> float:
+    """Measures how often detection_oracle guesses the mode of some oracle samples correctly.
+    :param samples: (cyphertext, mode) tuples, like the ones EncryptionOracle.samples returns.
+    :param block_size: The block size of the cypher in bytes.
+    :return: The fraction of samples detected correctly, 0 if there are none."""
+    if not samples:
+        return 0.0
+    return sum(detection_oracle(cyphertext, block_size) == mode for cyphertext, mode in samples) / len(samples)
+
+
+def detection_oracle(cyphertext: bytes, block_size: int = 16) -> AES.MODE_ECB | AES.MODE_CBC:
     """
     Determines if some bytes were encrypted using AES ECB mode or AES CBC mode.
     Not guaranteed to have 100% accuracy if there are no repeating blocks in the plaintext.
     :param cyphertext: The cyphertext in question
+    :param block_size: The block size of the cypher in bytes.
     :return: The AES mode likely used to encrypt the cyphertext
     """
-    for i in range(0, len(cyphertext), 16):  # iterating over every block
-        if cyphertext[i:(i+16)] in cyphertext[(i+16):]:  # if the first block was ever repeated, likely ECB
-            return AES.MODE_ECB
-    return AES.MODE_CBC
+    # if any block was ever repeated, likely ECB
+    return AES.MODE_ECB if block_statistics(cyphertext, block_size).repeats else AES.MODE_CBC
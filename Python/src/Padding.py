@@ -0,0 +1,119 @@
+# PKCS#7 padding for messages of any length, with validation that doesn't branch on the padding bytes, since
+# padding oracle attacks call it millions of times and a validator that returns early leaks which byte was wrong.
+
+from functools import lru_cache
+
+# the padding to append for every possible pad length, so padding a message is a single join
+_SUFFIXES = [bytes([n]) * n for n in range(256)]
+
+
+class PaddingError(ValueError):
+    """Raised when a message does not end in valid PKCS#7 padding."""
+
+
+@lru_cache(maxsize=None)
+def _masks(block_size: int) -> [int]:
+    """The bits of a last block, read as a big endian integer, that pad length n covers, for every byte value n.
+    Bytes claiming more padding than a block holds get every bit, so they are checked against the whole block."""
+    return [(1 << 8 * min(n, block_size)) - 1 for n in range(256)]
+
+
+@lru_cache(maxsize=None)
+def _repeats(block_size: int) -> int:
+    """An integer with every byte of a block set to 1, so n * _repeats(block_size) is a block full of n."""
+    return int.from_bytes(b'\x01' * block_size, 'big')
+
+
+def _check_block_size(block_size: int):
+    if not 0 < block_size < 256:
+        raise ValueError("PKCS#7 block sizes are 1 to 255 bytes, not {}".format(block_size))
+
+
+def _is_padded(message: bytes, block_size: int, repeats: int, masks: [int]) -> bool:
+    """The branch-free check shared by validate and validate_batch, which pass in _repeats and _masks so a batch
+    looks them up once."""
+    if not message or len(message) % block_size:
+        return False  # only the length is revealed, which an attacker knows anyway
+    n = message[-1]
+    difference = (int.from_bytes(message[-block_size:], 'big') ^ n * repeats) & masks[n]
+    # a pad length of 0 wraps around to 255, so both of these comparisons fail for it
+    return (difference == 0) & (((n - 1) & 0xff) < block_size)
+
+
+def pad(message: bytes, block_size: int = 16) -> bytes:
+    """Pads a message of any length to a whole number of blocks. A message already a whole number of blocks long
+    gets a whole block of padding, so the padding can always be removed.
+    :param message: Any bytes-like object.
+    :param block_size: The block size of the cypher in bytes.
+    :return: The padded message."""
+    _check_block_size(block_size)
+    return b''.join((message, _SUFFIXES[block_size - len(message) % block_size]))
+
+
+def pad_into(buffer, length: int, block_size: int = 16) -> int:
+    """Pads a message in place, at the front of a buffer sized for it, for callers that reuse one buffer.
+    :param buffer: A writable bytes-like object, such as a bytearray, holding the message in its first length bytes.
+    :param length: The length of the message.
+    :param block_size: The block size of the cypher in bytes.
+    :raises ValueError: if the padding doesn't fit in the buffer.
+    :return: The padded length."""
+    _check_block_size(block_size)
+    padding = _SUFFIXES[block_size - length % block_size]
+    if length + len(padding) > len(buffer):
+        raise ValueError("A {} byte buffer can't hold {} bytes of padding after {} bytes".format(
+            len(buffer), len(padding), length))
+    buffer[length:length + len(padding)] = padding
+    return length + len(padding)
+
+
+def validate(message: bytes, block_size: int = 16) -> bool:
+    """Checks that a message ends in valid PKCS#7 padding. The last block is always checked as a whole, with integer
+    operations and no branches on its contents, so the time taken doesn't reveal which padding byte was wrong.
+    :param message: Any bytes-like object.
+    :param block_size: The block size of the cypher in bytes.
+    :return: True if the padding is valid."""
+    _check_block_size(block_size)
+    return _is_padded(message, block_size, _repeats(block_size), _masks(block_size))
+
+
+def unpad(message: bytes, block_size: int = 16) -> bytes:
+    """Removes PKCS#7 padding from a message.
+    :param message: Any bytes-like object.
+    :param block_size: The block size of the cypher in bytes.
+    :raises PaddingError: if the padding is not valid.
+    :return: The message without its padding."""
+    if not validate(message, block_size):
+        raise PaddingError("Invalid PKCS#7 padding")
+    return bytes(message[:len(message) - message[-1]])
+
+
+def pad_batch(messages: [bytes], block_size: int = 16) -> [bytes]:
+    """Pads many messages.
+    :param messages: An iterable of bytes-like objects.
+    :param block_size: The block size of the cypher in bytes.
+    :return: A list of the padded messages."""
+    _check_block_size(block_size)
+    suffixes = _SUFFIXES
+    return [b''.join((message, suffixes[block_size - len(message) % block_size])) for message in messages]
+
+
+def validate_batch(messages: [bytes], block_size: int = 16) -> [bool]:
+    """Checks the padding of many messages, see validate.
+    :param messages: An iterable of bytes-like objects.
+    :param block_size: The block size of the cypher in bytes.
+    :return: A list of whether each message has valid padding."""
+    _check_block_size(block_size)
+    repeats, masks = _repeats(block_size), _masks(block_size)
+    return [_is_padded(message, block_size, repeats, masks) for message in messages]
+
+
+def unpad_batch(messages: [bytes], block_size: int = 16) -> [bytes]:
+    """Removes the padding from many messages.
+    :param messages: A sequence of bytes-like objects.
+    :param block_size: The block size of the cypher in bytes.
+    :raises PaddingError: if any message has invalid padding, naming the first one.
+    :return: A list of the messages without their padding."""
+    valid = validate_batch(messages, block_size)
+    if not all(valid):
+        raise PaddingError("Invalid PKCS#7 padding in message {}".format(valid.index(False)))
+    return [bytes(message[:len(message) - message[-1]]) for message in messages]
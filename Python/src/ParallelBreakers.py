@@ -0,0 +1,124 @@
+# Process pool versions of the repeating-key XOR breakers in CodeBreakers, for cyphertexts and key
+# lengths large enough that breaking them is bound by a single core.
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.shared_memory import SharedMemory
+from Python.src.CodeBreakers import *
+
+_shared_memory: SharedMemory = None  # the worker's handle on the shared cyphertext
+_cyphertext: memoryview = None  # the worker's view of the shared cyphertext
+
+
+def _attach_cyphertext(name: str, size: int):
+    """Process pool initializer which maps the cyphertext from shared memory once per worker,
+    so the tasks themselves only carry a few integers instead of a pickled copy of the cyphertext.
+    :param name: The name of the shared memory block holding the cyphertext.
+    :param size: The length of the cyphertext, since shared memory blocks may be rounded up in size."""
+    global _shared_memory, _cyphertext
+    _shared_memory = SharedMemory(name=name)
+    _cyphertext = _shared_memory.buf[:size]
+
+
+def _solve_columns(key_len: int, start: int, stop: int, keys: bytes) -> (int, int, bytes, int):
+    """Solves a range of the transposed columns of the shared cyphertext as single-byte XORs.
+    Each column is a strided view into the shared memory, nothing is copied.
+    :param key_len: The guessed key length, which is the number of columns.
+    :param start: The first column to solve.
+    :param stop: One past the last column to solve.
+    :param keys: The candidate key bytes.
+    :return: The key length, the first column, the key bytes for the columns, and their summed score."""
+    key = bytearray()
+    score = 0
+    for column in transpose(_cyphertext, key_len)[start:stop]:
+        key_byte, column_score = rank_single_byte_xor(column, 1, keys)[0]
+        key.append(key_byte)
+        score += column_score
+    return key_len, start, bytes(key), score
+
+
+def iter_repeating_key_xor_guesses(cyphertext: bytes, key_lengths: [int], workers: int = None,
+                                   column_chunk: int = 64, keys: bytes = PRINTABLE_KEYS) -> (bytes, int):
+    """Breaks a repeating-key XOR cyphertext for many key lengths across a pool of processes, yielding
+    each key length's guess as soon as all of its columns are solved.
+    Every key length is split into tasks of up to column_chunk columns, so a single very long key is also
+    spread across the workers. Since the score of a decryption is the sum of the scores of its bytes,
+    the score of a guessed key is the sum of the scores of its columns and never needs a full decryption.
+    :param cyphertext: The encrypted bytes.
+    :param key_lengths: The key lengths to try.
+    :param workers: The number of worker processes, defaults to the number of CPUs.
+    :param column_chunk: The maximum number of columns solved by one task.
+    :param keys: The candidate key bytes for every column.
+    :return: A generator of (key, score) tuples in the order they complete, lower scores are better."""
+    shared_memory = SharedMemory(create=True, size=max(len(cyphertext), 1))
+    try:
+        shared_memory.buf[:len(cyphertext)] = cyphertext
+        with ProcessPoolExecutor(workers, initializer=_attach_cyphertext,
+                                 initargs=(shared_memory.name, len(cyphertext))) as executor:
+            pending = {}  # key length -> [columns left to solve, key bytearray, score]
+            futures = []
+            for key_len in dict.fromkeys(key_lengths):  # drop repeated key lengths, keeping their order
+                pending[key_len] = [key_len, bytearray(key_len), 0]
+                for start in range(0, key_len, column_chunk):
+                    stop = min(start + column_chunk, key_len)
+                    futures.append(executor.submit(_solve_columns, key_len, start, stop, keys))
+            try:
+                for future in as_completed(futures):
+                    key_len, start, key_part, score = future.result()
+                    guess = pending[key_len]
+                    guess[0] -= len(key_part)
+                    guess[1][start:start + len(key_part)] = key_part
+                    guess[2] += score
+                    if guess[0] == 0:
+                        del pending[key_len]
+                        yield bytes(guess[1]), guess[2]
+            finally:
+                for future in futures:  # if the caller stopped early, don't wait for work nobody will read
+                    future.cancel()
+    finally:
+        shared_memory.close()
+        shared_memory.unlink()
+
+
+def _best_guess(cyphertext: str, key_lengths: [int], workers: int, verbose: bool) -> (str, str):
+    """Collects the guesses for every key length and picks the best one, breaking ties in favour of the
+    earlier key length like the serial breakers do.
+    :param cyphertext: The cypher text we want to break.
+    :param key_lengths: The key lengths to try, in order of preference.
+    :param workers: The number of worker processes.
+    :param verbose: Print each guess as it completes.
+    :return: A tuple which contains the key and plaintext."""
+    cypherbytes = bytes(cyphertext, 'ascii')
+    order = {key_len: index for index, key_len in enumerate(key_lengths)}
+    guesses = []
+    for key, score in iter_repeating_key_xor_guesses(cypherbytes, key_lengths, workers):
+        if verbose:
+            print("The key could be: {} (score {})".format(key.decode(), score))
+        guesses.append((key, score))
+    guesses.sort(key=lambda l: (l[1], order[len(l[0])]))
+    key = guesses[0][0]
+    return key.decode(), xor(cypherbytes, key).decode()
+
+
+def parallel_brute_repeating_key_xor(cyphertext: str, maxkeylen: int, workers: int = None,
+                                     verbose: bool = False) -> (str, str):
+    """The process pool version of brute_repeating_key_xor, which breaks every key length up to maxkeylen.
+    :param cyphertext The cypher text we want to break
+    :param maxkeylen The maximum key length to attempt to break before giving up.
+    :param workers The number of worker processes, defaults to the number of CPUs.
+    :param verbose Print processing data out to the console, defaults to False.
+    :returns A tuple which contains the key and plaintext, provided the key is smaller than maxkeylen.
+    """
+    return _best_guess(cyphertext, list(range(2, maxkeylen + 1)), workers, verbose)
+
+
+def parallel_break_repeating_key_xor(cyphertext: str, maxkeylen: int, workers: int = None,
+                                     verbose: bool = False) -> (str, str):
+    """The process pool version of break_repeating_key_xor, which only breaks the likeliest key lengths.
+    :param cyphertext The cypher text we want to break
+    :param maxkeylen The maximum key length to attempt to break before giving up.
+    :param workers The number of worker processes, defaults to the number of CPUs.
+    :param verbose Print processing data out to the console, defaults to False.
+    :returns A tuple which contains the key and plaintext, provided the key is smaller than maxkeylen.
+    """
+    scores = likely_key_sizes(bytes(cyphertext, 'ascii'), maxkeylen, verbose)
+    return _best_guess(cyphertext, [key_len for key_len, score in scores], workers, verbose)
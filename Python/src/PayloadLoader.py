@@ -0,0 +1,102 @@
+# Loads challenge payloads and captures of any size. A file is memory mapped and decoded a chunk of lines at a time
+# into one output buffer allocated up front, so the whole encoded text and a second decoded copy never exist at once.
+
+from binascii import a2b_base64, a2b_hex, Error as DecodeError
+import mmap
+import os
+import string
+from typing import Optional
+
+PAYLOAD_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                                 "Payloads")
+HEX, BASE64, RAW = "hex", "base64", "raw"
+WHITESPACE = b" \t\r\n\v\f"
+_HEX_DIGITS = frozenset(string.hexdigits.encode())
+_BASE64_DIGITS = frozenset((string.ascii_letters + string.digits + "+/=").encode())
+# a base64 sample this long holds only hex digits by chance about once in 10^29, so it is taken to be hex
+_UNAMBIGUOUS_HEX = 64
+_SAMPLE_SIZE = 4096  # how much of a payload detect_format looks at
+_LINE_SEARCH = 256  # how far past a chunk's end to look for a line break before cutting the line instead
+
+
+def payload_path(name: str) -> str:
+    """The path of a file in the repository's Payloads directory, wherever the caller is run from.
+    :param name: The file name, such as "Set1Challenge6.txt".
+    :return: The absolute path of the payload."""
+    return os.path.join(PAYLOAD_DIRECTORY, name)
+
+
+def detect_format(sample: bytes, complete: bool = True) -> Optional[str]:
+    """Guesses the encoding of a payload from a sample of its start, in the spirit of ByteManip.is_hex but for bytes
+    with line breaks. Every hex digit is also a base64 digit, so a short sample of nothing but hex digits whose
+    length suits both encodings can't be told apart, and the caller has to say which it is.
+    :param sample: The first few kilobytes of the payload.
+    :param complete: True if the sample is the whole payload, so its digit count must suit the encoding.
+    :return: HEX, BASE64 or RAW, or None if the payload could be either hex or base64."""
+    digits = bytes(sample).translate(None, WHITESPACE)
+    symbols = set(digits)
+    if not symbols:
+        return RAW
+    whole_groups = not complete or len(digits) % 4 == 0  # base64 comes in groups of four digits
+    if symbols <= _HEX_DIGITS and not (complete and len(digits) % 2):
+        if whole_groups and len(digits) < _UNAMBIGUOUS_HEX:
+            return None
+        return HEX
+    if symbols <= _BASE64_DIGITS and whole_groups:
+        return BASE64
+    return RAW
+
+
+def load_payload(path: str, encoding: str = None, chunk_size: int = 1 << 20) -> bytearray:
+    """Decodes a whole payload file into a single buffer.
+    :param path: The file to load, see payload_path for the challenge payloads.
+    :param encoding: HEX, BASE64 or RAW, detected from the start of the file if not given.
+                     It must be given for short files that are valid as both hex and base64.
+    :param chunk_size: The number of encoded bytes to decode at a time, give or take the rest of a line, which bounds
+                       the temporary memory used besides the output.
+    :raises ValueError: if the file is not valid in the encoding, or no encoding was given and it is ambiguous.
+    :return: The decoded bytes."""
+    with open(path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            return bytearray()
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            encoding = encoding or detect_format(mapped[:_SAMPLE_SIZE], size <= _SAMPLE_SIZE)
+            if encoding is None:
+                raise ValueError("{} could be hex or base64, pass its encoding".format(path))
+            if encoding == RAW:
+                output = bytearray(size)
+                output[:] = mapped
+                return output
+            if encoding not in (HEX, BASE64):
+                raise ValueError("Unknown payload encoding {!r}".format(encoding))
+            return _decode_mapped(mapped, encoding, chunk_size)
+
+
+def _decode_mapped(mapped: mmap.mmap, encoding: str, chunk_size: int) -> bytearray:
+    """Decodes a mapped hex or base64 file chunk by chunk. Chunks end at a line break just after chunk_size bytes where
+    there is one, and are cut at chunk_size bytes otherwise, so even a file that is one long line is never copied
+    whole. Digits left over from a chunk that don't make up a whole group are carried into the next one."""
+    decode, group = (a2b_hex, 2) if encoding == HEX else (a2b_base64, 4)
+    # an upper bound on the decoded size, which is trimmed at the end, assuming no whitespace at all
+    output = bytearray(len(mapped) // 2 if encoding == HEX else len(mapped) // 4 * 3 + 3)
+    written = 0
+    carry = b''
+    start = 0
+    while start < len(mapped):
+        stop = mapped.find(b'\n', start + chunk_size, start + chunk_size + _LINE_SEARCH)
+        stop = min(start + chunk_size, len(mapped)) if stop < 0 else stop + 1
+        digits = carry + mapped[start:stop].translate(None, WHITESPACE)
+        whole = len(digits) - len(digits) % group
+        carry = digits[whole:]
+        try:
+            decoded = decode(memoryview(digits)[:whole])
+        except DecodeError as error:
+            raise ValueError("Invalid {} between bytes {} and {}: {}".format(encoding, start, stop, error)) from None
+        output[written:written + len(decoded)] = decoded
+        written += len(decoded)
+        start = stop
+    if carry:
+        raise ValueError("The {} payload ends in a partial group of digits: {!r}".format(encoding, carry))
+    del output[written:]
+    return output
@@ -0,0 +1,188 @@
+# A content addressed cache for the results of the breakers in CodeBreakers, so breaking the same payload
+# with the same parameters twice only does the work once. Results live in an in-memory LRU tier, and
+# optionally in an SQLite file which outlives the process.
+
+from ast import literal_eval
+from collections import OrderedDict, namedtuple
+import hashlib
+import sqlite3
+import time
+
+CacheStats = namedtuple('CacheStats', ['hits', 'misses', 'entries', 'size'])
+
+
+def cache_key(breaker: str, data: bytes, *params) -> str:
+    """Builds the cache key of a breaking attempt from what the result depends on.
+    :param breaker: The name of the breaker.
+    :param data: The cyphertext bytes, or any bytes that identify the input such as a file digest.
+    :param params: The breaker's parameters and scoring model, anything with a stable repr.
+    :return: A hex SHA-256 digest."""
+    digest = hashlib.sha256(breaker.encode())
+    digest.update(b'\0' + repr(params).encode() + b'\0')
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def file_digest(filename: str, chunk_size: int = 1 << 20) -> bytes:
+    """The SHA-256 digest of a file's contents, read in chunks so files of any size can be cached on.
+    :param filename: The file to hash.
+    :param chunk_size: The number of bytes to read at a time.
+    :return: The raw digest bytes."""
+    digest = hashlib.sha256()
+    with open(filename, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+class ResultCache:
+    """Stores breaker results by cache key. Values are tuples of str, bytes, int and float, stored as their repr
+    so a cache file can be read back with literal_eval and never runs code.
+    Entries are evicted least recently used first once a tier holds more than max_entries or max_bytes,
+    and are ignored once they are older than max_age and removed when the SQLite file is next written.
+    Lookups never write to the SQLite file. The times entries were last used are written with the next put, or on
+    close, so a cache which is mostly read doesn't commit on every hit."""
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 << 20, max_age: float = None,
+                 path: str = None, max_disk_bytes: int = 1 << 30):
+        """
+        :param max_entries: The most results held in memory.
+        :param max_bytes: The most bytes of results held in memory.
+        :param max_age: Seconds a result stays valid, or None to keep results until they are evicted.
+        :param path: An SQLite file to keep results in across runs, or None for a memory only cache.
+        :param max_disk_bytes: The most bytes of results held in the SQLite file.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (encoded value, time stored), least recently used first
+        self._size = 0
+        self._used = {}  # key -> time of the disk entries used since the SQLite file was last written
+        self._db = None
+        if path is not None:
+            self._db = sqlite3.connect(path)
+            self._db.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                             "size INTEGER NOT NULL, stored REAL NOT NULL, used REAL NOT NULL)")
+            self._db.commit()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        entry = self._entries.get(key)
+        if entry is not None:
+            return not self._expired(entry[1])
+        return self._db is not None and self._load(key) is not None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def stats(self) -> CacheStats:
+        """The hit and miss counters, and the number of entries and bytes held in memory."""
+        return CacheStats(self.hits, self.misses, len(self._entries), self._size)
+
+    def _expired(self, stored: float) -> bool:
+        return self.max_age is not None and time.time() - stored > self.max_age
+
+    def get(self, key: str, default=None):
+        """Looks up a result, checking memory first and then the SQLite file.
+        :param key: The cache key, see cache_key.
+        :param default: What to return on a miss.
+        :return: The stored result tuple, or default."""
+        entry = self._entries.get(key)
+        if entry is not None and self._expired(entry[1]):
+            self._discard(key)
+            entry = None
+        if entry is None and self._db is not None:
+            entry = self._load(key)
+            if entry is not None:
+                self._used[key] = time.time()
+                self._remember(key, *entry)
+        if entry is None:
+            self.misses += 1
+            return default
+        if key in self._entries:  # results too large for the memory tier are only kept on disk
+            self._entries.move_to_end(key)
+        self.hits += 1
+        return literal_eval(entry[0])
+
+    def put(self, key: str, value: tuple):
+        """Stores a result in memory, and in the SQLite file if there is one.
+        :param key: The cache key, see cache_key.
+        :param value: The result, a tuple of str, bytes, int and float."""
+        encoded = repr(value)
+        stored = time.time()
+        self._remember(key, encoded, stored)
+        if self._db is not None:
+            self._used.pop(key, None)
+            self._db.execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                             (key, encoded, len(encoded), stored, stored))
+            self._write_used()
+            self._evict_disk()
+            self._db.commit()
+
+    def clear(self):
+        """Removes every result from memory and the SQLite file. The counters are kept."""
+        self._entries.clear()
+        self._size = 0
+        self._used.clear()
+        if self._db is not None:
+            self._db.execute("DELETE FROM results")
+            self._db.commit()
+
+    def close(self):
+        """Writes the pending use times and closes the SQLite file. The memory tier stays usable."""
+        if self._db is not None:
+            if self._used:
+                self._write_used()
+                self._db.commit()
+            self._db.close()
+            self._db = None
+
+    def _remember(self, key: str, encoded: str, stored: float):
+        """Adds an entry to the memory tier and evicts the least recently used entries until it fits."""
+        self._discard(key)
+        if len(encoded) > self.max_bytes:
+            return  # would evict everything else and still not fit
+        self._entries[key] = (encoded, stored)
+        self._size += len(encoded)
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            evicted_key, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted[0])
+
+    def _discard(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[0])
+
+    def _load(self, key: str) -> (str, float):
+        """Reads an entry from the SQLite file, without writing anything. Expired entries are left for _evict_disk."""
+        row = self._db.execute("SELECT value, stored FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None or self._expired(row[1]):
+            return None
+        return row
+
+    def _write_used(self):
+        """Writes the use times of the disk entries read since the last write, in the caller's transaction."""
+        self._db.executemany("UPDATE results SET used = ? WHERE key = ?",
+                             [(used, key) for key, used in self._used.items()])
+        self._used.clear()
+
+    def _evict_disk(self):
+        """Removes expired entries from the SQLite file, then the least recently used ones until it fits."""
+        if self.max_age is not None:
+            self._db.execute("DELETE FROM results WHERE stored < ?", (time.time() - self.max_age,))
+        size = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if size <= self.max_disk_bytes:
+            return
+        for key, entry_size in self._db.execute("SELECT key, size FROM results ORDER BY used").fetchall():
+            self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+            size -= entry_size
+            if size <= self.max_disk_bytes:
+                break
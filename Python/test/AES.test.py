@@ -0,0 +1,51 @@
+import unittest
+from Python.src import AES
+
+# FIPS-197 appendix C example vectors
+PLAINTEXT = bytes.fromhex("00112233445566778899aabbccddeeff")
+VECTORS = [
+    ("000102030405060708090a0b0c0d0e0f", "69c4e0d86a7b0430d8cdb78070b4c55a"),
+    ("000102030405060708090a0b0c0d0e0f1011121314151617", "dda97ca4864cdfe06eaf70a0ec0d7191"),
+    ("000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f", "8ea2b7ca516745bfeafc49904b496089"),
+]
+
+
+class AESTest(unittest.TestCase):
+    def test_fips_197_vectors(self):
+        for key, cyphertext in VECTORS:
+            cipher = AES.new(bytes.fromhex(key), AES.MODE_ECB)
+            self.assertEqual(bytes.fromhex(cyphertext), cipher.encrypt(PLAINTEXT))
+            self.assertEqual(PLAINTEXT, cipher.decrypt(bytes.fromhex(cyphertext)))
+
+    def test_sp800_38a_cbc(self):
+        # the first two blocks of the NIST SP 800-38A F.2.1 CBC-AES128 example
+        key = bytes.fromhex("2b7e151628aed2a6abf7158809cf4f3c")
+        iv = bytes.fromhex("000102030405060708090a0b0c0d0e0f")
+        plaintext = bytes.fromhex("6bc1bee22e409f96e93d7e117393172aae2d8a571e03ac9c9eb76fac45af8e51")
+        cyphertext = bytes.fromhex("7649abac8119b246cee98e9b12e9197d5086cb9b507219ee95db113a917678b2")
+        self.assertEqual(cyphertext, AES.new(key, AES.MODE_CBC, iv).encrypt(plaintext))
+        self.assertEqual(plaintext, AES.new(key, AES.MODE_CBC, iv).decrypt(cyphertext))
+
+    def test_cbc_chains_across_calls(self):
+        key = b"YELLOW SUBMARINE"
+        plaintext = bytes(range(256)) * 3
+        whole = AES.new(key, AES.MODE_CBC, bytes(16)).encrypt(plaintext)
+        cipher = AES.new(key, AES.MODE_CBC, bytes(16))
+        self.assertEqual(whole, cipher.encrypt(plaintext[:48]) + cipher.encrypt(plaintext[48:]))
+        cipher = AES.new(key, AES.MODE_CBC, bytes(16))
+        self.assertEqual(plaintext, cipher.decrypt(whole[:160]) + cipher.decrypt(whole[160:]))
+
+    def test_ecb_repeats_blocks(self):
+        cyphertext = AES.new(b"YELLOW SUBMARINE").encrypt(b"sixteen byte blk" * 3)
+        self.assertEqual(cyphertext[:16], cyphertext[16:32])
+        self.assertEqual(cyphertext[:16], cyphertext[32:])
+
+    def test_invalid_input(self):
+        self.assertRaises(ValueError, AES.new, b"short key")
+        self.assertRaises(ValueError, AES.new(b"YELLOW SUBMARINE").encrypt, b"not a block")
+        self.assertRaises(ValueError, AES.new, b"YELLOW SUBMARINE", AES.MODE_CBC, b"short iv")
+        self.assertRaises(ValueError, AES.new, b"YELLOW SUBMARINE", 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
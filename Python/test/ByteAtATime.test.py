@@ -0,0 +1,46 @@
+import unittest
+from Python.src.ByteAtATime import *
+from Python.src.Oracles import EcbOracle
+
+SECRET = b"Rollin' in my 5.0\nWith my rag-top down so my hair can blow\n"
+KEY = b"YELLOW SUBMARINE"
+
+
+class ByteAtATimeTest(unittest.TestCase):
+    def test_detect_block_size(self):
+        self.assertEqual(16, detect_block_size(EcbOracle(SECRET, key=KEY)))
+
+    def test_detect_prefix_length(self):
+        for prefix in (b"", b"x", b"A" * 15, b"A" * 16, bytes(range(40))):
+            self.assertEqual(len(prefix), detect_prefix_length(EcbOracle(SECRET, prefix, KEY), 16))
+
+    def test_prefix_with_repeated_blocks(self):
+        # repeated blocks inside the prefix don't move with the input, so they are not mistaken for it
+        prefix = b"B" * 32 + b"tail"
+        self.assertEqual(len(prefix), detect_prefix_length(EcbOracle(SECRET, prefix, KEY), 16))
+
+    def test_attack_without_batch(self):
+        oracle = EcbOracle(SECRET, b"prefix", KEY)
+        result = byte_at_a_time(lambda attacker_input: oracle(attacker_input))
+        self.assertEqual(SECRET, result.plaintext)
+        self.assertEqual(oracle.calls, result.oracle_calls)
+
+    def test_dictionaries_are_reused(self):
+        secret = b"0123456789abcdef" * 4
+        result = byte_at_a_time(EcbOracle(secret, key=KEY))
+        self.assertEqual(secret, result.plaintext)
+        # once the first 15 bytes are known every context has been seen by the next repetition
+        self.assertGreaterEqual(result.dictionary_hits, len(secret) - 32)
+
+    def test_alphabet(self):
+        result = byte_at_a_time(EcbOracle(SECRET, key=KEY), alphabet=bytes(range(32, 127)) + b"\n")
+        self.assertEqual(SECRET, result.plaintext)
+        self.assertRaises(ValueError, byte_at_a_time, EcbOracle(SECRET, key=KEY), alphabet=b"abc")
+
+    def test_not_ecb(self):
+        self.assertRaises(ValueError, byte_at_a_time, lambda attacker_input: bytes(16) + bytes(
+            range(len(attacker_input) // 16 * 16)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -50,6 +50,17 @@ class ByteManipTest(unittest.TestCase):
         str2 = "abcdef0987654321"
         self.assertEqual(fixed_xor(str1, str2), fixed_xor(str2, str1))
 
+    def test_fixed_xor_bytes(self):
+        plaintext = bytes.fromhex("1c0111001f010100061a024b53535009181c")
+        key = bytes.fromhex("686974207468652062756c6c277320657965")
+        cyphertext = bytes.fromhex("746865206b696420646f6e277420706c6179")
+        self.assertEqual(cyphertext, fixed_xor_bytes(memoryview(plaintext), bytearray(key)))
+        self.assertRaises(ValueError, fixed_xor_bytes, b"a", b"aa")
+
+    def test_pad_block(self):
+        self.assertEqual(b"YELLOW SUBMARINE\x04\x04\x04\x04", pad_block(memoryview(b"YELLOW SUBMARINE"), 20))
+        self.assertEqual(b"YELLOW", pad_block(b"YELLOW", 6))
+
     def test_xor_same_length_keys(self):
         plaintext = "1c0111001f010100061a024b53535009181c"
         key = "686974207468652062756c6c277320657965"
@@ -78,11 +89,53 @@ class ByteManipTest(unittest.TestCase):
         actual = xor(bytes(plaintext, 'ascii'), bytes(key, 'ascii')).hex()
         self.assertEqual(cyphertext, actual)
 
+    def test_xor_into_in_place(self):
+        plaintext = "Burning 'em, if you ain't quick and nimble"
+        buffer = bytearray(plaintext, 'ascii')
+        self.assertEqual(len(buffer), xor_into(buffer, b"ICE", buffer))
+        self.assertEqual(xor(bytes(plaintext, 'ascii'), b"ICE"), buffer)
+
+    def test_xor_stream_chunks(self):
+        plaintext = bytes("Burning 'em, if you ain't quick and nimble\nI go crazy when I hear a cymbal", 'ascii')
+        stream = XorStream(b"ICE")
+        chunks = [plaintext[0:1], plaintext[1:5], plaintext[5:5], plaintext[5:40], plaintext[40:]]
+        self.assertEqual(xor(plaintext, b"ICE"), b"".join(stream.update(chunk) for chunk in chunks))
+        self.assertEqual(len(plaintext), stream.position)
+
+    def test_keystream(self):
+        self.assertEqual(b"EICEICE", keystream(b"ICE", 7, 2))
+        self.assertRaises(ValueError, keystream, b"", 3)
+
+    def test_xor_single_byte(self):
+        plaintext = "Hello World"
+        key = "!"
+        expected = xor(bytes(plaintext, 'ascii'), bytes(key, 'ascii'))
+        self.assertEqual(expected, xor_single_byte(bytes(plaintext, 'ascii'), ord(key)))
+
     def test_count_set_bits(self):
         self.assertEqual(count_set_bits(10), 2)
         self.assertEqual(count_set_bits(32), 1)
         self.assertEqual(count_set_bits(12345), 6)
 
+    def test_popcount(self):
+        self.assertEqual(popcount(bytes([10, 32, 255])), 2 + 1 + 8)
+        self.assertEqual(popcount(b""), 0)
+
+    def test_transpose(self):
+        columns = transpose(b"abcdefg", 3)
+        self.assertEqual([b"adg", b"be", b"cf"], [column.tobytes() for column in columns])
+        self.assertTrue(all(isinstance(column, memoryview) for column in columns))
+        # a chunk starting at position 4 begins in column 1
+        self.assertEqual([b"g", b"e", b"f"], [column.tobytes() for column in transpose(b"efg", 3, 4)])
+        self.assertRaises(ValueError, transpose, b"abc", 0)
+
+    def test_transpositions_share_buffer(self):
+        data = bytearray(b"abcdef")
+        columns = transpositions(data, [2, 3])
+        self.assertEqual([b"ace", b"bdf"], [column.tobytes() for column in columns[2]])
+        data[0] = ord("z")
+        self.assertEqual(b"zd", columns[3][0].tobytes())
+
 
 if __name__ == '__main__':
     unittest.main()
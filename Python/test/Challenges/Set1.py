@@ -1,8 +1,9 @@
 import unittest
 from Python.src.CodeBreakers import *
-from base64 import b64decode
+from Python.src.ParallelBreakers import parallel_break_repeating_key_xor
+from Python.src.PayloadLoader import load_payload, payload_path
 import timeit
-from Crypto.Cipher import AES
+from Python.src import AES
 
 
 class Set1(unittest.TestCase):
@@ -33,17 +34,31 @@ class Set1(unittest.TestCase):
         self.assertEqual(key, actual_key)
         self.assertEqual(plaintext, actual_plaintext)
 
+    def test_set1_challenge3_bytes(self):
+        # the same challenge without any hex or str round trips
+        cyphertext = bytes.fromhex("1b37373331363f78151b7f2b783431333d78397828372d363c78373e783a393b3736")
+        actual_key, actual_plaintext = brute_xor_bytes(memoryview(cyphertext), 1, False)
+        self.assertEqual(b"X", actual_key)
+        self.assertEqual(b"Cooking MC's like a pound of bacon", actual_plaintext)
+
     def test_set1_challenge4(self):
         # Detect single-character XOR
         target_line_number = 171
         key = '5'
         plaintext = "Now that the party is jumping\n"
-        # Note that the filename is relative and thus dependent on project structure
-        ln, k, p = brute_xor_file("../../../Payloads/Set1Challenge4.txt", 1, False)
+        ln, k, p = brute_xor_file(payload_path("Set1Challenge4.txt"), 1, False)
         self.assertEqual(target_line_number, ln)
         self.assertEqual(key, k)
         self.assertEqual(plaintext, p)
 
+    def test_set1_challenge4_ranked(self):
+        # Detect single-character XOR, keeping the runners up
+        ranked = top_xor_lines(payload_path("Set1Challenge4.txt"), 1, 5)
+        self.assertEqual(5, len(ranked))
+        line_number, score, key, plaintext = ranked[0]
+        self.assertEqual((171, '5', b"Now that the party is jumping\n"), (line_number, key, plaintext))
+        self.assertEqual(sorted(record[1] for record in ranked), [record[1] for record in ranked])
+
     def test_set1_challenge5(self):
         # Implement repeating-key XOR
         plaintext_line = "Burning 'em, if you ain't quick and nimble\nI go crazy when I hear a cymbal"
@@ -55,9 +70,8 @@ class Set1(unittest.TestCase):
     def test_set1_challenge6_brute(self):
         # load in the cyphertext file
         expected_key = "Terminator X: Bring the noise"  # Note: key length = 29
-        with open("../../../Payloads/Set1Challenge6.txt") as file:
-            cyphertext = b64decode(file.read().replace('\n', '')).decode()
-            expected_plaintext = xor(bytes(cyphertext, "ascii"), bytes(expected_key, "ascii")).decode("ascii")
+        cyphertext = load_payload(payload_path("Set1Challenge6.txt")).decode()
+        expected_plaintext = xor(bytes(cyphertext, "ascii"), bytes(expected_key, "ascii")).decode("ascii")
         # Timing code will show the difference between brute forcing and intelligent guessing
         start = timeit.default_timer()
         key, plaintext = brute_repeating_key_xor(cyphertext, 40, False)
@@ -69,9 +83,8 @@ class Set1(unittest.TestCase):
     def test_set1_challenge6_break(self):
         # load in the cyphertext file
         expected_key = "Terminator X: Bring the noise"
-        with open("../../../Payloads/Set1Challenge6.txt") as file:
-            cyphertext = b64decode(file.read().replace('\n', '')).decode()
-            expected_plaintext = xor(bytes(cyphertext, "ascii"), bytes(expected_key, "ascii")).decode("ascii")
+        cyphertext = load_payload(payload_path("Set1Challenge6.txt")).decode()
+        expected_plaintext = xor(bytes(cyphertext, "ascii"), bytes(expected_key, "ascii")).decode("ascii")
         # Timing code will show how much faster this method is than brute forcing
         start = timeit.default_timer()
         key, plaintext = break_repeating_key_xor(cyphertext, 40, False)
@@ -80,20 +93,62 @@ class Set1(unittest.TestCase):
         self.assertEqual(expected_key, key)
         self.assertEqual(expected_plaintext, plaintext)
 
+    def test_set1_challenge6_parallel(self):
+        # load in the cyphertext file
+        expected_key = "Terminator X: Bring the noise"
+        cyphertext = load_payload(payload_path("Set1Challenge6.txt")).decode()
+        expected_plaintext = xor(bytes(cyphertext, "ascii"), bytes(expected_key, "ascii")).decode("ascii")
+        start = timeit.default_timer()
+        key, plaintext = parallel_break_repeating_key_xor(cyphertext, 40, 4, False)
+        elapsed = timeit.default_timer() - start
+        print("Time to break repeated key XOR across processes: {}".format(elapsed))
+        self.assertEqual(expected_key, key)
+        self.assertEqual(expected_plaintext, plaintext)
+
+    def test_set1_challenge6_pruned(self):
+        # knowing the key length, a pruned search finds the key without enumerating the key space
+        expected_key = b"Terminator X: Bring the noise"
+        cyphertext = load_payload(payload_path("Set1Challenge6.txt"))
+        results, stats = search_xor_keys(cyphertext, len(expected_key), top=3)
+        self.assertEqual(expected_key, results[0][0])
+        self.assertEqual(3, len(results))
+        self.assertEqual(stats.candidates, stats.tried + stats.pruned)
+        self.assertLess(stats.tried, 100)
+
+    def test_set1_challenge6_cached(self):
+        # breaking the same cyphertext again is a cache hit
+        expected_key = "Terminator X: Bring the noise"
+        cyphertext = load_payload(payload_path("Set1Challenge6.txt")).decode()
+        cache = ResultCache()
+        first = break_repeating_key_xor(cyphertext, 40, False, cache)
+        start = timeit.default_timer()
+        second = break_repeating_key_xor(cyphertext, 40, False, cache)
+        elapsed = timeit.default_timer() - start
+        print("Time to break repeated key XOR from the cache: {}".format(elapsed))
+        self.assertEqual(expected_key, first[0])
+        self.assertEqual(first, second)
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+    def test_set1_challenge6_key_sizes(self):
+        # the estimate is decisive, so only one key size needs a full solve, even with its multiple 58 in range
+        cyphertext = load_payload(payload_path("Set1Challenge6.txt"))
+        key_sizes = likely_key_sizes(cyphertext, 80)
+        self.assertEqual([29], [key_size for key_size, confidence in key_sizes])
+        self.assertGreater(key_sizes[0][1], 0.99)
+        key, plaintext = break_repeating_key_xor_bytes(cyphertext, 80)
+        self.assertEqual(b"Terminator X: Bring the noise", key)
+
     def test_set1_challenge7(self):
         # Decrypt AES-128-ECB mode
-        with open("../../../Payloads/Set1Challenge7.txt") as file:
-            cyphertext: str = file.read().replace('\n', '')
-            cyphertext = b64decode(cyphertext)
-        # I didn't implement this, I'm just using the pycrypto library to encrypt/decrypt
-        cipher = AES.new("YELLOW SUBMARINE", AES.MODE_ECB)
+        cyphertext = load_payload(payload_path("Set1Challenge7.txt"))
+        cipher = AES.new(b"YELLOW SUBMARINE", AES.MODE_ECB)
         plaintext: str = cipher.decrypt(cyphertext).decode()
         expected_plaintext_start = "I'm back and I'm ringin' the bell"
         self.assertTrue(plaintext.startswith(expected_plaintext_start))
 
     def test_set1_challenge8(self):
         # Detect ECB encryption
-        filename = "../../../Payloads/Set1Challenge8.txt"
+        filename = payload_path("Set1Challenge8.txt")
         expected_line_number = 133
         actual_line_number = find_ecb_line(filename)
         self.assertEqual(expected_line_number, actual_line_number)
@@ -1,8 +1,9 @@
 import unittest
 from Python.src.ByteManip import *
 from Python.src.Oracles import *
-from Crypto.Cipher import AES
-from base64 import b64decode
+from Python.src.ByteAtATime import byte_at_a_time
+from Python.src import AES
+from Python.src.PayloadLoader import load_payload, payload_path
 
 
 class Set2(unittest.TestCase):
@@ -15,11 +16,10 @@ class Set2(unittest.TestCase):
 
     def test_set2_challenge10(self):
         # implement cbc mode
-        with open("../../../Payloads/Set2Challenge10.txt") as file:
-            cyphertext: str = b64decode(file.read().replace('\n', ''))
-        key = "YELLOW SUBMARINE"
+        cyphertext = load_payload(payload_path("Set2Challenge10.txt"))
+        key = b"YELLOW SUBMARINE"
         # IV is 16 bytes of ASCII zeros
-        initialization_vector = "\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00"
+        initialization_vector = b"\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00\x00"
         cipher = AES.new(key, AES.MODE_CBC, initialization_vector)
         plaintext: str = cipher.decrypt(cyphertext).decode()
         expected_plaintext_start = "I'm back and I'm ringin' the bell"
@@ -27,10 +27,36 @@ class Set2(unittest.TestCase):
 
     def test_set2_challenge11(self):
         # ECB/CBC detection oracle
-        # generate some random gibberish and encrypt it
-        cyphertext, mode = rand_encrypt(gibberish(2048))
+        # choose a plaintext which repeats, so at least two whole blocks are identical whatever is added before it
+        cyphertext, mode = rand_encrypt("A" * 64)
         self.assertEqual(mode, detection_oracle(cyphertext))
 
+    def test_set2_challenge11_accuracy(self):
+        # measure the detection oracle over many reproducible samples of both modes
+        samples = EncryptionOracle(seed=11).samples(b"A" * 64, 500)
+        self.assertEqual({AES.MODE_ECB, AES.MODE_CBC}, {mode for cyphertext, mode in samples})
+        self.assertEqual(1.0, detection_accuracy(samples))
+
+    def test_set2_challenge12(self):
+        # byte-at-a-time ECB decryption (simple)
+        secret = load_payload(payload_path("Set2Challenge12.txt"))
+        result = byte_at_a_time(EcbOracle(secret))
+        print("Recovered {} bytes with {} oracle calls in {:.3f} s".format(
+            len(result.plaintext), result.oracle_calls, result.seconds))
+        self.assertEqual(secret, result.plaintext)
+        self.assertEqual(16, result.block_size)
+        self.assertEqual(0, result.prefix_length)
+        # far fewer than the 256 calls per byte of a dictionary built one call at a time
+        self.assertLess(result.oracle_calls, 2 * len(secret))
+
+    def test_set2_challenge14(self):
+        # byte-at-a-time ECB decryption (harder), with a random count of random bytes before the input
+        secret = load_payload(payload_path("Set2Challenge12.txt"))
+        prefix = secrets.token_bytes(secrets.randbelow(48) + 1)
+        result = byte_at_a_time(EcbOracle(secret, prefix))
+        self.assertEqual(secret, result.plaintext)
+        self.assertEqual(len(prefix), result.prefix_length)
+
 
 if __name__ == '__main__':
     unittest.main()
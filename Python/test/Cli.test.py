@@ -0,0 +1,84 @@
+import unittest
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from Python.src.Cli import *
+from Python.src.PayloadLoader import payload_path
+
+
+class CliTest(unittest.TestCase):
+    def run_cli(self, *argv) -> (int, [dict]):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            status = main(list(argv))
+        return status, [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def test_break_xor(self):
+        status, results = self.run_cli("break-xor", payload_path("Set1Challenge6.txt"))
+        self.assertEqual(0, status)
+        self.assertEqual("Terminator X: Bring the noise", results[0]["key"])
+        self.assertEqual(b"Terminator X: Bring the noise".hex(), results[0]["key_hex"])
+        self.assertTrue(results[0]["plaintext"].startswith("I'm back and I'm ringin' the bell"))
+
+    def test_brute_xor_file(self):
+        status, results = self.run_cli("brute-xor-file", payload_path("Set1Challenge4.txt"))
+        self.assertEqual((171, "5", "Now that the party is jumping\n"),
+                         (results[0]["line"], results[0]["key"], results[0]["plaintext"]))
+
+    def test_parallel_batch_keeps_order_and_reports_errors(self):
+        ecb = payload_path("Set1Challenge8.txt")
+        missing = payload_path("NoSuchPayload.txt")
+        status, results = self.run_cli("find-ecb", ecb, missing, ecb, "--jobs", "2")
+        self.assertEqual(1, status)
+        self.assertEqual([ecb, missing, ecb], [result["input"] for result in results])
+        self.assertEqual([133, 133], [result["line"] for result in results if "error" not in result])
+        self.assertIn("FileNotFoundError", results[1]["error"])
+
+    def test_rejects_non_positive_jobs(self):
+        for jobs in ("0", "-2", "two"):
+            with contextlib.redirect_stderr(io.StringIO()) as errors, self.assertRaises(SystemExit) as exit:
+                main(["find-ecb", "--jobs", jobs])
+            self.assertEqual(2, exit.exception.code)
+            self.assertIn("--jobs", errors.getvalue())
+
+    def test_detect_mode_from_stdin(self):
+        stdin = sys.stdin
+        sys.stdin = io.TextIOWrapper(io.BytesIO(b"YELLOW SUBMARINE" * 4))
+        try:
+            status, results = self.run_cli("detect-mode", "--encoding", "raw")
+        finally:
+            sys.stdin = stdin
+        self.assertEqual([{"command": "detect-mode", "input": "-", "mode": "ECB"}], results)
+
+    def test_detect_mode_cbc(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cbc.bin")
+            with open(path, "wb") as file:
+                file.write(bytes(range(64)))
+            self.assertEqual("CBC", run_command("detect-mode", path, {"encoding": "raw", "block_size": 16})["mode"])
+
+    def test_short_hex_needs_an_encoding(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "short.hex")
+            with open(path, "w") as file:
+                file.write(b"YELLOW S".hex() * 2)  # 32 hex digits, which are also valid base64
+            status, results = self.run_cli("detect-mode", path, "--block-size", "8")
+            self.assertEqual(1, status)
+            self.assertIn("pass its encoding", results[0]["error"])
+            status, results = self.run_cli("detect-mode", path, "--block-size", "8", "--encoding", "hex")
+            self.assertEqual((0, "ECB"), (status, results[0]["mode"]))
+
+    def test_aes_is_imported_lazily(self):
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        check = "import sys; import Python.src.Cli; print('Python.src.AES' in sys.modules)"
+        output = subprocess.run([sys.executable, "-c", check], cwd=root, capture_output=True, text=True,
+                                env=dict(os.environ, PYTHONPATH=root)).stdout
+        self.assertEqual("False", output.strip())
+
+
+if __name__ == '__main__':
+    unittest.main()
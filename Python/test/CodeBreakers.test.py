@@ -0,0 +1,76 @@
+import unittest
+import os
+import tempfile
+from Python.src.CodeBreakers import *
+
+PLAINTEXT = b"Burning 'em, if you ain't quick and nimble\nI go crazy when I hear a cymbal " * 4
+
+
+class CodeBreakersTest(unittest.TestCase):
+    def setUp(self):
+        # varied lengths, including empty cyphertexts at the start, the middle and the end
+        self.cyphertexts = [b"", xor(PLAINTEXT[:40], b"5"), b"\x00", b"", xor(PLAINTEXT[40:], b"X"), bytes(range(256)),
+                            b""]
+
+    def test_pack_cyphertexts(self):
+        buffer, offsets = pack_cyphertexts(self.cyphertexts)
+        self.assertEqual(b"".join(self.cyphertexts), buffer)
+        self.assertEqual(len(self.cyphertexts) + 1, len(offsets))
+        self.assertEqual((0, len(buffer)), (offsets[0], offsets[-1]))
+        self.assertEqual(self.cyphertexts, [buffer[offsets[i]:offsets[i + 1]] for i in range(len(self.cyphertexts))])
+        self.assertEqual((b"", [0]), pack_cyphertexts([]))
+
+    def test_xor_score_matrix(self):
+        matrix = xor_score_matrix(*pack_cyphertexts(self.cyphertexts))
+        self.assertEqual(len(self.cyphertexts), len(matrix))
+        for cyphertext, row in zip(self.cyphertexts, matrix):
+            self.assertEqual(256, len(row))
+            for key in range(256):
+                self.assertEqual(score_text(xor_single_byte(cyphertext, key).decode('latin-1')), row[key])
+        self.assertEqual([], xor_score_matrix(b"", [0]))
+
+    def test_crack_single_byte_xor_batch(self):
+        cracked = crack_single_byte_xor_batch(*pack_cyphertexts(self.cyphertexts))
+        self.assertEqual(len(self.cyphertexts), len(cracked))
+        for cyphertext, (key, score) in zip(self.cyphertexts, cracked):
+            self.assertEqual(rank_single_byte_xor(cyphertext, 1, PRINTABLE_KEYS)[0], (key, score))
+        self.assertEqual((ord("5"), ord("X")), (cracked[1][0], cracked[4][0]))
+        # a scorer where higher is better, and every key
+        scorer = compile_scorer({'e': 0.12, 't': 0.09, ' ': 0.13})
+        cracked = crack_single_byte_xor_batch(*pack_cyphertexts(self.cyphertexts), bytes(range(256)), scorer)
+        for cyphertext, result in zip(self.cyphertexts, cracked):
+            self.assertEqual(rank_single_byte_xor(cyphertext, 1, bytes(range(256)), scorer)[0], result)
+
+    def test_search_long_xor_keys(self):
+        # far more key bytes than the recursion limit
+        key = bytes(ord('a') + i % 26 for i in range(3000))
+        cyphertext = xor(PLAINTEXT * 40, key)
+        results, stats = search_xor_keys(cyphertext, len(key), top=2)
+        self.assertEqual([3000, 3000], [len(found_key) for found_key, score in results])
+        self.assertEqual(2, stats.tried)
+        # the best key is the best byte of every column on its own
+        columns = [bytes(column) for column in transpose(cyphertext, 3000)]
+        columns = crack_single_byte_xor_batch(*pack_cyphertexts(columns))
+        self.assertAlmostEqual(sum(score for byte, score in columns), results[0][1])
+
+    def test_pruned_brute_xor(self):
+        cyphertext = xor(PLAINTEXT, b"ICE")
+        key, plaintext = brute_xor_bytes(cyphertext, 3, prune=True, candidates=MaskSpace("?u?u?u"))
+        self.assertEqual((b"ICE", PLAINTEXT), (key, plaintext))
+
+    def test_pruned_brute_xor_rejects_other_key_spaces(self):
+        cyphertext = xor(PLAINTEXT, b"ICE")
+        self.assertRaises(ValueError, brute_xor_bytes, cyphertext, 3, prune=True,
+                          candidates=CombinationSpace(b"CEI", 3))
+        self.assertRaises(ValueError, brute_xor_bytes, cyphertext, 3, prune=True, candidates=[b"ICE"])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "words.txt")
+            with open(path, 'wb') as file:
+                file.write(b"ICE\n")
+            self.assertRaises(ValueError, brute_xor_bytes, cyphertext, 3, prune=True,
+                              candidates=WordlistSpace(path))
+            self.assertRaises(ValueError, search_xor_keys, cyphertext, 3, WordlistSpace(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+import tracemalloc
+import logging
+import threading
+from Python.src.CodeBreakers import *
+
+
+class InstrumentationTest(unittest.TestCase):
+    def test_off_by_default(self):
+        self.assertIs(NULL_INSTRUMENTS, instruments())
+        self.assertIs(len, instruments().timed("len", len))
+        brute_xor_bytes(xor(b"Cooking MC's like a pound of bacon", b"X"), 1)
+        self.assertEqual(0, sum(NULL_INSTRUMENTS.counters.values()))
+
+    def test_counts_and_times_brute_xor(self):
+        cyphertext = xor(b"Now that the party is jumping", b"ab")
+        with instrumented() as collector:
+            key, plaintext = brute_xor_bytes(cyphertext, 2)
+        self.assertIs(NULL_INSTRUMENTS, instruments())
+        self.assertEqual(len(CombinationSpace(PRINTABLE_KEYS, 2)), collector.counters["candidates"])
+        self.assertEqual(collector.counters["candidates"], collector.calls["xor"])
+        self.assertEqual(collector.counters["candidates"], collector.calls["score"])
+        self.assertGreater(collector.timings["score"], 0)
+        self.assertIn("candidates", collector.report())
+
+    def test_key_length_events(self):
+        plaintext = b"Burning 'em, if you ain't quick and nimble\nI go crazy when I hear a cymbal"
+        events = []
+        with instrumented(Instruments(lambda name, fields: events.append((name, fields)))) as collector:
+            key, guess = break_repeating_key_xor_bytes(xor(plaintext, b"ICE"), 10)
+        key_lengths = [fields["key_len"] for name, fields in events if name == "key_length"]
+        self.assertEqual(len(key_lengths), collector.calls["solve"])
+        self.assertIn(len(key), key_lengths)
+        self.assertEqual(1, collector.calls["key_sizes"])
+
+    def test_events_are_logged(self):
+        with self.assertLogs("CodeBreakers", logging.DEBUG) as logs:
+            with instrumented() as collector:
+                collector.event("key_length", key_len=3)
+        self.assertEqual(["DEBUG:CodeBreakers:key_length key_len=3"], logs.output)
+
+    def test_profile_and_memory(self):
+        with instrumented(profile=True, trace_memory=True) as collector:
+            brute_xor_bytes(xor(b"Cooking MC's like a pound of bacon", b"X"), 1)
+        self.assertGreater(collector.profile.total_calls, 0)
+        self.assertGreater(collector.memory[1], 0)
+
+    def test_nested_memory_tracing(self):
+        with instrumented(trace_memory=True) as outer:
+            block = bytearray(1 << 20)
+            del block
+            with instrumented(trace_memory=True) as inner:
+                kept = bytearray(1 << 16)
+            self.assertTrue(tracemalloc.is_tracing())  # the inner block leaves the outer block's tracing on
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertGreaterEqual(inner.memory[0], 1 << 16)
+        self.assertLess(inner.memory[1], 1 << 20)  # the outer block's earlier peak isn't the inner block's
+        self.assertGreaterEqual(outer.memory[1], 1 << 20)  # and the inner block's reset_peak doesn't hide it
+        del kept
+
+    def test_caller_tracing_is_kept(self):
+        tracemalloc.start()
+        try:
+            with instrumented(trace_memory=True) as collector:
+                data = bytearray(1 << 16)
+            self.assertTrue(tracemalloc.is_tracing())
+            self.assertGreaterEqual(collector.memory[1], 1 << 16)
+            del data
+        finally:
+            tracemalloc.stop()
+
+    def test_threaded_memory_tracing(self):
+        # the first thread's block ends while the second thread's block is still open
+        first_peaked, second_open, first_done = threading.Event(), threading.Event(), threading.Event()
+        collectors, still_tracing = {}, []
+
+        def first():
+            with instrumented(trace_memory=True) as collectors["first"]:
+                data = bytearray(1 << 20)
+                del data
+                first_peaked.set()
+                second_open.wait()
+            first_done.set()
+
+        def second():
+            first_peaked.wait()
+            with instrumented(trace_memory=True) as collectors["second"]:
+                second_open.set()
+                first_done.wait()
+                still_tracing.append(tracemalloc.is_tracing())
+                data = bytearray(1 << 18)
+                del data
+
+        threads = [threading.Thread(target=first), threading.Thread(target=second)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual([True], still_tracing)
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertGreaterEqual(collectors["first"].memory[1], 1 << 20)
+        self.assertGreater(collectors["second"].memory[1], 1 << 17)  # other threads free memory meanwhile
+        self.assertLess(collectors["second"].memory[1], 1 << 20)  # the first block's peak came before it began
+
+
+if __name__ == '__main__':
+    unittest.main()
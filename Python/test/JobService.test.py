@@ -0,0 +1,85 @@
+import unittest
+import asyncio
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from Python.src.JobService import *
+
+LINES = [bytes(range(i, i + 30)).hex() for i in range(0, 200, 7)]
+ENCRYPTED_LINE = 17
+PLAINTEXT = b"Now that the party is jumping\n"
+
+
+class JobServiceTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.executor = ThreadPoolExecutor(2)
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "lines.txt")
+        lines = list(LINES)
+        lines[ENCRYPTED_LINE - 1] = xor(PLAINTEXT, b"5").hex()
+        with open(self.filename, 'w') as file:
+            file.write("\n".join(lines))
+
+    def tearDown(self):
+        self.executor.shutdown()
+        self.directory.cleanup()
+
+    async def test_brute_xor(self):
+        async with JobService(executor=self.executor) as service:
+            cyphertext = "1b37373331363f78151b7f2b783431333d78397828372d363c78373e783a393b3736"
+            job = service.submit("brute_xor", cyphertext, 1)
+            self.assertEqual(("X", "Cooking MC's like a pound of bacon"), await job.result())
+            self.assertEqual(DONE, job.status)
+
+    async def test_brute_xor_file_streams_progress(self):
+        async with JobService(executor=self.executor, batch_size=8) as service:
+            job = service.submit("brute_xor_file", self.filename, 1)
+            updates = [progress async for progress in job.updates()]
+            self.assertEqual((ENCRYPTED_LINE, "5", PLAINTEXT.decode()), await job.result())
+            self.assertEqual(4, len(updates))  # 29 lines in batches of 8
+            self.assertEqual(len(LINES), updates[-1].completed)
+            self.assertEqual(await job.result(), updates[-1].best)
+
+    async def test_break_repeating_key_xor(self):
+        plaintext = "Burning 'em, if you ain't quick and nimble\nI go crazy when I hear a cymbal " * 4
+        cyphertext = xor(plaintext.encode(), b"ICE").decode()
+        async with JobService(executor=self.executor) as service:
+            job = service.submit("break_repeating_key_xor", cyphertext, 10)
+            self.assertEqual(break_repeating_key_xor(cyphertext, 10), await job.result())
+
+    async def test_find_ecb_line(self):
+        with open(self.filename, 'a') as file:
+            file.write("\n" + (b"YELLOW SUBMARINE" * 4).hex())
+        async with JobService(executor=self.executor) as service:
+            job = service.submit("find_ecb_line", self.filename)
+            self.assertEqual(len(LINES) + 1, await job.result())
+
+    async def test_cancel(self):
+        async with JobService(executor=self.executor, batch_size=1) as service:
+            job = service.submit("brute_xor_file", self.filename, 1)
+            await asyncio.sleep(0)
+            job.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await job.result()
+            self.assertEqual(CANCELLED, job.status)
+
+    async def test_timeout(self):
+        async with JobService(executor=self.executor, batch_size=1) as service:
+            job = service.submit("brute_xor_file", self.filename, 3, timeout=0.01)
+            with self.assertRaises(asyncio.TimeoutError):
+                await job.result()
+            self.assertEqual(TIMED_OUT, job.status)
+
+    async def test_process_pool(self):
+        async with JobService(workers=2) as service:
+            jobs = [service.submit("brute_xor_file", self.filename, 1) for _ in range(3)]
+            for job in jobs:
+                self.assertEqual(ENCRYPTED_LINE, (await job.result())[0])
+
+    async def test_unknown_kind(self):
+        async with JobService(executor=self.executor) as service:
+            self.assertRaises(ValueError, service.submit, "rot13", "abc")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import os
+import tempfile
+from itertools import product, combinations_with_replacement
+from Python.src.KeySpaces import *
+
+
+class KeySpacesTest(unittest.TestCase):
+    def test_alphabet_space_is_every_ordering(self):
+        space = AlphabetSpace(b"abc", 2)
+        self.assertEqual(9, len(space))
+        self.assertEqual([bytes(key) for key in product(b"abc", repeat=2)], list(space))
+        self.assertIn(b"ab", list(space))
+        self.assertIn(b"ba", list(space))
+
+    def test_key_at_matches_iteration(self):
+        space = MaskSpace("?d-?l")
+        keys = list(space)
+        self.assertEqual(10 * 26, len(keys))
+        for index in (0, 1, 25, 26, 259):
+            self.assertEqual(keys[index], space.key_at(index))
+        self.assertRaises(IndexError, space.key_at, len(space))
+
+    def test_shards_cover_the_space(self):
+        space = ByteSpace(2)
+        sharded = [key for start, stop in space.shards(7) for key in space.shard(start, stop)]
+        self.assertEqual(list(space), sharded)
+
+    def test_mask_space(self):
+        space = MaskSpace("Key?d??")
+        self.assertEqual([b"Key0?", b"Key1?"], list(space.shard(0, 2)))
+        self.assertEqual(10, len(space))
+        self.assertRaises(ValueError, MaskSpace, "?x")
+        self.assertRaises(ValueError, MaskSpace, "abc?")
+
+    def test_combination_space_matches_legacy_order(self):
+        space = CombinationSpace(b"abcd", 3)
+        expected = [bytes(key) for key in combinations_with_replacement(b"abcd", 3)]
+        self.assertEqual(len(expected), len(space))
+        self.assertEqual(expected, list(space))
+        self.assertEqual(expected[5:9], list(space.shard(5, 9)))
+        # every shard unranks its own start, and together the shards cover the space
+        space = CombinationSpace(b"abcde", 4)
+        expected = list(space)
+        for start in range(len(expected)):
+            self.assertEqual(expected[start:start + 3], list(space.shard(start, start + 3)))
+        self.assertEqual(expected, [key for start, stop in space.shards(6) for key in space.shard(start, stop)])
+        self.assertEqual([], list(space.shard(len(space), len(space) + 5)))
+
+    def test_incomplete_key_space(self):
+        class Unsized(KeySpace):
+            def shard(self, start: int, stop: int) -> iter:
+                return iter([])
+
+        self.assertRaises(TypeError, Unsized)
+        self.assertRaises(TypeError, KeySpace)
+
+    def test_wordlist_space(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "words.txt")
+            with open(path, 'wb') as file:
+                file.write(b"ICE\nYELLOW SUBMARINE\r\n  padded  \n")
+            space = WordlistSpace(path)
+            self.assertEqual(3, len(space))
+            self.assertEqual([b"ICE", b"YELLOW SUBMARINE", b"padded"], list(space))
+            self.assertEqual([b"YELLOW SUBMARINE"], list(space.shard(1, 2)))
+
+    def test_wordlist_space_checkpoints(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "words.txt")
+            words = [b"word%d" % i for i in range(2500)]
+            with open(path, 'wb') as file:
+                file.write(b"\n".join(words) + b"\n")
+            space = WordlistSpace(path)
+            self.assertEqual(words, [key for key in space])
+            self.assertIsNone(space._length)  # iterating streams the file without counting it first
+            for start, stop in [(0, 3), (1023, 1026), (1024, 1025), (2047, 2049), (2499, 2600), (2600, 2700)]:
+                self.assertEqual(words[start:stop], list(space.shard(start, stop)))
+            self.assertEqual(2500, len(space))
+            self.assertEqual(words, [key for start, stop in space.shards(7) for key in space.shard(start, stop)])
+
+
+if __name__ == '__main__':
+    unittest.main()
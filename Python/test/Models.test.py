@@ -0,0 +1,85 @@
+import unittest
+import os
+import tempfile
+from Python.src.Models import *
+from Python.src.CodeBreakers import rank_single_byte_xor
+from Python.src.ByteManip import xor_single_byte
+
+CORPUS = b"It was the best of times, it was the worst of times, it was the age of wisdom, " \
+         b"it was the age of foolishness, it was the epoch of belief, it was the epoch of incredulity. " * 20
+
+
+class ModelsTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.corpus_path = os.path.join(self.directory.name, "corpus.txt")
+        with open(self.corpus_path, 'wb') as file:
+            file.write(CORPUS)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_english_beats_gibberish(self):
+        model = build_model(self.corpus_path)
+        self.assertGreater(model.score(b"the age of wisdom"), model.score(b"qzx vkj wpqz jxqv"))
+        self.assertLess(model.chi_squared(b"the age of wisdom"), model.chi_squared(b"qzx vkj wpqz jxqv"))
+
+    def test_chunked_build_matches_single_read(self):
+        whole = build_model(self.corpus_path)
+        chunked = build_model(self.corpus_path, chunk_size=7)
+        for whole_table, chunked_table in zip(whole.tables, chunked.tables):
+            self.assertEqual(list(whole_table), list(chunked_table))
+
+    def test_rebuild_replaces_mapped_model(self):
+        model = load_model(self.corpus_path)
+        model.score(b"the epoch")  # maps the model file
+        with open(self.corpus_path, 'ab') as file:
+            file.write(b"it was the spring of hope")
+        os.utime(self.corpus_path, (os.path.getmtime(model.path) + 10,) * 2)
+        rebuilt = load_model(self.corpus_path)
+        self.assertIsNot(model, rebuilt)
+        rebuilt.score(b"the spring")
+        self.assertEqual(len(CORPUS) + 25, rebuilt.trained_bytes)
+        self.assertEqual(len(CORPUS), model.trained_bytes)  # the old model still reads the file it mapped
+        model.score(b"the epoch")
+        self.assertEqual(["corpus.ngram", "corpus.txt"], sorted(os.listdir(self.directory.name)))
+        model.close()
+        rebuilt.close()
+
+    def test_reload_while_tables_are_held(self):
+        model = load_model(self.corpus_path)
+        unigrams = model.tables[0]
+        expected = unigrams[ord('e')]
+        os.utime(self.corpus_path, (os.path.getmtime(model.path) + 10,) * 2)
+        rebuilt = load_model(self.corpus_path)
+        self.assertIsNot(model, rebuilt)
+        self.assertEqual(expected, unigrams[ord('e')])
+        with self.assertRaises(BufferError):
+            model.close()
+        self.assertEqual(expected, model.tables[0][ord('e')])  # a failed close leaves the model usable
+        del unigrams
+        model.close()
+        self.assertIsNone(model._mmap)
+        self.assertEqual(expected, model.tables[0][ord('e')])  # and a closed model maps the file again
+        model.close()
+        rebuilt.close()
+
+    def test_saved_model_round_trip(self):
+        model = load_model(self.corpus_path)
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, "corpus.ngram")))
+        self.assertIs(model, load_model(self.corpus_path))
+        built = build_model(self.corpus_path)
+        self.assertEqual(built.trained_bytes, len(CORPUS))
+        self.assertAlmostEqual(built.score(b"the epoch"), model.score(b"the epoch"), places=3)
+        self.assertEqual(model.trained_bytes, len(CORPUS))
+        model.close()
+
+    def test_model_scorer_breaks_single_byte_xor(self):
+        model = build_model(self.corpus_path)
+        cyphertext = xor_single_byte(b"it was the season of light", ord('K'))
+        key, score = rank_single_byte_xor(cyphertext, 1, scorer=model.scorer())[0]
+        self.assertEqual(ord('K'), key)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+from Python.src.OnlineBreakers import *
+from Python.src.PayloadLoader import load_payload, payload_path
+
+
+class OnlineBreakersTest(unittest.TestCase):
+    def setUp(self):
+        self.cyphertext = bytes(load_payload(payload_path("Set1Challenge6.txt")))
+
+    def test_chunked_matches_whole(self):
+        whole = OnlineXorBreaker(40).update(self.cyphertext)
+        chunked = OnlineXorBreaker(40).feed(self.cyphertext[i:i + 7] for i in range(0, len(self.cyphertext), 7))
+        self.assertEqual(len(self.cyphertext), chunked.position)
+        self.assertEqual(whole.key_length_scores(), chunked.key_length_scores())
+        self.assertEqual(whole.guesses(3), chunked.guesses(3))
+
+    def test_breaks_challenge6(self):
+        expected_key = b"Terminator X: Bring the noise"
+        breaker = OnlineXorBreaker(40)
+        for i in range(0, len(self.cyphertext), 512):
+            breaker.update(memoryview(self.cyphertext)[i:i + 512])
+        key, score = breaker.best()
+        self.assertEqual(expected_key, key)
+        # the column scores add up to the score of the whole decryption
+        self.assertEqual(compile_scorer().score(xor(self.cyphertext, key)), score)
+        self.assertEqual(key, breaker.best(candidates=5)[0])
+
+    def test_matches_batch_break(self):
+        key, plaintext = break_key_lengths(self.cyphertext, [29], False)
+        self.assertEqual(key, OnlineXorBreaker(29, 29).update(self.cyphertext).guess(29)[0])
+
+    def test_hamming_statistics(self):
+        breaker = OnlineXorBreaker(3, 1).update(b"\x00\x01").update(b"").update(b"\x03")
+        # pairs one apart: 00^01, 01^03; two apart: 00^03; none three apart yet
+        self.assertEqual([(1, 1.0), (2, 2.0), (3, 8.0)], breaker.key_length_scores())
+
+    def test_invalid_key_lengths(self):
+        self.assertRaises(ValueError, OnlineXorBreaker, 2, 3)
+        self.assertRaises(ValueError, OnlineXorBreaker, 2, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+from Python.src.Oracles import *
+
+
+class OraclesTest(unittest.TestCase):
+    def test_seeded_oracle_is_reproducible(self):
+        plaintexts = [b"", b"YELLOW SUBMARINE", bytes(range(100))]
+        self.assertEqual(EncryptionOracle(seed=7).batch(plaintexts), EncryptionOracle(seed=7).batch(plaintexts))
+        self.assertNotEqual(EncryptionOracle(seed=7).batch(plaintexts), EncryptionOracle(seed=8).batch(plaintexts))
+
+    def test_cyphertext_lengths(self):
+        for plaintext_length in (0, 1, 15, 16, 100):
+            for cyphertext, mode in EncryptionOracle(seed=plaintext_length).samples(bytes(plaintext_length), 50):
+                self.assertEqual(0, len(cyphertext) % 16)
+                # 10 to 20 added bytes and 1 to 16 bytes of padding
+                self.assertLessEqual(plaintext_length + 11, len(cyphertext))
+                self.assertLessEqual(len(cyphertext), plaintext_length + 36)
+
+    def test_reused_key_is_shared(self):
+        oracle = EncryptionOracle(seed=1, reuse_key=True)
+        ecb = [cyphertext for cyphertext, mode in oracle.samples(b"B" * 64, 40) if mode == AES.MODE_ECB]
+        # every sample has a run of "BBBB..." blocks, which only encrypt the same under the same key
+        blocks = [set(cyphertext[i:i + 16] for i in range(0, len(cyphertext), 16)) for cyphertext in ecb]
+        self.assertTrue(set.intersection(*blocks))
+
+    def test_secure_oracle(self):
+        samples = EncryptionOracle().samples(b"A" * 64, 50)
+        self.assertEqual(1.0, detection_accuracy(samples))
+        self.assertEqual(0.0, detection_accuracy([]))
+
+
+if __name__ == '__main__':
+    unittest.main()
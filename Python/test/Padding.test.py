@@ -0,0 +1,70 @@
+import unittest
+from Python.src.Padding import *
+
+
+class PaddingTest(unittest.TestCase):
+    def test_pad(self):
+        self.assertEqual(b"YELLOW SUBMARINE\x04\x04\x04\x04", pad(b"YELLOW SUBMARINE", 20))
+        self.assertEqual(b"\x10" * 16, pad(b""))
+        self.assertEqual(b"YELLOW SUBMARINE" + b"\x10" * 16, pad(b"YELLOW SUBMARINE"))
+        self.assertEqual(b"abc" + b"\x0d" * 13, pad(memoryview(b"abc")))
+        self.assertRaises(ValueError, pad, b"abc", 256)
+
+    def test_pad_into(self):
+        buffer = bytearray(32)
+        buffer[:5] = b"hello"
+        self.assertEqual(16, pad_into(buffer, 5))
+        self.assertEqual(b"hello" + b"\x0b" * 11 + bytes(16), bytes(buffer))
+        self.assertRaises(ValueError, pad_into, bytearray(16), 16)
+
+    def test_unpad_round_trip(self):
+        for length in range(40):
+            message = bytes(range(length))
+            for block_size in (8, 16):
+                self.assertEqual(message, unpad(pad(message, block_size), block_size))
+
+    def test_challenge_15(self):
+        # PKCS#7 padding validation
+        self.assertEqual(b"ICE ICE BABY", unpad(b"ICE ICE BABY\x04\x04\x04\x04"))
+        self.assertRaises(PaddingError, unpad, b"ICE ICE BABY\x05\x05\x05\x05")
+        self.assertRaises(PaddingError, unpad, b"ICE ICE BABY\x01\x02\x03\x04")
+
+    def test_invalid_padding(self):
+        self.assertFalse(validate(b""))
+        self.assertFalse(validate(b"ICE ICE BABY\x04\x04\x04"))  # not a whole block
+        self.assertFalse(validate(b"YELLOW SUBMARINE" + b"\x00" * 16))
+        self.assertFalse(validate(b"YELLOW SUBMARINE" + b"\x11" * 16))
+        self.assertFalse(validate(b"\xff" * 16))
+        self.assertTrue(validate(b"\x10" * 16))
+        self.assertTrue(validate(b"YELLOW SUBMARIN\x01"))
+
+    def test_every_last_byte(self):
+        # only the pad lengths 1 to 16 with matching bytes before them are valid
+        for n in range(256):
+            block = bytes([n]) * 16
+            self.assertEqual(1 <= n <= 16, validate(block))
+            broken = bytearray(block)
+            broken[-2] ^= 1
+            self.assertEqual(n == 1, validate(broken))
+
+    def test_batches(self):
+        messages = [b"", b"a", b"YELLOW SUBMARINE", bytes(31)]
+        padded = pad_batch(messages)
+        self.assertEqual([pad(message) for message in messages], padded)
+        self.assertEqual(messages, unpad_batch(padded))
+        self.assertEqual([True, False, True], validate_batch([padded[0], b"x" * 16, padded[2]]))
+        with self.assertRaisesRegex(PaddingError, "message 1"):
+            unpad_batch([padded[0], b"x" * 16])
+
+    def test_batch_matches_validate(self):
+        for block_size in (1, 8, 16):
+            messages = [b"", b"x" * (block_size + 1)]
+            for n in range(256):
+                messages.append(bytes(block_size) + bytes([n]) * block_size)
+                messages.append(bytes([n ^ 1]) + bytes([n]) * (block_size - 1))
+            self.assertEqual([validate(message, block_size) for message in messages],
+                             validate_batch(messages, block_size))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from unittest import mock
+from multiprocessing.shared_memory import SharedMemory
+from Python.src import ParallelBreakers
+from Python.src.ParallelBreakers import *
+
+PLAINTEXT = b"Burning 'em, if you ain't quick and nimble\nI go crazy when I hear a cymbal " * 4
+
+
+class ParallelBreakersTest(unittest.TestCase):
+    def setUp(self):
+        self.cyphertext = xor(PLAINTEXT, b"ICE")
+
+    def test_guesses_match_the_serial_breaker(self):
+        key_lengths = [2, 3, 5, 6, 7]
+        guesses = dict((len(key), (key, score)) for key, score in
+                       iter_repeating_key_xor_guesses(self.cyphertext, key_lengths + [3], 2, column_chunk=2))
+        self.assertEqual(sorted(key_lengths), sorted(guesses))
+        for key_len in key_lengths:
+            key, plaintext = break_key_lengths(self.cyphertext, [key_len], False)
+            self.assertEqual(key, guesses[key_len][0])
+            self.assertEqual(score_text(plaintext.decode('latin-1')), guesses[key_len][1])
+
+    def test_parallel_brute_matches_serial(self):
+        cyphertext = self.cyphertext.decode('ascii')
+        self.assertEqual(brute_repeating_key_xor(cyphertext, 8), parallel_brute_repeating_key_xor(cyphertext, 8, 2))
+        self.assertEqual(("ICE", PLAINTEXT.decode()), parallel_brute_repeating_key_xor(cyphertext, 8, 2))
+
+    def test_shared_memory_released_when_closed_early(self):
+        names = []
+
+        class RecordingSharedMemory(SharedMemory):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                names.append(self.name)
+
+        with mock.patch.object(ParallelBreakers, "SharedMemory", RecordingSharedMemory):
+            guesses = iter_repeating_key_xor_guesses(self.cyphertext, range(2, 41), 2)
+            next(guesses)
+            guesses.close()
+        self.assertTrue(names)
+        with self.assertRaises(FileNotFoundError):
+            SharedMemory(name=names[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
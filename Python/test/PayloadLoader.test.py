@@ -0,0 +1,87 @@
+import unittest
+import os
+import tempfile
+import tracemalloc
+from base64 import b64encode, b64decode
+from Python.src.PayloadLoader import *
+
+DATA = bytes(range(256)) * 5 + b"tail"
+
+
+class PayloadLoaderTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name: str, content: bytes) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'wb') as file:
+            file.write(content)
+        return path
+
+    def test_detect_format(self):
+        self.assertEqual(HEX, detect_format(b"0a1B2c\n3d4e\n"))
+        self.assertEqual(BASE64, detect_format(b"SGVsbG8=\r\n"))
+        self.assertEqual(RAW, detect_format(b"Hello, world"))
+        self.assertEqual(RAW, detect_format(b""))
+
+    def test_ambiguous_format(self):
+        # "deadbeef" is valid hex and valid base64, so it has to be named
+        self.assertIsNone(detect_format(b"deadbeef\n"))
+        self.assertEqual(HEX, detect_format(b"deadbeef" * 8))
+        self.assertEqual(BASE64, detect_format(b"deadbee="))
+        self.assertEqual(RAW, detect_format(b"deadbee"))  # too odd for hex, too short for base64
+        self.assertIsNone(detect_format(b"deadbee", complete=False))
+        path = self.write("short.b64", b"deadbeef\n")
+        self.assertRaises(ValueError, load_payload, path)
+        self.assertEqual(b64decode(b"deadbeef"), load_payload(path, BASE64))
+        self.assertEqual(bytes.fromhex("deadbeef"), load_payload(path, HEX))
+
+    def test_base64_lines(self):
+        encoded = b64encode(DATA)
+        lines = b"\n".join(encoded[i:i + 60] for i in range(0, len(encoded), 60)) + b"\n"
+        path = self.write("data.b64", lines)
+        self.assertEqual(DATA, load_payload(path))
+        # chunks smaller than a line still decode the same, carrying partial groups over
+        self.assertEqual(DATA, load_payload(path, BASE64, chunk_size=7))
+
+    def test_hex_lines(self):
+        encoded = DATA.hex().encode()
+        path = self.write("data.hex", b"\r\n".join(encoded[i:i + 61] for i in range(0, len(encoded), 61)))
+        self.assertEqual(DATA, load_payload(path))
+        self.assertEqual(DATA, load_payload(path, chunk_size=1))
+
+    def test_single_line_chunks(self):
+        # a capture with no line breaks is still decoded a chunk at a time
+        data = DATA * 200
+        path = self.write("line.b64", b64encode(data))
+        self.assertEqual(data, load_payload(path, BASE64, chunk_size=1000))
+        self.assertEqual(data, load_payload(path, BASE64, chunk_size=1001))
+        self.assertEqual(data, load_payload(self.write("line.hex", data.hex().encode()), HEX, chunk_size=999))
+        # only the output and a chunk's worth of copies are ever allocated, not a copy of the whole line
+        tracemalloc.start()
+        try:
+            load_payload(path, BASE64, chunk_size=1000)
+            size, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, len(data) + 10000)
+
+    def test_raw_and_empty(self):
+        self.assertEqual(b"\x00\xffraw", load_payload(self.write("raw.bin", b"\x00\xffraw")))
+        self.assertEqual(b"", load_payload(self.write("empty.txt", b"")))
+
+    def test_invalid_payloads(self):
+        self.assertRaises(ValueError, load_payload, self.write("odd.hex", b"abc"), HEX)
+        self.assertRaises(ValueError, load_payload, self.write("bad.hex", b"zz"), HEX)
+        self.assertRaises(ValueError, load_payload, self.write("x.txt", b"00"), "rot13")
+
+    def test_challenge_payloads(self):
+        self.assertTrue(load_payload(payload_path("Set1Challenge7.txt")).startswith(b"\x09\x12\x30\xaa"))
+        self.assertEqual(2876, len(load_payload(payload_path("Set1Challenge6.txt"))))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import unittest
+import contextlib
+import io
+import json
+import os
+import tempfile
+from Python.benchmarks.pipeline_benchmark import *
+
+
+class PipelineBenchmarkTest(unittest.TestCase):
+    def test_smoke(self):
+        # every benchmark once at the smallest size, so the harness can't rot unnoticed
+        with tempfile.TemporaryDirectory() as directory:
+            output, baseline = os.path.join(directory, "results.json"), os.path.join(directory, "baseline.json")
+            with contextlib.redirect_stderr(io.StringIO()):
+                self.assertEqual(0, main(["--max-size", "1KB", "--budget", "0", "--output", output,
+                                          "--baseline", baseline, "--update-baseline"]))
+                self.assertEqual(0, main(["--max-size", "1KB", "--budget", "0", "--output", output,
+                                          "--baseline", baseline, "--tolerance", "1e9"]))
+            with open(output) as file:
+                results = json.load(file)["results"]
+        self.assertEqual({"{}@1024".format(name) for name in BENCHMARKS}, set(results))
+        self.assertTrue(all(result.get("seconds", 1) > 0 for result in results.values()))
+
+    def test_committed_baseline(self):
+        with open(DEFAULT_BASELINE) as file:
+            baseline = json.load(file)["results"]
+        self.assertTrue({"{}@1024".format(name) for name in BENCHMARKS} <= set(baseline))
+
+    def test_compare(self):
+        before = {"results": {"xor@1024": {"seconds": 1.0}, "score_text@1024": {"seconds": 1.0}}}
+        after = {"results": {"xor@1024": {"seconds": 1.1}, "score_text@1024": {"seconds": 2.0},
+                             "detection_oracle@1024": {"skipped": "no AES"}}}
+        regressions = compare(after, before, 0.25)
+        self.assertEqual(1, len(regressions))
+        self.assertTrue(regressions[0].startswith("score_text@1024"))
+
+
+if __name__ == '__main__':
+    unittest.main()
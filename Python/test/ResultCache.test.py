@@ -0,0 +1,115 @@
+import unittest
+import os
+import tempfile
+from Python.src.CodeBreakers import *
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "results.sqlite")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_key_depends_on_everything(self):
+        key = cache_key("break_repeating_key_xor", b"abc", 40, DEFAULT_FREQUENCY)
+        self.assertEqual(key, cache_key("break_repeating_key_xor", b"abc", 40, DEFAULT_FREQUENCY))
+        self.assertNotEqual(key, cache_key("break_repeating_key_xor", b"abd", 40, DEFAULT_FREQUENCY))
+        self.assertNotEqual(key, cache_key("break_repeating_key_xor", b"abc", 41, DEFAULT_FREQUENCY))
+        self.assertNotEqual(key, cache_key("break_repeating_key_xor", b"abc", 40, "etaoin"))
+        self.assertNotEqual(key, cache_key("brute_xor_file", b"abc", 40, DEFAULT_FREQUENCY))
+
+    def test_lru_eviction(self):
+        cache = ResultCache(max_entries=2)
+        cache.put("a", (b"1",))
+        cache.put("b", (b"2",))
+        cache.get("a")
+        cache.put("c", (b"3",))
+        self.assertEqual((b"1",), cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(CacheStats(2, 1, 2, cache.stats().size), cache.stats())
+
+    def test_size_eviction(self):
+        cache = ResultCache(max_bytes=24)  # room for one of these 16 byte entries
+        cache.put("a", (b"x" * 10,))
+        cache.put("b", (b"y" * 10,))
+        self.assertEqual(1, len(cache))
+        self.assertIn("b", cache)
+        self.assertEqual(16, cache.stats().size)
+
+    def test_age_eviction(self):
+        cache = ResultCache(max_age=-1)  # everything has already expired
+        cache.put("a", ("key", 1.5))
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(0, len(cache))
+
+    def test_disk_tier_outlives_the_cache(self):
+        with ResultCache(path=self.path) as cache:
+            cache.put("a", (b"ICE", b"plain\x00text", 12))
+        with ResultCache(path=self.path) as cache:
+            self.assertEqual((b"ICE", b"plain\x00text", 12), cache.get("a"))
+            self.assertEqual(1, cache.hits)
+
+    def test_disk_eviction(self):
+        with ResultCache(path=self.path, max_disk_bytes=30) as cache:
+            cache.put("a", (b"x" * 10,))
+            cache.put("b", (b"y" * 10,))
+        with ResultCache(path=self.path) as cache:  # a fresh memory tier, so only the disk is checked
+            self.assertIsNone(cache.get("a"))
+            self.assertEqual((b"y" * 10,), cache.get("b"))
+
+    def test_lookups_do_not_write(self):
+        with ResultCache(path=self.path, max_disk_bytes=40) as cache:
+            cache.put("a", (b"x" * 10,))
+            cache.put("b", (b"y" * 10,))
+        with ResultCache(path=self.path, max_entries=1, max_disk_bytes=40) as cache:
+            self.assertIn("a", cache)
+            for _ in range(3):
+                self.assertEqual((b"x" * 10,), cache.get("a"))
+            self.assertNotIn("c", cache)
+            self.assertEqual(0, cache._db.total_changes)
+            # the use of "a" is written with the next put, so "b" is the least recently used entry
+            cache.put("c", (b"z" * 10,))
+        with ResultCache(path=self.path) as cache:
+            self.assertEqual([True, False, True], [key in cache for key in "abc"])
+
+    def test_expired_disk_entries(self):
+        with ResultCache(path=self.path) as cache:
+            cache.put("a", (b"x",))
+        with ResultCache(path=self.path, max_age=-1) as cache:
+            self.assertNotIn("a", cache)
+            self.assertIsNone(cache.get("a"))
+            self.assertEqual(0, cache._db.total_changes)
+
+    def test_breakers_use_the_cache(self):
+        plaintext = b"Burning 'em, if you ain't quick and nimble\nI go crazy when I hear a cymbal"
+        cyphertext = xor(plaintext, b"ICE").decode()
+        cache = ResultCache()
+        expected = break_repeating_key_xor(cyphertext, 10)
+        self.assertEqual(expected, break_repeating_key_xor(cyphertext, 10, False, cache))
+        self.assertEqual(expected, break_repeating_key_xor(cyphertext, 10, False, cache))
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+        filename = os.path.join(self.directory.name, "lines.txt")
+        with open(filename, 'w') as file:
+            file.write("\n".join([bytes(range(30)).hex(), xor(plaintext[:30], b"5").hex()]))
+        expected = brute_xor_file(filename, 1)
+        self.assertEqual(expected, brute_xor_file(filename, 1, False, cache))
+        self.assertEqual(expected, brute_xor_file(filename, 1, False, cache))
+        self.assertEqual((2, 2), (cache.hits, cache.misses))
+
+    def test_breaker_version_is_part_of_the_key(self):
+        plaintext = b"Burning 'em, if you ain't quick and nimble\nI go crazy when I hear a cymbal"
+        cyphertext = xor(plaintext, b"ICE")
+        cache = ResultCache()
+        # a result stored by an older version of the algorithm is not served
+        stale_key = cache_key("break_repeating_key_xor", cyphertext, BREAKER_VERSIONS["break_repeating_key_xor"] - 1,
+                              10, DEFAULT_FREQUENCY)
+        cache.put(stale_key, (b"stale", b"result", 0))
+        self.assertEqual(b"ICE", break_repeating_key_xor_bytes(cyphertext, 10, False, cache)[0])
+        self.assertEqual((0, 1), (cache.hits, cache.misses))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,6 +8,43 @@ class ScoringTest(unittest.TestCase):
         score = score_text(sample)
         self.assertEqual(score, 15)
 
+    def test_frequency_table(self):
+        sample = "etaoin\x00~"
+        table = frequency_table()
+        self.assertEqual(score_text(sample), sum(table[b] for b in sample.encode()))
+
+    def test_scorer_accepts_bytes(self):
+        sample = "etaoin"
+        scorer = compile_scorer()
+        self.assertEqual(score_text(sample), scorer.score(sample.encode()))
+        self.assertEqual(score_text(sample), scorer.score(memoryview(sample.encode())))
+        self.assertEqual(score_text(sample), scorer.score(bytearray(sample.encode())))
+
+    def test_compile_scorer_memoized(self):
+        self.assertIs(compile_scorer("abc"), compile_scorer("abc"))
+        self.assertIsNot(compile_scorer("abc"), compile_scorer("abd"))
+        self.assertIs(compile_scorer({'a': .5, 'b': .25}), compile_scorer({'b': .25, 'a': .5}))
+
+    def test_compile_scorer_cache_is_bounded(self):
+        first = compile_scorer({'e': -1})
+        for i in range(SCORER_CACHE_SIZE):
+            compile_scorer({'e': i})
+        self.assertIsNot(first, compile_scorer({'e': -1}))  # evicted and compiled again
+
+    def test_scorer_probability_dict(self):
+        scorer = compile_scorer({'a': .5, 'b': .25})
+        self.assertFalse(scorer.lower_is_better)
+        self.assertAlmostEqual(scorer.score(b"aAbc"), 1.25)
+
+    def test_scorer_xor_scores(self):
+        cyphertext = b"Some sample cyphertext\xff\x00" * 3
+        histogram = Counter(cyphertext)
+        for scorer in (compile_scorer(), compile_scorer({'e': .1, 't': .05})):
+            expected = [scorer.score(bytes(b ^ key for b in cyphertext)) for key in range(256)]
+            actual = scorer.xor_scores(histogram)
+            for key in range(256):
+                self.assertAlmostEqual(expected[key], actual[key])
+
     def test_score_text_probability(self):
         sample = "madministrator"
         score = 0.8825599999999999
@@ -20,11 +57,62 @@ class ScoringTest(unittest.TestCase):
         actual_distance = 37
         self.assertEqual(hamming_distance(first, second), actual_distance)
 
+    def test_hamming_distance_unequal_lengths(self):
+        self.assertEqual(hamming_distance_bytes(b"this is a test", b"wokka wokka!!!"), 37)
+        self.assertEqual(hamming_distance_bytes(b"abc", b"abcde"), 16)  # each missing byte is 8 differing bits
+
+    def test_pairwise_key_size_distances(self):
+        cyphertext = bytes(range(100))
+        distances = pairwise_key_size_distances(cyphertext, range(2, 8), 3)
+        for key_len, distance in distances.items():
+            pairs = [(cyphertext[i], cyphertext[i + m * key_len]) for m in (1, 2, 3)
+                     for i in range(len(cyphertext) - m * key_len)]
+            expected = sum(hamming_distance_bytes(bytes([a]), bytes([b])) for a, b in pairs) / len(pairs)
+            self.assertAlmostEqual(expected, distance)
+        self.assertEqual(8.0, pairwise_key_size_distances(b"abc", [3])[3])
+
+    def test_index_of_coincidence(self):
+        self.assertEqual(1.0, index_of_coincidence(b"aaaa"))
+        self.assertEqual(0.0, index_of_coincidence(b"abcd"))
+        self.assertAlmostEqual(4 / 12, index_of_coincidence(b"aabb"))
+        self.assertEqual(0.0, index_of_coincidence(b"a"))
+        self.assertEqual({1: 4 / 12, 2: 1.0}, column_coincidences(b"abab", [1, 2]))
+
+    def test_estimate_key_sizes(self):
+        plaintext = bytes("Now that the party is jumping With the bass kicked in and the Vega's are pumpin' Quick to "
+                          "the point, to the point, no faking Cooking MC's like a pound of bacon " * 4, 'ascii')
+        key = b"ICE ICE BABY!"
+        cyphertext = bytes(p ^ key[i % len(key)] for i, p in enumerate(plaintext))
+        estimates = estimate_key_sizes(cyphertext, range(2, 41))
+        self.assertEqual(39, len(estimates))
+        self.assertEqual(13, estimates[0].key_size)
+        self.assertGreater(estimates[0].confidence, 0.99)
+        self.assertAlmostEqual(1.0, sum(estimate.confidence for estimate in estimates))
+        # the multiples of the key size look just as good, but are folded into it
+        multiples = {estimate.key_size: estimate.multiple_of for estimate in estimates}
+        self.assertEqual((13, 13, None), (multiples[26], multiples[39], multiples[13]))
+        self.assertEqual([], estimate_key_sizes(cyphertext, []))
+
     def test_percent_repeating_blocks(self):
-        # "YELLOW SUBMARINE" is 16 bits, and so is " accomplishment " and " bioluminescense"
-        repeats = "YELLOW SUBMARINE accomplishment YELLOW SUBMARINE bioluminescense"
+        # "YELLOW SUBMARINE" is 16 bytes, and so is " accomplishment " and " bioluminescense"
+        repeats = b"YELLOW SUBMARINE accomplishment YELLOW SUBMARINE bioluminescense"
         score = percent_repeated_blocks(repeats, 16)
         self.assertAlmostEqual(score, 0.5)  # floating point comparison cannot be perfectly equal
+        self.assertAlmostEqual(percent_repeated_blocks(repeats + b"YELLOW", 16), 0.5)  # a short last block is ignored
+        self.assertEqual(percent_repeated_blocks(b"YELLOW", 16), 0.0)
+
+    def test_block_statistics(self):
+        repeats = b"YELLOW SUBMARINE accomplishment YELLOW SUBMARINE bioluminescenseYELLOW SUBMARINE"
+        stats = block_statistics(repeats, 16)
+        self.assertEqual(stats.blocks, 5)
+        self.assertEqual(stats.repeats, 2)  # the second and third YELLOW SUBMARINE
+        self.assertEqual(stats.repeated_blocks, 3)
+        self.assertEqual(stats.first_repeat, 32)
+        self.assertAlmostEqual(stats.confidence, 0.5)  # 2 of the 4 blocks after the first are copies
+        self.assertEqual(block_statistics(b"YELLOW SUBMARINE" * 8, 16).confidence, 1.0)
+        self.assertLess(block_statistics(b"YELLOW SUBMARINE" * 2 + bytes(range(160)), 16).confidence,
+                        stats.confidence)
+        self.assertEqual(block_statistics(bytes(range(64)), 16), (4, 0, 0, -1, 0.0))
 
 
 if __name__ == '__main__':